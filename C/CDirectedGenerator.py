@@ -9,8 +9,11 @@ parentdir = os.path.dirname(currentdir)
 sys.path.append(parentdir)
 
 import C.Shared as Shared
+import C.MutationPlan as MutationPlan
+import Shared.VariantDelta as VariantDelta
 
-def CDirectedGenerator(ast_dict: dict, lang_info: dict, nodeIds: set, user_n: int):
+def CDirectedGenerator(
+        ast_dict: dict, lang_info: dict, nodeIds: set, user_n: int, plan=None):
     """This function directed the AST editor to target and mutate
     specific nodes.
 
@@ -19,120 +22,100 @@ def CDirectedGenerator(ast_dict: dict, lang_info: dict, nodeIds: set, user_n: in
         lang_info (dict): C language specification information.
         nodeIds (set): set of target node IDs.
         user_n (int):
+        plan (MutationPlan): mutation plan of the seed, computed if not given.
 
     returns:
-        (list) list of new test program asts.
+        (VariantStore) deltas of the new test program asts.
     """
 
-    nodetypes = Shared.load_json(f"{currentdir}/NodeTypes.json")
-
-    labels = set()
-    skip_ids = set()
-    function_names = set()
-    (
-        total_nodes 
-    ) = Shared.treeScanner(
-            ast_dict, 1, skip_ids, function_names, 
-            nodetypes, labels)
+    if plan == None:
+        plan = MutationPlan.GetPlan(ast_dict)
 
     # Tracks the number of generated variants number.
     generated = 1
 
     # Targeting the identifies node IDs, attempt to generate non-buggy 
     # C programs.
-    nonBuggyAsts = GenerateNonBuggies(
-            ast_dict, lang_info, nodeIds, labels, 
-            skip_ids, function_names, nodetypes,
-            total_nodes)
+    nonBuggyAsts = GenerateNonBuggies(ast_dict, lang_info, nodeIds, plan)
     # Generate new buggy program ASTs by avoiding the target node IDs.
-    buggyAsts = GenerateBuggies(
-            ast_dict, lang_info, nodeIds, labels,
-            skip_ids, function_names, user_n, total_nodes,
-            nodetypes)
+    buggyAsts = GenerateBuggies(ast_dict, lang_info, nodeIds, user_n, plan)
 
-    asts = buggyAsts[:user_n] + nonBuggyAsts[:user_n]
+    asts = VariantDelta.VariantStore(ast_dict)
+    for delta in buggyAsts.Deltas()[:user_n] + nonBuggyAsts.Deltas()[:user_n]:
+        asts.Append(delta)
 
-    print (f"DIRECTED: Total # Generated ASTS {len(buggyAsts[:user_n])+len(nonBuggyAsts[:user_n])}")
-    print (f"|__ # of Generated Buggy ASTS {len(buggyAsts[:user_n])}")
-    print (f"|__ # of Generated Non-Buggy ASTS {len(nonBuggyAsts[:user_n])}")
+    print (f"DIRECTED: Total # Generated ASTS {len(asts)}")
+    print (f"|__ # of Generated Buggy ASTS {min(len(buggyAsts), user_n)}")
+    print (f"|__ # of Generated Non-Buggy ASTS {min(len(nonBuggyAsts), user_n)}")
 
     return asts
 
-def GenerateNonBuggies(
-        ast_dict: dict, lang_info: dict, nodeIds: set, labels: set,
-        skip_ids: set, function_names: set, nodetypes: dict,
-        total_nodes: int):
+def GenerateNonBuggies(ast_dict: dict, lang_info: dict, nodeIds: set, plan):
     """This function generated non-buggy program ASTs.
 
     args:
         ast_dict (dict): seed program's ast.
         lang_info (dict): C language specification information.
         nodeIds (set): set of target node IDs.
-        labels (set): set of C program label names (e.g., LABEL L1).
-        skip_ids (set): set of node ids to skip for analysis.
-        function_names (set): set of function names declared in
-        the source code.
-        nodetypes (dict): node types that we handle and skip.
+        plan (MutationPlan): mutation plan of the seed, which holds the
+        labels, the node ids to skip, and the function names.
 
     returns:
-        (list) list of newly generated ASTs.
+        (VariantStore) deltas of the newly generated ASTs.
     """
 
-    # List of generated new ASTs.
-    asts = [ast_dict]
+    # Generated new ASTs, as their edits to the seed.
+    asts = VariantDelta.VariantStore(ast_dict)
+
+    # The tree is indexed once for targeting the nodes.
+    index = plan.Index()
 
     idx = 1
     for nodeId in nodeIds:
         dummy = [-1]
         for j in range(0, 5):
-            ast_copy = copy.deepcopy(ast_dict)
-            depth = Shared.astEditor(
-                        ast_copy, nodeId, lang_info, 1, 
-                        skip_ids, function_names,
-                        nodetypes, labels, dummy)
-            if ast_copy not in asts:
-                asts.append(ast_copy)
+            # The copy shares all but the edited path with the seed.
+            ast_copy = Shared.indexedAstEditor(
+                        index, nodeId, lang_info, plan.function_names,
+                        plan.nodetypes, plan.labels, dummy)
+            # The new AST is added only if it is neither the seed
+            # nor a duplicate.
+            asts.Add(ast_copy, [nodeId])
 
-    return asts[1:]
+    return asts
 
 def GenerateBuggies(
-        ast_dict: dict, lang_info: dict, nodeIds: set, labels: set,
-        skip_ids: set, function_names: set, user_n: int, total_nodes: int,
-        nodetypes: dict):
+        ast_dict: dict, lang_info: dict, nodeIds: set, user_n: int, plan):
     """This function generated buggy program ASTs.
 
     args:
         ast_dict (dict): seed program's ast.
         lang_info (dict): C language specification information.
         nodeIds (set): set of target node IDs.
-        labels (set): set of C program label names (e.g., LABEL L1).
-        skip_ids (set): set of node ids to skip for analysis.
-        function_names (set): set of function names declared in the source code.
-        total_nodes (int): number of nodes in the AST.
-        nodetypes (dict): node types that we handle and skip.
+        plan (MutationPlan): mutation plan of the seed, which holds the
+        labels, the node ids to skip, and the function names.
 
     returns:
-        (list) list of newly generated ASTs.
+        (VariantStore) deltas of the newly generated ASTs.
     """
 
 
-    # List of generated new ASTs.
-    asts = [ast_dict]
+    # Generated new ASTs, as their edits to the seed.
+    asts = VariantDelta.VariantStore(ast_dict)
 
-    targets = []
-    for i in range(1, total_nodes):
-        if i not in skip_ids and i not in nodeIds:
-            targets.append(i)
+    targets = [i for i in plan.targets if i not in nodeIds]
 
     for i in targets:
         dummy = [-1]
         for j in range(0, 5):
+            # Almost every node is edited, so the whole AST is copied.
             ast_copy = copy.deepcopy(ast_dict)
             depth = Shared.astEditorForDirectedBuggies(
                         ast_copy, lang_info, i, 
-                        skip_ids, function_names,
-                        nodetypes, labels, targets)
-            if ast_copy not in asts:
-                asts.append(ast_copy)
+                        plan.skip_ids, plan.function_names,
+                        plan.nodetypes, plan.labels, targets)
+            # The new AST is added only if it is neither the seed
+            # nor a duplicate.
+            asts.Add(ast_copy, [i])
 
-    return asts[1:]
+    return asts
@@ -8,7 +8,74 @@ currentdir = os.path.dirname(os.path.realpath(__file__))
 parentdir = os.path.dirname(currentdir)
 sys.path.append(parentdir)
 
-import DPGen4JIT.Shared.General as General
+import Shared.General as General
+import Shared.ExecutionCache as ExecutionCache
+import Shared.Sandbox as Sandbox
+import Shared.OutputDigest as OutputDigest
+
+# Limits of every binary run.
+LIMITS = Sandbox.Limits()
+
+# Verdicts of the test programs kept in the fingerprint store.
+BUGGY = "buggy"
+NONBUGGY = "non-buggy"
+
+def ConfigureExecution(arguments: dict):
+    """This function configures the execution cache and the limits used 
+    when running the binaries.
+
+    args:
+        arguments (dict): arguments to the system.
+
+    returns:
+        None.
+    """
+
+    if "root" in arguments:
+        root = arguments["root"]
+    else:
+        root = arguments["dirPath"]
+
+    ExecutionCache.Configure(
+            f"{root}/misc/execution_cache.db",
+            arguments.get("cacheSize", ExecutionCache.DEFAULT_SIZE_MB))
+
+    LIMITS.memoryMB = arguments.get("memoryLimit", 0)
+    LIMITS.cpuSeconds = arguments.get("cpuLimit", 0)
+
+def CalibrateTimeout(arguments: dict, seedPath: str):
+    """This function calibrates the timeout of the binary runs from the
+    runtime of the seed program compiled by the target compiler.
+
+    args:
+        arguments (dict): arguments to the system.
+        seedPath (str): path to the seed C file.
+
+    returns:
+        (float) calibrated timeout in seconds.
+    """
+
+    if "root" in arguments:
+        root = arguments["root"]
+    else:
+        root = arguments["dirPath"]
+
+    binPath = f"{root}/misc/seed_bin"
+    commands = [arguments["compilerPath"]]
+    commands.extend(arguments["arguments"])
+    commands.extend([seedPath, "-o", binPath])
+
+    output = subprocess.run(commands, capture_output=True, text=True)
+    assert (
+        output.returncode == 0 and os.path.exists(binPath)
+    ), f"ERROR: CLearning: the seed ({seedPath}) does not compile: {output.stderr}"
+
+    LIMITS.timeout = Sandbox.Calibrate(
+                        [binPath],
+                        arguments.get("timeoutFactor", Sandbox.TIMEOUT_FACTOR),
+                        arguments.get("minTimeout", Sandbox.MIN_TIMEOUT))
+
+    return LIMITS.timeout
 
 def GenerateBins(CFiles: set, binsPath: str, arguments: dict, commands: list, compiler: str):
     """This function generates binary executables from 
@@ -89,6 +156,7 @@ def RunBins(compiler: str, binPaths: set):
 
     returns:
         (dict): file id to output.
+        (set): set of file ids that timed out.
     """
 
     fileId2output = {}
@@ -107,7 +175,8 @@ def RunBins(compiler: str, binPaths: set):
 
             fileId = (binPath.split('__')[-1]).split('.')[0]
             output = RunSingleBin(compiler, binPath)
-            if output == None:
+            if Sandbox.TimedOut(output):
+                print (f"   TIMEOUT: {compiler}: {binPath}...")
                 fileIdsToExc.add(fileId)
                 continue
             fileId2output[fileId] = ConstructOutputStr(output)
@@ -115,22 +184,52 @@ def RunBins(compiler: str, binPaths: set):
     return fileId2output, fileIdsToExc
 
 def RunSingleBin(compiler: str, binPath: str):
+    """This function runs the binary, or returns the cached result if the
+    same binary was already executed.
+
+    args:
+        compiler (str): name of the compiler used in compiling the C file.
+        binPath (str): path to the binary executable.
+
+    returns:
+        (SandboxResult) result of the execution.
     """
+
+    return ExecutionCache.CachedRun(
+            [binPath], lambda commands: ExecuteBin(compiler, binPath), binPath,
+            limits=LIMITS)
+
+def ExecuteBin(compiler: str, binPath: str):
+    """This function runs the binary in the sandbox. A binary that runs
+    over the timeout is killed together with its children.
+
+    args:
+        compiler (str): name of the compiler used in compiling the C file.
+        binPath (str): path to the binary executable.
+
+    returns:
+        (SandboxResult) result of the execution.
     """
 
-    try:
-        output = subprocess.run([binPath], capture_output=True, text=True, timeout=10)
-        # ONLY FOR BUG #16605
-        # output = subprocess.run([f"{binPath}", ";", "echo", "$?"], capture_output=True, text=True, timeout=10)
-    except subprocess.TimeoutExpired:
-        print (f"   TIMEOUT: {compiler}: {binPath}...")
-        return None
+    output = Sandbox.Run([binPath], LIMITS)
+    # ONLY FOR BUG #16605
+    # output = subprocess.run([f"{binPath}", ";", "echo", "$?"], capture_output=True, text=True, timeout=10)
 
     return output
 
 def ConstructOutputStr(output):
+    """This function constructs the fixed-size digest of the output, so the
+    Oracle votes on the digests instead of holding the full outputs.
 
-    return f"returncode:{output.returncode},stdout:{output.stdout.strip()},stderr:{output.stderr.strip()}"
+    args:
+        output (CompletedProcess): result of the execution.
+
+    returns:
+        (str) digest of the return code, stdout, and stderr.
+    """
+
+    return OutputDigest.Digest(
+            f"returncode:{output.returncode},stdout:{output.stdout.strip()},stderr:{output.stderr.strip()}")
 
 def IdentifyTargetNodeIDs(nonbuggyIds: set, fileId2NodeId: dict):
     """This function identifies the target node IDs to edit during
@@ -175,18 +274,22 @@ def Oracle(target: str, binPaths: set, compiler2BinPaths: dict):
     returns:
         (set) set of buggy file IDs.
         (set) set of non-buggy file IDs.
+        (set) set of file IDs that timed out with any of the compilers.
     """
 
     outputs = {}
+    timeoutIds = set()
 
     # First run all binary executables generated from the target (buggy) compiler.
     target_fileId2output, fileIdsToExc = RunBins(target, binPaths)
+    timeoutIds.update(fileIdsToExc)
     # Initialize the voting count for each output of each execution with 1.
     for fileId, output in target_fileId2output.items():
         outputs[fileId] = [output]
 
     for compiler, paths in compiler2BinPaths.items():
         fileId2output, fileIdsToExc = RunBins(compiler, paths)
+        timeoutIds.update(fileIdsToExc)
         for fileId, output in fileId2output.items():
             if fileId in outputs and fileId not in fileIdsToExc:
                 if output not in outputs[fileId]:
@@ -194,6 +297,12 @@ def Oracle(target: str, binPaths: set, compiler2BinPaths: dict):
             elif fileId in fileIdsToExc:
                 del outputs[fileId]
 
+    # A program that timed out with any of the compilers is neither
+    # buggy nor non-buggy.
+    for fileId in timeoutIds:
+        if fileId in outputs:
+            del outputs[fileId]
+
     buggyIds = set()
     nonbuggyIds = set()
     for fileId, output_info in outputs.items():
@@ -206,10 +315,14 @@ def Oracle(target: str, binPaths: set, compiler2BinPaths: dict):
             continue
 
     # General.dumpToJson("./voting.json", voting)
-    return buggyIds, nonbuggyIds
+    return buggyIds, nonbuggyIds, set(int(fileId) for fileId in timeoutIds)
 
-def RunOracle(arguments: dict, binsPath: str, CFiles: set, _iptDir: str):
+def RunOracle(
+        arguments: dict, binsPath: str, CFiles: set, _iptDir: str,
+        store=None, fileId2Fingerprint: dict=None):
     """
+    The C files classified in an earlier run on the seed are not compiled,
+    and their verdicts are taken from the fingerprint store.
 
     args:
         arguments (dict): arguments to the system.
@@ -218,15 +331,22 @@ def RunOracle(arguments: dict, binsPath: str, CFiles: set, _iptDir: str):
         CFiles (set): set of C file paths.
         _iptDir (str): path to the directory where generated
         input C programs are stored.
+        store (FingerprintStore): store of the seed, if any.
+        fileId2Fingerprint (dict): file id to fingerprint of its AST.
 
     returns:
         (set) set of buggy file IDs.
         (set) set of non-buggy file IDs.
+        (set) set of file IDs that timed out.
     """
 
     # Number of compilers the user specified to use as Oracle.
     numberOfComps = arguments["numberOfComps"]
 
+    knownIds = {}
+    if store != None and fileId2Fingerprint:
+        CFiles, knownIds = LookupVerdicts(CFiles, store, fileId2Fingerprint)
+
     # First generate the binaries using the target (buggy) compiler.
     commands = [arguments["compilerPath"]]
     commands.extend(arguments["arguments"])
@@ -254,13 +374,71 @@ def RunOracle(arguments: dict, binsPath: str, CFiles: set, _iptDir: str):
         compiler2BinPaths[compCLA[0]] = copy.deepcopy(bins4OraclePaths)
     
     # Classify C files into two groups: buggy and non-buggy.
-    buggyIds, nonbuggyIds = Oracle(arguments["compiler"], binPaths, compiler2BinPaths)
+    buggyIds, nonbuggyIds, timeoutIds = Oracle(
+            arguments["compiler"], binPaths, compiler2BinPaths)
+
+    if store != None and fileId2Fingerprint:
+        RecordVerdicts(store, fileId2Fingerprint, buggyIds, nonbuggyIds)
+        buggyIds.update(knownIds[BUGGY])
+        nonbuggyIds.update(knownIds[NONBUGGY])
+        store.Report()
+
+    hits, misses = ExecutionCache.Stats()
+    print (f"EXECUTION CACHE: {hits} hits, {misses} misses")
+
+    return buggyIds, nonbuggyIds, timeoutIds
+
+def LookupVerdicts(CFiles: set, store, fileId2Fingerprint: dict):
+    """This function looks up the C files in the fingerprint store.
+
+    args:
+        CFiles (set): set of C file paths.
+        store (FingerprintStore): store of the seed.
+        fileId2Fingerprint (dict): file id to fingerprint of its AST.
+
+    returns:
+        (set) set of C file paths that were not classified.
+        (dict) verdict (BUGGY or NONBUGGY) to the set of file IDs that
+        were classified.
+    """
+
+    unseen = set()
+    knownIds = {BUGGY: set(), NONBUGGY: set()}
+
+    for CFile in CFiles:
+        fileId = int((CFile.split('__')[-1]).split('.')[0])
+        fingerprint = fileId2Fingerprint.get(fileId)
+        verdict = store.Lookup(fingerprint) if fingerprint else None
+        if verdict in knownIds:
+            knownIds[verdict].add(fileId)
+        else:
+            unseen.add(CFile)
+
+    return unseen, knownIds
+
+def RecordVerdicts(store, fileId2Fingerprint: dict, buggyIds: set, nonbuggyIds: set):
+    """This function records the verdicts of the classified file IDs. The
+    file IDs that timed out are not recorded, so they are run again in the
+    later runs.
+
+    args:
+        store (FingerprintStore): store of the seed.
+        fileId2Fingerprint (dict): file id to fingerprint of its AST.
+        buggyIds (set): set of buggy file IDs.
+        nonbuggyIds (set): set of non-buggy file IDs.
+
+    returns:
+        None.
+    """
 
-    return buggyIds, nonbuggyIds
+    for fileIds, verdict in ((buggyIds, BUGGY), (nonbuggyIds, NONBUGGY)):
+        for fileId in fileIds:
+            if fileId2Fingerprint.get(fileId):
+                store.Record(fileId2Fingerprint[fileId], verdict)
 
 def CLearning(
         arguments: dict, binsPath: str, CFiles: set, random_iptDir: str,
-        fileId2NodeId: dict):
+        fileId2NodeId: dict, store=None, fileId2Fingerprint: dict=None):
     """This function analyze the generated C test programs by running
     the binaries. The analysis is to identify the following:
     (1) test programs to classify the test programs into two groups,
@@ -276,14 +454,18 @@ def CLearning(
         random_iptDir (str): path to the directory where randomly generated
         input C programs are stored.
         fileId2NodeId (dict): file id to edited node ID.
+        store (FingerprintStore): store of the seed, if any.
+        fileId2Fingerprint (dict): file id to fingerprint of its AST.
 
     returns:
         (set) set of target node IDs.
     """
 
-    buggyIds, nonbuggyIds = RunOracle(arguments, binsPath, CFiles, random_iptDir)
+    buggyIds, nonbuggyIds, timeoutIds = RunOracle(
+            arguments, binsPath, CFiles, random_iptDir, store, fileId2Fingerprint)
     print (f"UNDIRECTED: Buggy IDs: {buggyIds}")
     print (f"UNDIRECTED: NonBuggy IDs: {nonbuggyIds}")
+    print (f"UNDIRECTED: Timed out IDs: {timeoutIds}")
 
     # Identify target node IDs to edit during the directed mutation.
     nodeIds = IdentifyTargetNodeIDs(nonbuggyIds, fileId2NodeId)
@@ -9,64 +9,66 @@ parentdir = os.path.dirname(currentdir)
 sys.path.append(parentdir)
 
 import C.Shared as Shared
+import C.MutationPlan as MutationPlan
+import Shared.VariantDelta as VariantDelta
 
-def CRandomGenerator(ast_dict: dict, lang_info: dict):
+def CRandomGenerator(ast_dict: dict, lang_info: dict, plan=None):
     """This function randomly mutates the seed program and generates
     user specified amont of new test programs.
 
     args:
         ast_dict (dict): seed program's ast.
         lang_info (dict): C language specification information.
+        plan (MutationPlan): mutation plan of the seed, computed if not given.
 
     returns:
-        (list) list of new test program asts.
+        (VariantStore) deltas of the new test program asts.
+        (dict) file id to edited node id.
     """
 
-    nodetypes = Shared.load_json(f"{currentdir}/NodeTypes.json")
+    if plan == None:
+        plan = MutationPlan.GetPlan(ast_dict)
 
-    labels = set()
-    skip_ids = set()
-    function_names = set()
-    (
-        total_nodes 
-    ) = Shared.treeScanner(
-            ast_dict, 1, skip_ids, function_names, 
-            nodetypes, labels)
+    nodetypes = plan.nodetypes
+    labels = plan.labels
+    function_names = plan.function_names
+
+    # The tree is indexed once for targeting the nodes.
+    index = plan.Index()
 
     # Tracks the number of generated variants number.
     generated = 1
     # Sets the target_node_id to 1.
     target_node_id = 1
-    # List of generated new ASTs.
-    asts = [ast_dict]
+    # Generated new ASTs, as their edits to the seed.
+    asts = VariantDelta.VariantStore(ast_dict)
     # File ID to edited node ID.
     fileId2NodeId = {}
 
     # Call ast_editor function to modify the original 
     # input program's AST.
     idx = 1
-    for i in range(1, total_nodes):
-        if i in skip_ids:
-            continue
-        else:
-            edited_nodeId = [-1]
-            for j in range(0, 3):
-                ast_copy = copy.deepcopy(ast_dict)
-                depth = Shared.astEditor(
-                            ast_copy, i, lang_info, 1, 
-                            skip_ids, function_names,
-                            nodetypes, labels, edited_nodeId)
-                if (
-                    ast_copy not in asts and 
-                    edited_nodeId[0] != -1
-                ):
-                        asts.append(ast_copy)
-                        (
-                            fileId2NodeId[idx]
-                        ) = copy.deepcopy(edited_nodeId[0])
-                        idx += 1
+    # Only the nodes that edit_node can edit are targeted, as
+    # the others never generate new ASTs.
+    for i in plan.editable:
+        edited_nodeId = [-1]
+        for j in range(0, 3):
+            # The copy shares all but the edited path with the seed.
+            ast_copy = Shared.indexedAstEditor(
+                        index, i, lang_info, function_names,
+                        nodetypes, labels, edited_nodeId)
+            # The new AST is added only if it is neither the seed
+            # nor a duplicate.
+            if (
+                edited_nodeId[0] != -1 and
+                asts.Add(ast_copy, [edited_nodeId[0]]) != None
+            ):
+                    (
+                        fileId2NodeId[idx]
+                    ) = copy.deepcopy(edited_nodeId[0])
+                    idx += 1
 
-    print (f"Number of generated new ASTs: {len(asts)-1}...")
+    print (f"Number of generated new ASTs: {len(asts)}...")
 
     return asts, fileId2NodeId
 
@@ -12,29 +12,35 @@ currentdir = os.path.dirname(os.path.realpath(__file__))
 parentdir = os.path.dirname(currentdir)
 sys.path.append(parentdir)
 
-import DPGen4JIT.C.CLearning as CLearning
-import DPGen4JIT.C.Shared as Shared
-import DPGen4JIT.Shared.SequenceAlignment as SEQAlign
-import DPGen4JIT.Shared.General as General
-import DPGen4JIT.Shared.SelectInputs as Select 
+import C.CLearning as CLearning
+import C.Shared as Shared
+import Shared.SequenceAlignment as SEQAlign
+import Shared.General as General
+import Shared.SelectInputs as Select 
 
 def SelectInputs(
         arguments: dict, seedAST: dict, binsPath: str, CFiles: set, 
-        controlled_iptDir: str, root: str, seed: str, user_n: int):
+        controlled_iptDir: str, root: str, seed: str, user_n: int,
+        store=None, fileId2Fingerprint: dict=None):
     """
     """
 
     # Classify the newly generated programs into buggy or non-buggy programs.
-    buggyIds, nonbuggyIds = CLearning.RunOracle(arguments, binsPath, CFiles, controlled_iptDir)
+    buggyIds, nonbuggyIds, timeoutIds = CLearning.RunOracle(
+            arguments, binsPath, CFiles, controlled_iptDir, store, fileId2Fingerprint)
     print (f"DIRECTED: Buggy IDs: {buggyIds}")
     print (f"DIRECTED: NonBuggy IDs: {nonbuggyIds}")
+    print (f"DIRECTED: Timed out IDs: {timeoutIds}")
     
+    # Table of the node signatures shared by the seed and the new ASTs.
+    signatures = {}
+
     # Get node IDs to actual node objects.
     nodeId2Node = {}
     nodeId = Shared.assignIdsToNodes(seedAST, 1, nodeId2Node)
     
-    # Extract node objects and convert them into a list that maintains the order of node IDs.
-    seedNodesList = copy.deepcopy(GetNodesInStr(list(nodeId2Node.values())))
+    # Extract node signatures into a list that maintains the order of node IDs.
+    seedNodesList = Shared.nodeSignatures(list(nodeId2Node.values()), signatures)
 
     # Get the list of AST files.
     ASTFiles = os.listdir(f"{controlled_iptDir}/asts")
@@ -50,11 +56,9 @@ def SelectInputs(
             # Get node IDs to actual node objects.
             nodeId2Node = {}
             nodeId = Shared.assignIdsToNodes(ast, 1, nodeId2Node)
-            nodes = copy.deepcopy(list(nodeId2Node.values()))
-            nodesList = copy.deepcopy(GetNodesInStr(nodes))
-            seedCopy = copy.deepcopy(seedNodesList)
+            nodesList = Shared.nodeSignatures(list(nodeId2Node.values()), signatures)
             # Compute the nodes alignment between the seed and the new AST.
-            alignment = SEQAlign.SequenceAlignment(seedCopy, nodesList)
+            alignment = SEQAlign.FastSequenceAlignment(seedNodesList, nodesList)
             General.dumpToJson(f"{root}/misc/alignmentWith_{fileId}.json", alignment)
 
             # Compute the similarity.
@@ -115,17 +119,6 @@ def SelectIDs(astId2SimValue: dict, buggyIds: set, nonbuggyIds: set, user_n: int
 
     return selectedIds
 
-def GetNodesInStr(nodesList: list):
-    """
-    """
-    
-    nodesStrList = []
-
-    for node in nodesList:
-        nodesStrList.append(str(node))
-
-    return nodesStrList
-
 def SortDictByKey(dictTosort: dict):
     """This function sorts dictionary by keys in ascending order.
 
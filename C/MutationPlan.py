@@ -0,0 +1,199 @@
+"""
+    This file holds the mutation plan of a seed program. The plan is
+    computed once per seed from a single tree scan, and holds the node ids
+    that may be targeted, their node types, and the edit_node operator that
+    applies to each of them. The random and the directed generators take
+    the targets from the plan instead of rescanning the tree.
+
+    The plans are cached on disk, keyed by the hash of the seed AST and of
+    the node types, so a rerun on the same seed skips the scan as well.
+
+    Author: Anonymous.
+"""
+
+import os, sys
+import hashlib
+import json
+
+# Code to import modules from other directories.
+# Soruce: https://codeolives.com/2020/01/10/python-reference-module-in-parent-directory/
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import C.Shared as Shared
+
+# _nodetype to the operator of edit_node that edits the node.
+OPERATORS = {
+    "Constant": "modify_number",
+    "UnaryOp": "modify_unary",
+    "BinaryOp": "modify_binary",
+    "Assignment": "modify_assignment",
+    "Typename": "modify_typename",
+    "Decl": "modify_decl",
+    "Goto": "modify_goto",
+    "Continue": "modify_loop_cf",
+    "Break": "modify_loop_cf",
+}
+
+# Plans of the seeds, by their keys.
+PLANS = {}
+
+class MutationPlan:
+    """Targets of the mutations of a seed AST."""
+
+    def __init__(self, ast: dict, key: str, nodetypes: dict):
+        """
+        args:
+            ast (dict): seed program's ast.
+            key (str): hash of the seed ast and the node types.
+            nodetypes (dict): node types that we handle and skip.
+        """
+
+        self.ast = ast
+        self.key = key
+        self.nodetypes = nodetypes
+        self.total_nodes = 0
+        self.skip_ids = set()
+        self.function_names = set()
+        self.labels = set()
+        # Node ids that are not skipped, in the order of the node ids.
+        self.targets = []
+        # Node id to the _nodetype of the node edited for the id.
+        self.types = {}
+        # Node id to the operator of edit_node, for the targets it can edit.
+        self.operators = {}
+        # Targets that edit_node can edit, in the order of the node ids.
+        self.editable = []
+        self.index = None
+
+    def Scan(self):
+        """This function scans the seed ast and fills the plan.
+
+        returns:
+            None.
+        """
+
+        self.total_nodes = Shared.treeScanner(
+                self.ast, 1, self.skip_ids, self.function_names,
+                self.nodetypes, self.labels)
+
+        index = self.Index()
+        skips = set(self.nodetypes["skips"])
+        for nodeId in range(1, self.total_nodes):
+            if nodeId in self.skip_ids:
+                continue
+            self.targets.append(nodeId)
+            if not index.Has(nodeId):
+                continue
+
+            node = index.nodes[nodeId]
+            parent = index.parents[nodeId]
+            self.types[nodeId] = node.get("_nodetype")
+            # edit_node does not edit the children of the skipped nodes.
+            if parent.get("_nodetype") not in skips and self.types[nodeId] in OPERATORS:
+                self.operators[nodeId] = OPERATORS[self.types[nodeId]]
+                self.editable.append(nodeId)
+
+    def Index(self):
+        """This function returns the node index of the seed ast, built on
+        the first call.
+
+        returns:
+            (NodeIndex) index of the nodes.
+        """
+
+        if self.index == None:
+            self.index = Shared.indexTree(self.ast, self.skip_ids)
+
+        return self.index
+
+    def ToDict(self):
+        return {
+            "key": self.key,
+            "total_nodes": self.total_nodes,
+            "skip_ids": sorted(self.skip_ids),
+            "function_names": sorted(self.function_names),
+            "labels": sorted(self.labels),
+            "targets": self.targets,
+            "types": self.types,
+            "operators": self.operators,
+            "editable": self.editable,
+        }
+
+    def FromDict(self, plan: dict):
+        """This function fills the plan from its cached dict.
+
+        args:
+            plan (dict): plan from ToDict.
+
+        returns:
+            None.
+        """
+
+        self.total_nodes = plan["total_nodes"]
+        self.skip_ids = set(plan["skip_ids"])
+        self.function_names = set(plan["function_names"])
+        self.labels = set(plan["labels"])
+        self.targets = plan["targets"]
+        # JSON keys are strings.
+        self.types = {int(nodeId): nodetype for nodeId, nodetype in plan["types"].items()}
+        self.operators = {
+            int(nodeId): operator for nodeId, operator in plan["operators"].items()}
+        self.editable = plan["editable"]
+
+def PlanKey(ast: dict, nodetypes: dict):
+    """This function hashes the seed ast and the node types. The key order
+    of the ast is kept, as the node ids follow it.
+
+    args:
+        ast (dict): seed program's ast.
+        nodetypes (dict): node types that we handle and skip.
+
+    returns:
+        (str) key of the plan.
+    """
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps(ast).encode())
+    digest.update(json.dumps(nodetypes, sort_keys=True).encode())
+
+    return digest.hexdigest()
+
+def GetPlan(ast: dict, planDir: str=None):
+    """This function returns the mutation plan of the seed ast. The plan is
+    taken from the memory or the disk if it was computed before.
+
+    args:
+        ast (dict): seed program's ast.
+        planDir (str): directory where the plans are cached, or None to
+        keep the plans in the memory only.
+
+    returns:
+        (MutationPlan) plan of the seed.
+    """
+
+    nodetypes = Shared.load_json(f"{currentdir}/NodeTypes.json")
+    key = PlanKey(ast, nodetypes)
+
+    # The plan holds the seed ast, which the editors share with the variants.
+    if key in PLANS and PLANS[key].ast is ast:
+        return PLANS[key]
+
+    plan = MutationPlan(ast, key, nodetypes)
+
+    planPath = f"{planDir}/mutation_plan_{key}.json" if planDir else None
+    if key in PLANS:
+        plan.FromDict(PLANS[key].ToDict())
+    elif planPath and os.path.exists(planPath):
+        with open(planPath) as f:
+            plan.FromDict(json.load(f))
+    else:
+        plan.Scan()
+        if planPath:
+            with open(planPath, 'w') as f:
+                json.dump(plan.ToDict(), f)
+
+    PLANS[key] = plan
+
+    return plan
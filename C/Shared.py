@@ -3,22 +3,28 @@ import random
 import copy
 import json
 
-def selectTarget(total_nodes: int, skip_ids: set):
+# Code to import modules from other directories.
+# Soruce: https://codeolives.com/2020/01/10/python-reference-module-in-parent-directory/
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import Shared.NodeIndex as NodeIndex
+import Shared.PathCopy as PathCopy
+
+def selectTarget(plan):
     """This function selected target AST node ID to mutate.
+    The target is drawn from the nodes that the plan can edit,
+    so no drawn target is rejected.
 
     args:
-        total_nodes (int): total number of nodes.
-        skip_ids (set): set of node ids to skip.
+        plan (MutationPlan): mutation plan of the seed.
 
     returns:
         (int) target node id.
     """
     
-    target = random.randint(3, total_nodes)
-    while target in skip_ids:
-        target = random.randint(1, total_nodes)
-
-    return target
+    return random.choice(plan.editable)
 
 def treeScanner(
         ast: dict, nodeId: int, skip_ids: set, function_names: set,
@@ -72,7 +78,9 @@ def treeScanner(
 
 def assignIdsToNodes(ast: dict, nodeId: int, nodeId2Node: dict):
     """This function traverses the AST and assigns the node ID,
-    i.e., an order that the function visited the node.
+    i.e., an order that the function visited the node. The nodes
+    are not copied, so the ast must not be edited while the nodes
+    are in use.
 
     args:
         ast (dict): ast to scan.
@@ -91,11 +99,56 @@ def assignIdsToNodes(ast: dict, nodeId: int, nodeId2Node: dict):
                         for elem in value:
                             nodeId = assignIdsToNodes(elem, nodeId, nodeId2Node) + 1
                 elif isinstance(value, dict):
-                    nodeId2Node[nodeId] = copy.deepcopy(value)
+                    nodeId2Node[nodeId] = value
                     nodeId = assignIdsToNodes(value, nodeId, nodeId2Node) + 1
     
     return nodeId+1
 
+def nodeSignatures(nodes: list, signatures: dict):
+    """This function computes the compact signatures of the nodes. Two
+    nodes have the same signature if and only if their strings are the
+    same, so the signatures can be aligned instead of the strings.
+
+    args:
+        nodes (list): list of nodes from assignIdsToNodes.
+        signatures (dict): table of the signatures, shared by all the
+        asts whose signatures are compared.
+
+    returns:
+        (list) list of node signatures.
+    """
+
+    # id() of the visited nodes to their signatures.
+    visited = {}
+
+    return [nodeSignature(node, signatures, visited) for node in nodes]
+
+def nodeSignature(node, signatures: dict, visited: dict):
+    """This function computes the signature of the node bottom-up. A dict
+    is given the number of its (key, signature of value) tuple in the table,
+    a list the tuple of its signatures, and any other value its repr.
+
+    args:
+        node: node to compute the signature of.
+        signatures (dict): table of the signatures.
+        visited (dict): id() of the visited nodes to their signatures.
+
+    returns:
+        signature of the node.
+    """
+
+    if isinstance(node, dict):
+        if id(node) not in visited:
+            fields = tuple(
+                (key, nodeSignature(value, signatures, visited))
+                for key, value in node.items())
+            visited[id(node)] = signatures.setdefault(fields, len(signatures))
+        return visited[id(node)]
+    elif isinstance(node, list):
+        return tuple(nodeSignature(elem, signatures, visited) for elem in node)
+
+    return repr(node)
+
 def astEditor(
         ast: dict, target_node_id: int, lang_info: dict,
         nodeId: int, skip_ids: set, function_names: set,
@@ -154,6 +207,129 @@ def astEditor(
 
     return nodeId + 1
 
+def indexTree(ast: dict, skip_ids: set):
+    """This function indexes the nodes of the ast in a single traversal,
+    with the same node ids as astEditor. A node id is indexed with the
+    node that astEditor edits for it and the parent passed to edit_node.
+
+    args:
+        ast (dict): ast to index.
+        skip_ids (set): set of node ids to skip, from treeScanner.
+
+    returns:
+        (NodeIndex) index of the nodes.
+    """
+
+    index = NodeIndex.NodeIndex(ast)
+
+    nodeId = nodeIndexer(ast, 1, index, skip_ids, 0)
+
+    return index
+
+def nodeIndexer(ast: dict, nodeId: int, index, skip_ids: set, level: int):
+    """This function traverses the ast in the order of astEditor and
+    indexes the node of every node id.
+
+    args:
+        ast (dict): ast to scan.
+        nodeId (int): tree nodeId.
+        index (NodeIndex): index of the nodes.
+        skip_ids (set): set of node ids to skip.
+        level (int): depth of the node in the tree.
+
+    returns:
+        (int) tree nodeId.
+    """
+
+    if ast:
+        if type(ast) == dict:
+            for key, value in ast.items():
+                if isinstance(value, list):
+                    if value:
+                        for elemIdx, elem in enumerate(value):
+                            if type(elem) == dict:
+                                index.Locate(elem, ast, key, elemIdx)
+                            nodeId = nodeIndexer(
+                                    elem, nodeId, index, skip_ids, level+1) + 1
+                elif isinstance(value, dict):
+                    index.Locate(value, ast, key, NodeIndex.NO_INDEX)
+                    # astEditor edits the first node it meets with the target
+                    # node id, so a node id is indexed only once.
+                    if not index.Has(nodeId):
+                        index.Set(
+                                nodeId, value, ast, key, NodeIndex.NO_INDEX,
+                                value.get('_nodetype'), level+1, nodeId in skip_ids)
+                    nodeId = nodeIndexer(
+                            value, nodeId, index, skip_ids, level+1) + 1
+
+    if '_nodetype' in ast and not index.Has(nodeId):
+        parent, key, elemIdx = index.locations[id(ast)]
+        # The node is edited as its own parent.
+        index.Set(
+                nodeId, ast, ast, key, elemIdx, ast['_nodetype'], level,
+                nodeId in skip_ids)
+
+    return nodeId + 1
+
+def indexedAstEditor(
+        index, target_node_id: int, lang_info: dict, function_names: set,
+        nodetypes: dict, labels: set, edited_nodeId: list):
+    """This function edits the target node, as astEditor does, on a copy
+    of the indexed ast, where only the path to the target node is copied.
+    The target node is found by the index instead of a tree traversal.
+
+    args:
+        index (NodeIndex): index of the seed ast.
+        target_node_id (int): target node id to edit.
+        lang_info (dict): language information.
+        function_names (set): set of function names in the code.
+        nodetypes (dict): node types that we handle and skip.
+        labels (set): lable IDs from Label nodes.
+        edited_nodeId (list): a single element list that holds
+        the id of edited node.
+
+    returns:
+        (dict) edited copy of the ast.
+    """
+
+    if not index.Has(target_node_id):
+        return dict(index.root)
+
+    ast_copy, parent_copy, node_copy = pathCopy(index, target_node_id)
+
+    is_edited = edit_node(
+            parent_copy, node_copy, lang_info,
+            function_names, nodetypes, labels)
+    if is_edited:
+        edited_nodeId[0] = target_node_id
+
+    return ast_copy
+
+def pathCopy(index, target_node_id: int):
+    """This function makes a copy-on-write copy of the indexed ast for
+    editing the node of the target node id. Only the nodes on the path
+    from the root to the node are copied, and the node is copied deeply,
+    as the modifiers also change its children, e.g., the quals and the
+    type names. The parent that edit_node gets is on the path, or is the
+    node itself, so it is a copy as well.
+
+    args:
+        index (NodeIndex): index of the ast.
+        target_node_id (int): target node id to edit.
+
+    returns:
+        (dict) copy of the ast.
+        (dict) copy of the parent of the node.
+        (dict) copy of the node.
+    """
+
+    node = index.nodes[target_node_id]
+    parent = index.parents[target_node_id]
+
+    ast_copy, copies = PathCopy.PathCopy(index.root, index.Path(target_node_id))
+
+    return ast_copy, copies[id(parent)], copies[id(node)]
+
 def astEditorForDirectedBuggies(
         ast: dict, lang_info: dict, nodeId: int, skip_ids: set,
         function_names: set, nodetypes: dict, labels: set, nodeIds: set):
@@ -0,0 +1,35 @@
+/*
+ *  This program runs a batch of JS variants in a single d8 process.
+ *  Usage: d8 [flags] JSBatchD8.js -- <token> <path> [<path> ...]
+ *  Each variant runs in a fresh realm (Realm.create), so the variants do
+ *  not share the global object. The output of each variant is delimited
+ *  by the token lines: "<token>:BEGIN:<index>" and
+ *  "<token>:END:<index>:<status>:<milliseconds>". A variant that schedules
+ *  a timer would outlive its realm, so it is reported as failed.
+ *
+ *  Author: Anonymous.
+ */
+
+var token = arguments[0];
+
+for (var i = 1; i < arguments.length; i++) {
+    var status = 0;
+    var realm = Realm.create();
+
+    Realm.shared = false;
+    Realm.eval(realm, "setTimeout = function () { Realm.shared = true; };");
+
+    print(token + ":BEGIN:" + (i-1));
+    var start = Date.now();
+    try {
+        Realm.eval(realm, read(arguments[i]));
+    } catch (e) {
+        status = 1;
+    }
+    var elapsed = Date.now() - start;
+    if (Realm.shared) {
+        status = 1;
+    }
+    Realm.dispose(realm);
+    print(token + ":END:" + (i-1) + ":" + status + ":" + elapsed);
+}
@@ -0,0 +1,85 @@
+/*
+ *  This program runs a batch of JS variants in a single node process.
+ *  Usage: node [flags] JSBatchNode.js <token> <path> [<path> ...]
+ *  Each variant runs in a fresh context (vm.createContext), so the
+ *  variants do not share the global object. As in a fresh node process,
+ *  the context has the host globals of node, and the variant runs as a
+ *  CommonJS module with its own require, module, and exports. The output
+ *  of each variant is delimited by the token lines: "<token>:BEGIN:<index>"
+ *  and "<token>:END:<index>:<status>:<milliseconds>". A variant that
+ *  schedules a timer would outlive its run, so it is reported as failed.
+ *
+ *  Author: Anonymous.
+ */
+
+const fs = require('fs')
+const vm = require('vm')
+const path = require('path')
+const Module = require('module')
+
+// Globals of node that are not built into a fresh context, e.g., process,
+// and the console, whose built-in version in a context prints nothing.
+const hostGlobals = Object.getOwnPropertyNames(globalThis).filter(
+    (name) => name === "console"
+              || !Object.prototype.hasOwnProperty.call(vm.runInNewContext("this"), name))
+
+var token = process.argv[2]
+var paths = process.argv.slice(3)
+var timersUsed = false
+
+function createContext() {
+    var context = vm.createContext({})
+    var contextGlobal = vm.runInContext("this", context)
+
+    for (const name of hostGlobals) {
+        Object.defineProperty(
+            contextGlobal, name, Object.getOwnPropertyDescriptor(globalThis, name))
+    }
+    contextGlobal.global = contextGlobal
+    for (const name of ["setTimeout", "setInterval", "setImmediate"]) {
+        contextGlobal[name] = function () { timersUsed = true }
+    }
+
+    return context
+}
+
+function runVariant(index) {
+    if (index >= paths.length) {
+        return
+    }
+
+    var status = 0
+    var start = Date.now()
+    timersUsed = false
+
+    process.stdout.write(token + ":BEGIN:" + index + "\n")
+    try {
+        var filename = path.resolve(paths[index])
+        var dirname = path.dirname(filename)
+        var module = new Module(filename)
+        module.filename = filename
+        module.paths = Module._nodeModulePaths(dirname)
+
+        var script = vm.compileFunction(
+            fs.readFileSync(filename, 'utf8'),
+            ['exports', 'require', 'module', '__filename', '__dirname'],
+            {parsingContext: createContext(), filename: filename})
+        script.call(
+            module.exports, module.exports, Module.createRequire(filename),
+            module, filename, dirname)
+    } catch (e) {
+        status = 1
+    }
+
+    // Let the callbacks the variant queued run before closing its output.
+    setImmediate(() => {
+        if (timersUsed) {
+            status = 1
+        }
+        process.stdout.write(
+            token + ":END:" + index + ":" + status + ":" + (Date.now() - start) + "\n")
+        runVariant(index + 1)
+    })
+}
+
+runVariant(0)
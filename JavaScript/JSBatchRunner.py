@@ -0,0 +1,190 @@
+"""
+    This file holds the batched mode for running the JS variants. Instead of
+    starting an engine process for every variant, K variants are packed into
+    a single engine process that runs the harness script. Each variant runs
+    in its own realm (d8) or context (node), and the harness delimits the
+    output and the status of each variant.
+
+    Only the clean (status 0) runs of a batch are answered. If the batch
+    crashes, times out, or prints anything outside of the delimiters
+    (cross-talk between the variants), none of its runs are answered, and
+    the caller re-runs the variants one at a time. A run that took over
+    NEAR_TIMEOUT of the timeout is not answered either, as it may time out
+    on its own, so it is re-run one at a time as well.
+
+    Before an engine runs a batch, a batch of probe scripts that print the
+    global environment is compared with the probe run in a fresh process.
+    If they differ, the variants would not see the globals of a fresh
+    process, so the batches are disabled for the engine.
+
+    Author: Anonymous.
+"""
+
+import os, sys
+import subprocess
+import threading
+import uuid
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import Shared.Sandbox as Sandbox
+import JavaScript.JSEngineHarness as JSEngineHarness
+
+# Path to the harness scripts that run a batch of variants.
+D8HARNESS = f"{currentdir}/JSBatchD8.js"
+NODEHARNESS = f"{currentdir}/JSBatchNode.js"
+# Engine kind to the harness script followed by its argument separator.
+HARNESSES = {"d8": [D8HARNESS, "--"], "node": [NODEHARNESS]}
+
+# Fraction of the timeout over which a batch run is re-run one at a time.
+NEAR_TIMEOUT = 0.5
+
+# Engine command (without the script path) to whether it can run batches.
+BATCHABLE = {}
+BATCHABLE_LOCK = threading.Lock()
+
+def GetHarness(commandPrefix: list):
+    """This function returns the harness script for the engine and the
+    arguments to pass it, or None if the engine cannot isolate the variants
+    from each other.
+
+    args:
+        commandPrefix (list): engine command without the script path.
+
+    returns:
+        (list) harness script followed by its argument separator, if any.
+    """
+
+    return HARNESSES.get(JSEngineHarness.EngineKind(commandPrefix))
+
+def ParseOutput(stdout: str, token: str, size: int):
+    """This function splits the batch output into the outputs of the variants.
+
+    args:
+        stdout (str): stdout of the batch.
+        token (str): token of the batch delimiters.
+        size (int): number of variants in the batch.
+
+    returns:
+        (list) list of (status, stdout, milliseconds) per variant, or None if
+        the output is cut off or has anything outside of the delimiters.
+    """
+
+    outputs = []
+    lines = iter(stdout.splitlines(keepends=True))
+    for variant in range(size):
+        parsed = JSEngineHarness.ReadDelimited(
+                    lines, f"{token}:BEGIN:{variant}", f"{token}:END:{variant}:",
+                    strict=True)
+        if not parsed:
+            return None
+        variantOut, rest = parsed
+        status, elapsed = rest.split(":")
+        outputs.append((int(status), variantOut, int(elapsed)))
+
+    if next(lines, None) != None:
+        return None
+
+    return outputs
+
+def RunHarness(commandPrefix: list, harness: list, paths: list, limits: Sandbox.Limits):
+    """This function runs the batch of variants on the harness in a single
+    engine process.
+
+    args:
+        commandPrefix (list): engine command without the script path.
+        harness (list): harness script followed by its argument separator.
+        paths (list): list of variant paths.
+        limits (Limits): limits of a single variant run.
+
+    returns:
+        (list) list of CompletedProcess per variant, where None means that
+        the variant has to be run in a fresh process.
+    """
+
+    token = uuid.uuid4().hex
+    commands = commandPrefix + harness + [token] + paths
+
+    # The batch gets the time of all its variants.
+    batchLimits = Sandbox.Limits(
+                    limits.timeout * len(paths), limits.memoryMB,
+                    limits.cpuSeconds * len(paths))
+    output = Sandbox.Run(commands, batchLimits)
+    if output.timed_out or output.returncode != 0:
+        return [None] * len(paths)
+
+    outputs = ParseOutput(output.stdout, token, len(paths))
+    if not outputs:
+        return [None] * len(paths)
+
+    results = []
+    for path, (status, stdout, elapsed) in zip(paths, outputs):
+        if status == 0 and elapsed <= limits.timeout * NEAR_TIMEOUT * 1000:
+            results.append(subprocess.CompletedProcess(commandPrefix + [path], 0, stdout, ""))
+        else:
+            results.append(None)
+
+    return results
+
+def SameEnvironment(commandPrefix: list, harness: list, limits: Sandbox.Limits):
+    """This function runs a batch of two probe scripts and the probe script
+    in a fresh process, and compares what the runs see of their globals.
+
+    args:
+        commandPrefix (list): engine command without the script path.
+        harness (list): harness script followed by its argument separator.
+        limits (Limits): limits of the runs.
+
+    returns:
+        (bool) True if every probe in the batch prints the same as the
+        probe in the fresh process.
+    """
+
+    return JSEngineHarness.SameEnvironment(
+            commandPrefix, limits,
+            lambda probe: RunHarness(commandPrefix, harness, [probe, probe], limits))
+
+def Batchable(commandPrefix: list, harness: list, limits: Sandbox.Limits):
+    """This function checks, once per engine command, whether the variants
+    see the globals of a fresh process in a batch.
+
+    args:
+        commandPrefix (list): engine command without the script path.
+        harness (list): harness script followed by its argument separator.
+        limits (Limits): limits of the runs.
+
+    returns:
+        (bool) True if the engine can run batches.
+    """
+
+    key = tuple(commandPrefix)
+    with BATCHABLE_LOCK:
+        if key not in BATCHABLE:
+            BATCHABLE[key] = SameEnvironment(commandPrefix, harness, limits)
+            if not BATCHABLE[key]:
+                print (
+                    f"   |__ Batches disabled for {' '.join(key)}: "
+                    f"their globals differ from a fresh process")
+
+    return BATCHABLE[key]
+
+def Run(commandPrefix: list, paths: list, limits: Sandbox.Limits):
+    """This function runs the batch of variants in a single engine process.
+
+    args:
+        commandPrefix (list): engine command without the script path.
+        paths (list): list of variant paths.
+        limits (Limits): limits of a single variant run.
+
+    returns:
+        (list) list of CompletedProcess per variant, where None means that
+        the variant has to be run in a fresh process.
+    """
+
+    harness = GetHarness(commandPrefix)
+    if not harness or not Batchable(commandPrefix, harness, limits):
+        return [None] * len(paths)
+
+    return RunHarness(commandPrefix, harness, paths, limits)
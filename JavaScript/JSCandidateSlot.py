@@ -0,0 +1,161 @@
+"""
+    This file holds the per-worker slots where the candidate variants are
+    written to be run. The code of a candidate goes from its in-memory AST
+    straight to the slot, a file on tmpfs (/dev/shm) owned by the worker
+    thread, so no AST is written to disk for a candidate, and the candidates
+    of the parallel workers never overwrite each other. Only the accepted
+    variants are persisted by the generators.
+
+    If the seed is set, the code of a candidate is patched from the seed
+    code (JSSourcePatcher.py), and the full code generation is used only
+    for the candidates that cannot be patched. The generators persist the
+    code of an accepted candidate as it was written to the slot, so the
+    saved variant is the program that was run.
+
+    Author: Anonymous.
+"""
+
+import os, sys
+import atexit
+import tempfile
+import threading
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import JavaScript.JSCodeGenServer as JSCodeGenServer
+import JavaScript.JSNativeCodeGenerator as JSNativeCodeGenerator
+import JavaScript.JSSourcePatcher as JSSourcePatcher
+
+# Directory of the slots. None uses tmpfs if available.
+SLOT_DIR = None
+# Memory-backed file system for the slots.
+TMPFS = "/dev/shm"
+
+# The slot of the current thread.
+SLOTS = threading.local()
+# All slot paths, removed at exit.
+SLOT_PATHS = set()
+SLOT_LOCK = threading.Lock()
+
+# The seed the candidates are patched from, if any.
+SEED = None
+
+def SetSeed(seedCode: str, seedAst: dict=None):
+    """This function sets the seed the candidates are patched from.
+
+    args:
+        seedCode (str): source code of the seed, or None to always use
+        the full code generation.
+        seedAst (dict): AST of the seed the candidates are copied from, if any.
+
+    returns:
+        None.
+    """
+
+    global SEED
+
+    SEED = JSSourcePatcher.SeedSource(seedCode, seedAst) if seedCode != None else None
+
+def GetSlotDir():
+    """This function returns the directory of the slots.
+
+    returns:
+        (str) path to the directory.
+    """
+
+    if SLOT_DIR:
+        return SLOT_DIR
+    elif os.path.isdir(TMPFS) and os.access(TMPFS, os.W_OK):
+        return TMPFS
+
+    return tempfile.gettempdir()
+
+def SlotPath():
+    """This function returns the slot of the current worker thread.
+
+    returns:
+        (str) path to the slot.
+    """
+
+    path = getattr(SLOTS, "path", None)
+    if not path:
+        path = f"{GetSlotDir()}/dpgen-candidate-{os.getpid()}-{threading.get_ident()}.js"
+        SLOTS.path = path
+        with SLOT_LOCK:
+            SLOT_PATHS.add(path)
+
+    return path
+
+def GenerateCandidate(ast: dict):
+    """This function generates the code of the candidate AST, patched from
+    the seed code if the seed is set.
+
+    args:
+        ast (dict): AST of the candidate.
+
+    returns:
+        (str) code of the candidate, or None if the AST is not valid.
+    """
+
+    if SEED:
+        try:
+            code = JSSourcePatcher.Patch(SEED, ast)
+        except JSNativeCodeGenerator.InvalidAST as e:
+            print (f"ERROR: JSNativeCodeGenerator.py: {e}", file=sys.stderr)
+            return None
+        except JSNativeCodeGenerator.Unsupported:
+            code = None
+        except Exception as e:
+            print (
+                f"ERROR: JSSourcePatcher.py: {type(e).__name__}: {e}, "
+                f"falling back to the full code generation", file=sys.stderr)
+            code = None
+        if code != None:
+            return code
+
+    return JSCodeGenServer.GenerateAST(ast)
+
+def WriteCode(code: str):
+    """This function writes the code to the slot of the current worker thread.
+
+    args:
+        code (str): code of the candidate.
+
+    returns:
+        (str) path to the slot.
+    """
+
+    path = SlotPath()
+    with open(path, 'w') as f:
+        f.write(code)
+
+    return path
+
+def WriteCandidate(ast: dict):
+    """This function generates the code of the candidate AST and writes it
+    to the slot of the current worker thread.
+
+    args:
+        ast (dict): AST of the candidate.
+
+    returns:
+        (str) path to the slot, or None if the AST is not valid.
+    """
+
+    code = GenerateCandidate(ast)
+    if code == None:
+        return None
+
+    return WriteCode(code)
+
+@atexit.register
+def RemoveSlots():
+    with SLOT_LOCK:
+        for path in SLOT_PATHS:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        SLOT_PATHS.clear()
@@ -0,0 +1,241 @@
+"""
+    This file holds the long-lived code generation service. Instead of
+    starting node for every AST to convert, a single `node JSCodeGenerator.js
+    --server` process receives one AST JSON per line and answers with the
+    generated code, so the node startup is paid once per run.
+
+    With the "native" code generator, the ASTs are converted in Python by
+    JSNativeCodeGenerator.py, which generates the same code as escodegen,
+    and node is used only for the ASTs that it does not handle.
+
+    Author: Anonymous.
+"""
+
+import os
+import atexit
+import json
+import subprocess
+import sys
+import threading
+
+# Executable command for nodeJS.
+NODEJS = "node"
+# Path to JSCodeGenerator.js code.
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+JSCODEGENERATOR = f"{currentdir}/JSCodeGenerator.js"
+
+import JavaScript.JSNativeCodeGenerator as JSNativeCodeGenerator
+
+# Code generators to select from.
+ESCODEGEN = "escodegen"
+NATIVE = "native"
+
+# The code generator used by GenerateAST, GenerateFile, and GenerateBatch.
+CODE_GENERATOR = ESCODEGEN
+
+# The single service used by GenerateCode.
+SERVER = None
+SERVER_LOCK = threading.Lock()
+
+class CodeGenServer:
+    """A single long-lived node process running JSCodeGenerator.js --server."""
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+                [NODEJS, JSCODEGENERATOR, "--server"], stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE, text=True, encoding="utf-8")
+
+    def IsAlive(self):
+        return self.process.poll() == None
+
+    def Generate(self, astJson: str):
+        """This function sends the AST to the service and reads back the code.
+
+        args:
+            astJson (str): AST in JSON.
+
+        returns:
+            (dict) {"code": <code>} or {"error": <message>}, or None if the
+            service died.
+        """
+
+        # JSON strings cannot hold raw newlines, so every newline of the
+        # JSON text is whitespace between the tokens.
+        line = astJson.replace("\r", " ").replace("\n", " ")
+
+        try:
+            self.process.stdin.write(f"{line}\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            return None
+
+        response = self.process.stdout.readline()
+        if not response:
+            return None
+
+        return json.loads(response)
+
+    def Close(self):
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.process.kill()
+        self.process.wait()
+
+def GenerateCode(astJson: str):
+    """This function generates the JS code of the AST on the service. A dead
+    service is restarted once.
+
+    args:
+        astJson (str): AST in JSON.
+
+    returns:
+        (str) generated JS code, or None if the AST is not valid.
+    """
+
+    global SERVER
+
+    with SERVER_LOCK:
+        for attempt in range(2):
+            if not SERVER or not SERVER.IsAlive():
+                SERVER = CodeGenServer()
+            response = SERVER.Generate(astJson)
+            if response != None:
+                break
+            SERVER.Close()
+            SERVER = None
+
+    assert (
+        response != None
+    ), "ERROR: JSCodeGenerator.js service is not responding."
+
+    if "error" in response:
+        print (f"ERROR: JSCodeGenerator.js: {response['error']}", file=sys.stderr)
+        return None
+
+    return response["code"]
+
+def Configure(codeGenerator: str=ESCODEGEN):
+    """This function selects the code generator.
+
+    args:
+        codeGenerator (str): "escodegen" for JSCodeGenerator.js, or "native"
+        for JSNativeCodeGenerator.py.
+
+    returns:
+        None.
+    """
+
+    global CODE_GENERATOR
+
+    assert (
+        codeGenerator in (ESCODEGEN, NATIVE)
+    ), f"ERROR: Unknown code generator {codeGenerator}."
+
+    CODE_GENERATOR = codeGenerator
+
+def GenerateAST(ast: dict):
+    """This function generates the JS code of the AST with the selected code
+    generator. The native generator falls back to the service for the ASTs
+    it does not handle. Any other error of the native generator is a bug of
+    it, so it is logged before falling back.
+
+    args:
+        ast (dict): AST.
+
+    returns:
+        (str) generated JS code, or None if the AST is not valid.
+    """
+
+    if CODE_GENERATOR == NATIVE:
+        try:
+            return JSNativeCodeGenerator.Generate(ast)
+        except JSNativeCodeGenerator.InvalidAST as e:
+            print (f"ERROR: JSNativeCodeGenerator.py: {e}", file=sys.stderr)
+            return None
+        except JSNativeCodeGenerator.Unsupported:
+            pass
+        except Exception as e:
+            print (
+                f"ERROR: JSNativeCodeGenerator.py: {type(e).__name__}: {e}, "
+                f"falling back to JSCodeGenerator.js", file=sys.stderr)
+
+    return GenerateCode(json.dumps(ast))
+
+def GenerateFromFile(astpath: str):
+    """This function generates the JS code of the AST file.
+
+    args:
+        astpath (str): path to ast file.
+
+    returns:
+        (str) generated JS code, or None if the AST is not valid.
+    """
+
+    with open(astpath) as f:
+        if CODE_GENERATOR == NATIVE:
+            return GenerateAST(json.load(f))
+
+        return GenerateCode(f.read())
+
+def GenerateFile(astpath: str, jspath: str):
+    """This function generates the JS code of the AST file and writes it.
+    As with a JSCodeGenerator.js run, nothing is written if the AST is not valid.
+
+    args:
+        astpath (str): path to ast file.
+        jspath (str): path to javascript file path.
+
+    returns:
+        (bool) True if the code was written.
+    """
+
+    code = GenerateFromFile(astpath)
+    if code == None:
+        return False
+
+    with open(jspath, 'w') as f:
+        f.write(code)
+
+    return True
+
+def GenerateBatch(outputDir: str, astFilePaths: list):
+    """This function converts all AST files in a single JSCodeGenerator.js run.
+
+    args:
+        outputDir (str): directory where the JS files will be stored.
+        astFilePaths (list): list of AST file paths or directories.
+
+    returns:
+        None.
+    """
+
+    if not astFilePaths:
+        return
+
+    if CODE_GENERATOR != NATIVE:
+        subprocess.run([NODEJS, JSCODEGENERATOR, "--batch", outputDir] + astFilePaths)
+        return
+
+    # As with JSCodeGenerator.js --batch, a directory stands for its .json files.
+    for path in astFilePaths:
+        if os.path.isdir(path):
+            files = [f"{path}/{name}" for name in sorted(os.listdir(path))
+                     if name.endswith(".json")]
+        else:
+            files = [path]
+        for astpath in files:
+            name, ext = os.path.splitext(os.path.basename(astpath))
+            GenerateFile(astpath, f"{outputDir}/{name}.js")
+
+@atexit.register
+def Shutdown():
+    global SERVER
+
+    with SERVER_LOCK:
+        if SERVER:
+            SERVER.Close()
+            SERVER = None
@@ -2,34 +2,99 @@
  *  This program convers AST tree into JS Code, if valid.
  *  It uses escodegen (https://github.com/estools/escodegen).
  *
+ *  Usage:
+ *    node JSCodeGenerator.js <ast file> <js file>
+ *      Converts a single AST file.
+ *    node JSCodeGenerator.js --batch <output dir> <ast file or dir> ...
+ *      Converts all AST files (every .json file of a directory) in one
+ *      invocation. The code of <name>.json is written to <output dir>/<name>.js.
+ *    node JSCodeGenerator.js --server
+ *      Reads one AST JSON per line from stdin, and writes one JSON line per
+ *      AST to stdout, either {"code": <code>} or {"error": <message>}.
+ *
  *  Author: Anonymous.
  */
 
 
 const fs = require('fs')
+const path = require('path')
+const readline = require('readline')
 const escodegen = require('escodegen');
 
 var cmd_argument = process.argv
 
-if (cmd_argument.length > 4) {
-    throw "ERROR: Too many command-line arguments."
+function batch(output_dir, inputs) {
+    var ast_files = []
+    for (var input of inputs) {
+        if (fs.statSync(input).isDirectory()) {
+            for (var f of fs.readdirSync(input).sort()) {
+                if (f.endsWith(".json")) {
+                    ast_files.push(path.join(input, f))
+                }
+            }
+        } else {
+            ast_files.push(input)
+        }
+    }
+
+    var failed = 0
+    for (var ast_file of ast_files) {
+        var name = path.basename(ast_file, path.extname(ast_file))
+        try {
+            var ast = JSON.parse(fs.readFileSync(ast_file, 'utf8'))
+            fs.writeFileSync(path.join(output_dir, name + ".js"), escodegen.generate(ast))
+        } catch (e) {
+            // A single invalid AST does not stop the rest of the batch.
+            console.error(`ERROR: ${ast_file}: ${e}`)
+            failed += 1
+        }
+    }
+
+    process.exitCode = failed > 0 ? 1 : 0
 }
 
-var input_file  = cmd_argument[2]
-var output_file = cmd_argument[3]
-
-fs.readFile(input_file, (err, data) => { 
-    if (err) throw err; 
-   
-    var string_ast = data.toString();
-    // Convert read in syntax tree in a string type to JSON for parsing. 
-    ast = JSON.parse(string_ast);
-    // Generate JS code from AST.
-    var code = escodegen.generate(ast);
-
-    fs.writeFile(output_file, code, function(err) {
-        if (err) {
-            return console.error(err);
+function server() {
+    var input = readline.createInterface({input: process.stdin, terminal: false})
+
+    input.on('line', (line) => {
+        if (line === "") {
+            return
+        }
+        var response
+        try {
+            response = {code: escodegen.generate(JSON.parse(line))}
+        } catch (e) {
+            response = {error: String(e)}
         }
-    });
-})
+        process.stdout.write(JSON.stringify(response) + "\n")
+    })
+}
+
+if (cmd_argument[2] === "--server") {
+    server()
+} else if (cmd_argument[2] === "--batch") {
+    batch(cmd_argument[3], cmd_argument.slice(4))
+} else {
+    if (cmd_argument.length > 4) {
+        throw "ERROR: Too many command-line arguments."
+    }
+
+    var input_file  = cmd_argument[2]
+    var output_file = cmd_argument[3]
+
+    fs.readFile(input_file, (err, data) => { 
+        if (err) throw err; 
+       
+        var string_ast = data.toString();
+        // Convert read in syntax tree in a string type to JSON for parsing. 
+        ast = JSON.parse(string_ast);
+        // Generate JS code from AST.
+        var code = escodegen.generate(ast);
+
+        fs.writeFile(output_file, code, function(err) {
+            if (err) {
+                return console.error(err);
+            }
+        });
+    })
+}
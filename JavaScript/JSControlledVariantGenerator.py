@@ -20,6 +20,27 @@ sys.path.append(parentdir)
 import JavaScript.JSAstGenerator as JSAstG
 import JavaScript.SharedEditors as Shared
 import JavaScript.JSVariantLearning as JSVariantLearning
+import JavaScript.JSCandidateSlot as JSCandidateSlot
+import Shared.VariantDelta as VariantDelta
+
+# Persistent store of the fingerprints and verdicts of the candidates of
+# the seed (Shared/FingerprintStore.py). None runs every candidate.
+FINGERPRINTS = None
+
+def SetFingerprintStore(store):
+    """This function sets the store the verdicts of the candidates are
+    looked up in and recorded to.
+
+    args:
+        store (FingerprintStore): store of the seed, or None.
+
+    returns:
+        None.
+    """
+
+    global FINGERPRINTS
+
+    FINGERPRINTS = store
 
 def GenerateInputs(
         root_path: str, user_n: int, 
@@ -82,7 +103,13 @@ def GenerateNonBuggies(
         None.
     """
 
-    astVariants = []
+    # Holds the generated variants as their edits to the seed.
+    astVariants = VariantDelta.VariantStore(seed_ast)
+    # Variant id to the code that was run.
+    codes = {}
+
+    # Indexes the seed once for targeting the nodes.
+    index = Shared.indexTree(seed_ast)
 
     id2edit = {}
     generated = 0
@@ -91,36 +118,33 @@ def GenerateNonBuggies(
         if generated == user_n:
             break
         else:
-            ast_copy = copy.deepcopy(seed_ast)
             target_node_id = getTargetNodeId(targetNodeIds, targetNodeIds_idx)
             # Since we are sharing the ast_editor function, which returns 
             # a boolean value to indicate whether we need a new target id 
             # or not used in the random AST editor (Phase-1) but not in this 
             # controlled AST editor, we just add a place holder, dummy, to receive the value.
             # This dummy is not being used in anywhere.
-            dummy = Shared.ast_editor(ast_copy, target_node_id, language_info, id2edit)
-            is_buggy = checkGenerated(ast_copy, rootPath, jitOnCommand, jitOffCommand)
-
-            if (
-                    ast_copy != seed_ast and 
-                    ast_copy not in astVariants
-                    and not is_buggy
-            ):
-                astVariants.append(ast_copy)
-                generated += 1
+            # The variant shares all but the edited path with the seed.
+            ast_copy, dummy = Shared.indexedEditor(
+                                index, target_node_id, language_info, id2edit)
+            fingerprint = astVariants.Fingerprint(ast_copy)
+            verdict, code = checkGenerated(
+                                ast_copy, rootPath, jitOnCommand, jitOffCommand, fingerprint)
+
+            # The variant is added only if it is neither the seed nor a duplicate.
+            if verdict == JSVariantLearning.NONBUGGY:
+                variantId = astVariants.Add(ast_copy, [target_node_id], fingerprint)
+                if variantId != None:
+                    codes[variantId] = code
+                    generated += 1
 
-    astFilePaths = []
     ipt_id = 1
-    for ast in astVariants:
-        variantFilePath = f"{astDirPath}/{fileBase}-variant__{ipt_id}.json"
-        astFilePaths.append(variantFilePath)
-        with open(variantFilePath, 'w') as ast_f:
-            json.dump(ast, ast_f)
+    for variantId in astVariants.Ids():
+        saveVariant(
+            astVariants.Materialize(variantId), codes[variantId], inputsPath,
+            astDirPath, fileBase, ipt_id)
         ipt_id += 1
 
-    # Generate JS code variants based on the generated AST variants.
-    Shared.JSCodeGenerator(inputsPath, astFilePaths)
-
     return ipt_id
 
 def GenerateBuggies(
@@ -146,40 +170,40 @@ def GenerateBuggies(
         None.
     """
 
-    astVariants = []
+    # Holds the generated variants as their edits to the seed.
+    astVariants = VariantDelta.VariantStore(seed_ast)
+    # Variant id to the code that was run.
+    codes = {}
 
     generated = 0
     for i in range(1, 201):
         if generated == user_n:
             break
         else:
+            # Almost every node is edited, so the whole AST is copied.
             ast_copy = copy.deepcopy(seed_ast)
             is_loop_edit = [False]
             dummy = Shared.treeModifier2(
                         ast_copy, 1, targetNodeIds, language_info, is_loop_edit,
                         jitOnCommand, jitOffCommand)
-            is_buggy = checkGenerated(ast_copy, rootPath, jitOnCommand, jitOffCommand)
-
-            if (
-                    ast_copy != seed_ast and 
-                    ast_copy not in astVariants
-                    and is_buggy
-            ):
-                astVariants.append(ast_copy)
-                generated += 1
+            fingerprint = astVariants.Fingerprint(ast_copy)
+            verdict, code = checkGenerated(
+                                ast_copy, rootPath, jitOnCommand, jitOffCommand, fingerprint)
+
+            # The variant is added only if it is neither the seed nor a duplicate.
+            if verdict == JSVariantLearning.BUGGY:
+                variantId = astVariants.Add(ast_copy, None, fingerprint)
+                if variantId != None:
+                    codes[variantId] = code
+                    generated += 1
 
-    astFilePaths = []
     ipt_id = last_ipt_id
-    for ast in astVariants:
-        variantFilePath = f"{astDirPath}/{fileBase}-variant__{ipt_id}.json"
-        astFilePaths.append(variantFilePath)
-        with open(variantFilePath, 'w') as ast_f:
-            json.dump(ast, ast_f)
+    for variantId in astVariants.Ids():
+        saveVariant(
+            astVariants.Materialize(variantId), codes[variantId], inputsPath,
+            astDirPath, fileBase, ipt_id)
         ipt_id += 1
 
-    # Generate JS code variants based on the generated AST variants.
-    Shared.JSCodeGenerator(inputsPath, astFilePaths)
-
     return ipt_id
 
 def ControlledVariantGenerator(
@@ -205,23 +229,17 @@ def ControlledVariantGenerator(
         None.
     """
 
-    astFilePaths = []
-
-    astVariants = controlledASTVariantGenerator(
-                    originalAST, number, langInfo, targetNodeIds,
-                    rootPath, jitOnCommand, jitOffCommand)
+    astVariants, codes = controlledASTVariantGenerator(
+                            originalAST, number, langInfo, targetNodeIds,
+                            rootPath, jitOnCommand, jitOffCommand)
 
     variantId = 1
-    for astVariant in astVariants:
-        variantFilePath = f"{astDirPath}/{fileBase}-variant__{variantId}.json"
-        astFilePaths.append(variantFilePath)
-        with open(variantFilePath, 'w') as ast_f:
-            json.dump(astVariant, ast_f)
+    for astVariantId in astVariants.Ids():
+        saveVariant(
+            astVariants.Materialize(astVariantId), codes[astVariantId], inputsPath,
+            astDirPath, fileBase, variantId)
         variantId += 1
 
-    # Generate JS code variants based on the generated AST variants.
-    Shared.JSCodeGenerator(inputsPath, astFilePaths)
-
     return variantId
 
 def controlledASTVariantGenerator(
@@ -237,10 +255,16 @@ def controlledASTVariantGenerator(
         rootPath (str): root directory path.
 
     returns:
-        (list) list of AST variants.
+        (VariantStore) deltas of the AST variants.
+        (dict) variant id to the code that was run.
     """
 
-    astVariants = []
+    # Holds the generated variants as their edits to the original AST.
+    astVariants = VariantDelta.VariantStore(originalAST)
+    codes = {}
+
+    # Indexes the original AST once for targeting the nodes.
+    index = Shared.indexTree(originalAST)
 
     generated = 1
 
@@ -252,7 +276,6 @@ def controlledASTVariantGenerator(
         if generated == number*2:
             break
         else:
-            ast_copy = copy.deepcopy(originalAST)
             target_node_id = getTargetNodeId(targetNodeIds, targetNodeIds_idx)
 
             if flag:
@@ -261,23 +284,39 @@ def controlledASTVariantGenerator(
                 # or not used in the random AST editor (Phase-1) but not in this 
                 # controlled AST editor, we just add a place holder, dummy, to receive the value.
                 # This dummy is not being used in anywhere.
-                dummy = Shared.ast_editor(ast_copy, target_node_id, langInfo, id2edit)
-                is_buggy = checkGenerated(ast_copy, rootPath, jitOnCommand, jitOffCommand)
+                # The variant shares all but the edited path with the seed.
+                ast_copy, dummy = Shared.indexedEditor(
+                                    index, target_node_id, langInfo, id2edit)
+                fingerprint = astVariants.Fingerprint(ast_copy)
+                verdict, code = checkGenerated(
+                                    ast_copy, rootPath, jitOnCommand, jitOffCommand,
+                                    fingerprint)
                 flag = False
             else:
+                # Almost every node is edited, so the whole AST is copied.
+                ast_copy = copy.deepcopy(originalAST)
                 is_loop_edit = [False]
                 dummy = Shared.treeModifier2(
                             ast_copy, 1, targetNodeIds, langInfo, is_loop_edit,
                             jitOnCommand, jitOffCommand)
-                is_buggy = checkGenerated(ast_copy, rootPath, jitOnCommand, jitOffCommand)
+                fingerprint = astVariants.Fingerprint(ast_copy)
+                verdict, code = checkGenerated(
+                                    ast_copy, rootPath, jitOnCommand, jitOffCommand,
+                                    fingerprint)
                 flag = True
 
-            if (ast_copy != originalAST and ast_copy not in astVariants):
-                if ((not flag and not is_buggy) or (flag and is_buggy)):
-                    astVariants.append(ast_copy)
+            # The variant is added only if it is neither the original nor a duplicate.
+            if (
+                    (not flag and verdict == JSVariantLearning.NONBUGGY)
+                    or (flag and verdict == JSVariantLearning.BUGGY)
+            ):
+                variantId = astVariants.Add(
+                                ast_copy, [target_node_id] if not flag else None, fingerprint)
+                if variantId != None:
+                    codes[variantId] = code
                     generated += 1
 
-    return astVariants
+    return astVariants, codes
 
 def getTargetNodeId(targetNodeIds: list, targetNodeIds_idx: list):
     """This function returns the target node id for the editor to target.
@@ -298,33 +337,77 @@ def getTargetNodeId(targetNodeIds: list, targetNodeIds_idx: list):
 
     return target_id
 
-def checkGenerated(ast_copy: dict, rootPath: str, jitOnCommand: list, jitOffCommand: list):
+def saveVariant(
+        ast: dict, code: str, inputsPath: str, astDirPath: str, fileBase: str, ipt_id: int):
+    """This function writes the AST of the accepted variant and the code
+    that was run to judge it.
+
+    args:
+        ast (dict): AST of the variant.
+        code (str): code of the variant that was run.
+        inputsPath (str): directory where all input variants will be stored.
+        astDirPath (str): directory where all asts will be stored.
+        fileBase (str): name of the original input file without the extension.
+        ipt_id (int): id of the input.
+
+    returns:
+        None.
     """
+
+    with open(f"{astDirPath}/{fileBase}-variant__{ipt_id}.json", 'w') as ast_f:
+        json.dump(ast, ast_f)
+    with open(f"{inputsPath}/{fileBase}-variant__{ipt_id}.js", 'w') as js_f:
+        js_f.write(code)
+
+def checkGenerated(
+        ast_copy: dict, rootPath: str, jitOnCommand: list, jitOffCommand: list,
+        fingerprint: str=None):
+    """This function generates the code of the AST variant and runs it with and
+    without JIT compilation. If the variant was classified in an earlier run,
+    its verdict is taken from the fingerprint store instead.
+
+    args:
+        ast_copy (dict): AST variant.
+        rootPath (str): root directory path.
+        jitOnCommand (list): command to execute VM with jit compilation on.
+        jitOffCommand (list): command to execute VM with jit compilation off.
+        fingerprint (str): fingerprint of the variant, if any.
+
+    returns:
+        (str) verdict of the variant, i.e., BUGGY, NONBUGGY, or TIMEOUT,
+        or None if the code of the variant could not be generated.
+        (str) code of the variant that was run, or None.
     """
 
-    temporary_ast_path = f"{rootPath}/misc/ctr_ast_temp.json"
-    with open(temporary_ast_path, 'w') as ast_f:
-        json.dump(ast_copy, ast_f)
-    temporary_js_path = f"{rootPath}/misc/ctr_js_temp.js"
+    if FINGERPRINTS != None and fingerprint != None:
+        verdict = FINGERPRINTS.Lookup(fingerprint)
+        if verdict != None:
+            # The code is generated the same way as when it was run.
+            code = JSCandidateSlot.GenerateCandidate(ast_copy)
+            return (verdict, code) if code != None else (None, None)
+
+    code = JSCandidateSlot.GenerateCandidate(ast_copy)
+    if code == None:
+        return None, None
 
-    Shared.SingleJSCodeGenerator(temporary_ast_path, temporary_js_path)
+    # The candidate is written only to the slot of this worker.
+    candidate_path = JSCandidateSlot.WriteCode(code)
 
-    jitOnCommand[-1] = temporary_js_path
-    jitOffCommand[-1] = temporary_js_path
+    jitOnCommand = jitOnCommand[:-1] + [candidate_path]
+    jitOffCommand = jitOffCommand[:-1] + [candidate_path]
 
-    jitOnOut = JSVariantLearning.RunJITExe(jitOnCommand)
-    jitOffOut = JSVariantLearning.RunJITExe(jitOffCommand)
+    jitOnOut, jitOffOut = JSVariantLearning.RunDifferential(jitOnCommand, jitOffCommand)
 
-    is_buggy = True
+    # A variant that timed out is neither buggy nor non-buggy, so it
+    # is not selected by any of the generators.
+    verdict = JSVariantLearning.Verdict(jitOnOut, jitOffOut)
+
+    # Only the buggy and non-buggy verdicts are kept, and a variant that
+    # timed out is run again in the later runs.
     if (
-            str(jitOnOut.returncode) == '0' 
-            and jitOnOut.stdout == jitOffOut.stdout
-    ):
-        is_buggy = False
-    elif (
-            str(jitOnOut.returncode) != '0' 
-            and jitOnOut.stdout == jitOffOut.stdout
+            FINGERPRINTS != None and fingerprint != None
+            and verdict in (JSVariantLearning.BUGGY, JSVariantLearning.NONBUGGY)
     ):
-        is_buggy = False
+        FINGERPRINTS.Record(fingerprint, verdict)
 
-    return is_buggy
+    return verdict, code
@@ -0,0 +1,107 @@
+"""
+    This file holds the parts shared by the engine-server and the batched
+    modes for running the JS variants, where several scripts run in a single
+    engine process: the detection of the engines that can isolate the
+    scripts, the parser of the delimited output of a script, and the probe
+    check that the scripts see the globals of a fresh process.
+
+    Author: Anonymous.
+"""
+
+import os, sys
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import Shared.Sandbox as Sandbox
+
+# Path to the script that prints the global environment of a script.
+PROBE = f"{currentdir}/JSEngineServerProbe.js"
+
+def EngineKind(commandPrefix: list):
+    """This function returns the kind of the engine, or None if the engine
+    cannot isolate the scripts from each other.
+
+    args:
+        commandPrefix (list): engine command without the script path.
+
+    returns:
+        (str) "d8" or "node".
+    """
+
+    engine = os.path.basename(commandPrefix[0]).lower()
+
+    if "d8" in engine:
+        return "d8"
+    elif "node" in engine:
+        return "node"
+
+    return None
+
+def ReadDelimited(lines, begin: str, end: str, strict: bool=False):
+    """This function reads the output of a single script between its begin
+    and end markers.
+
+    args:
+        lines (iterator): lines of the engine output, with the newlines.
+        begin (str): begin marker line.
+        end (str): end marker, followed by the status of the script.
+        strict (bool): True if nothing may come before the begin marker,
+        otherwise the lines before it are skipped.
+
+    returns:
+        (str) output of the script.
+        (str) rest of the end marker line.
+        or None if the output is cut off or, when strict, has anything
+        before the begin marker.
+    """
+
+    for line in lines:
+        if line.rstrip('\n') == begin:
+            break
+        if strict:
+            return None
+    else:
+        return None
+
+    output = []
+    for line in lines:
+        if end in line:
+            # The script's output may not end with a newline, so the end
+            # marker can be in the middle of the line.
+            idx = line.index(end)
+            output.append(line[:idx])
+            return "".join(output), line[idx+len(end):].strip()
+        output.append(line)
+
+    return None
+
+def SameEnvironment(commandPrefix: list, limits: Sandbox.Limits, runProbe):
+    """This function runs the probe script in a fresh process and in the
+    shared engine process, and compares what the runs see of their globals.
+
+    args:
+        commandPrefix (list): engine command without the script path.
+        limits (Sandbox.Limits): limits of the runs.
+        runProbe (function): runs the given probe script in the shared
+        engine process, and returns the list of its outputs, where None
+        means that the run was not answered.
+
+    returns:
+        (bool) True if every probe in the shared engine process prints the
+        same as the probe in the fresh process.
+    """
+
+    fresh = Sandbox.Run(commandPrefix + [PROBE], limits)
+    if Sandbox.TimedOut(fresh) or fresh.returncode != 0:
+        return False
+
+    for output in runProbe(PROBE):
+        if (
+                output == None or Sandbox.TimedOut(output)
+                or output.returncode != 0 or output.stdout != fresh.stdout
+        ):
+            return False
+
+    return True
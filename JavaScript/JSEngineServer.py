@@ -0,0 +1,366 @@
+"""
+    This file holds the engine-server mode for running the JS variants.
+    Instead of starting a fresh d8/node process for every run, a pool of
+    long-lived engine processes receives the script paths over a pipe and
+    returns the stdout and the exit status of each script.
+
+    A script runs in its own realm (d8) or context (node), so the scripts
+    do not share globals. Only the clean runs (status 0) are answered by
+    the server. A script that throws, crashes the engine, or runs on an
+    engine that cannot isolate scripts is run in a fresh process instead,
+    so the verdicts are the same as the per-process runs. A script that
+    runs over the timeout kills its server, and is reported as timed out.
+
+    Before a pool is used, a probe script that prints the global environment
+    is run on a server and in a fresh process. If the two outputs differ,
+    the scripts would not see the same globals on the server, so the pool
+    is disabled and every run goes to a fresh process. The servers run under
+    the same memory and CPU limits as the fresh processes, where the CPU
+    limit is moved forward before every script.
+
+    Author: Anonymous.
+"""
+
+import os, sys
+import atexit
+import math
+import resource
+import subprocess
+import threading
+import uuid
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import Shared.Sandbox as Sandbox
+import JavaScript.JSEngineHarness as JSEngineHarness
+
+# Path to the harness scripts that turn an engine into a worker.
+D8HARNESS = f"{currentdir}/JSEngineServerD8.js"
+NODEHARNESS = f"{currentdir}/JSEngineServerNode.js"
+# Engine kind to the harness script.
+HARNESSES = {"d8": D8HARNESS, "node": NODEHARNESS}
+
+# Number of servers per engine command. Zero disables the servers.
+POOL_SIZE = 0
+# Engine command (without the script path) to the pool of servers.
+POOLS = {}
+POOLS_LOCK = threading.Lock()
+
+class EngineServer:
+    """A single long-lived engine process running the harness script."""
+
+    def __init__(self, commandPrefix: list, harness: str, limits: Sandbox.Limits):
+        self.token = uuid.uuid4().hex
+        self.limits = limits
+        self.process = subprocess.Popen(
+                commandPrefix + [harness], stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+                start_new_session=True)
+        Sandbox.SetLimits(self.process.pid, Sandbox.Limits(memoryMB=limits.memoryMB))
+        self.process.stdin.write(f"{self.token}\n")
+        self.process.stdin.flush()
+
+    def IsAlive(self):
+        return self.process.poll() == None
+
+    def Run(self, commands: list, timeout: float=None):
+        """This function sends the script path to the engine and collects
+        the output of the script.
+
+        args:
+            commands (list): command for executing JIT system, where
+            the last element is the script path.
+            timeout (float): wall-clock timeout of the script in seconds.
+
+        returns:
+            (CompletedProcess) the result of the script, or None if the
+            engine died while running it. If the script timed out, the
+            engine is killed and a timed out SandboxResult is returned.
+        """
+
+        self.LimitCPU()
+        try:
+            self.process.stdin.write(f"{commands[-1]}\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            return None
+
+        # The watchdog kills the whole engine process group, which closes
+        # the pipe and unblocks the reads below.
+        expired = threading.Event()
+        watchdog = None
+        if timeout:
+            watchdog = threading.Timer(timeout, self.Expire, args=(expired,))
+            watchdog.daemon = True
+            watchdog.start()
+
+        try:
+            output = self.ReadOutput(commands)
+        finally:
+            if watchdog:
+                watchdog.cancel()
+
+        if expired.is_set():
+            return Sandbox.SandboxResult(
+                    commands, self.process.wait(),
+                    output.stdout if output else "", "", timed_out=True)
+
+        # The output was cut off, e.g., the engine hit its limits, so the
+        # server is reaped and replaced on the next acquire.
+        if not output:
+            Sandbox.KillGroup(self.process)
+            self.process.wait()
+
+        return output
+
+    def LimitCPU(self):
+        """This function gives the next script the CPU limit of a fresh
+        process. RLIMIT_CPU counts the CPU time of the whole server, so the
+        soft limit is set to the CPU time used so far plus the limit. The
+        hard limit is left unlimited, so the soft limit can be moved forward.
+
+        returns:
+            None.
+        """
+
+        if not self.limits.cpuSeconds:
+            return
+
+        seconds = int(math.ceil(CPUTime(self.process.pid) + self.limits.cpuSeconds))
+        try:
+            resource.prlimit(
+                self.process.pid, resource.RLIMIT_CPU, (seconds, resource.RLIM_INFINITY))
+        except (ProcessLookupError, PermissionError, AttributeError):
+            pass
+
+    def Expire(self, expired: threading.Event):
+        expired.set()
+        Sandbox.KillGroup(self.process)
+
+    def ReadOutput(self, commands: list):
+        """This function reads the delimited output of the script.
+
+        args:
+            commands (list): command for executing JIT system.
+
+        returns:
+            (CompletedProcess) the result of the script, or None if the
+            output was cut off.
+        """
+
+        parsed = JSEngineHarness.ReadDelimited(
+                    iter(self.process.stdout.readline, ""),
+                    f"{self.token}:BEGIN", f"{self.token}:END:")
+        if not parsed:
+            return None
+        stdout, returncode = parsed
+
+        return subprocess.CompletedProcess(commands, int(returncode), stdout, "")
+
+    def Close(self):
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        Sandbox.KillGroup(self.process)
+        self.process.wait()
+
+class EngineServerPool:
+    """A pool of engine servers that run the same engine command."""
+
+    def __init__(self, commandPrefix: list, harness: str, size: int, limits: Sandbox.Limits):
+        self.commandPrefix = commandPrefix
+        self.harness = harness
+        self.size = size
+        self.limits = limits
+        self.created = 0
+        self.idle = []
+        self.servers = []
+        # Wakes the waiters when a server is idle or a dead one is removed.
+        self.ready = threading.Condition()
+
+    def acquire(self):
+        with self.ready:
+            while not self.idle and self.created >= self.size:
+                self.ready.wait()
+            if self.idle:
+                return self.idle.pop()
+
+            self.created += 1
+            try:
+                server = EngineServer(self.commandPrefix, self.harness, self.limits)
+            except BaseException:
+                self.created -= 1
+                self.ready.notify()
+                raise
+            self.servers.append(server)
+            return server
+
+    def release(self, server: EngineServer):
+        # A dead server is removed, so a waiter can start its replacement.
+        alive = server.IsAlive()
+        if not alive:
+            server.Close()
+        with self.ready:
+            if alive:
+                self.idle.append(server)
+            else:
+                self.servers.remove(server)
+                self.created -= 1
+            self.ready.notify()
+
+    def Run(self, commands: list, timeout: float=None):
+        server = self.acquire()
+        try:
+            output = server.Run(commands, timeout)
+        finally:
+            self.release(server)
+
+        return output
+
+    def Close(self):
+        with self.ready:
+            for server in self.servers:
+                server.Close()
+            self.servers = []
+            self.idle = []
+            self.created = 0
+
+def CPUTime(pid: int):
+    """This function returns the CPU time used by the process so far.
+
+    args:
+        pid (int): process id.
+
+    returns:
+        (float) user and system CPU time in seconds.
+    """
+
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+    except OSError:
+        return 0
+
+    # The fields after the command name, starting from the state.
+    fields = stat[stat.rindex(')')+2:].split()
+
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+def GetHarness(commandPrefix: list):
+    """This function returns the harness script for the engine, or None if
+    the engine cannot isolate the scripts from each other.
+
+    args:
+        commandPrefix (list): engine command without the script path.
+
+    returns:
+        (str) path to the harness script.
+    """
+
+    return HARNESSES.get(JSEngineHarness.EngineKind(commandPrefix))
+
+def Enable(size: int):
+    """This function enables the engine servers.
+
+    args:
+        size (int): number of servers per engine command.
+
+    returns:
+        None.
+    """
+
+    global POOL_SIZE
+
+    POOL_SIZE = size
+
+def Enabled():
+    """This function checks whether the engine servers are enabled.
+
+    returns:
+        (bool) True if the servers are enabled.
+    """
+
+    return POOL_SIZE > 0
+
+def SameEnvironment(pool: EngineServerPool, limits: Sandbox.Limits):
+    """This function runs the probe script on a server of the pool and in a
+    fresh process, and compares what the two runs see of their globals.
+
+    args:
+        pool (EngineServerPool): pool of servers.
+        limits (Sandbox.Limits): limits of the runs.
+
+    returns:
+        (bool) True if the server and the fresh process print the same.
+    """
+
+    return JSEngineHarness.SameEnvironment(
+            pool.commandPrefix, limits,
+            lambda probe: [pool.Run(pool.commandPrefix + [probe], limits.timeout)])
+
+def GetPool(commands: list, limits: Sandbox.Limits):
+    """This function returns the pool of servers for the engine command,
+    or None if the servers are disabled, the engine is not supported, or
+    the scripts on the servers would not see the globals of a fresh process.
+
+    args:
+        commands (list): command for executing JIT system.
+        limits (Sandbox.Limits): limits of the runs.
+
+    returns:
+        (EngineServerPool) pool of servers.
+    """
+
+    if POOL_SIZE < 1:
+        return None
+
+    key = tuple(commands[:-1])
+    with POOLS_LOCK:
+        if key not in POOLS:
+            harness = GetHarness(commands)
+            pool = EngineServerPool(
+                    list(key), harness, POOL_SIZE, limits) if harness else None
+            if pool and not SameEnvironment(pool, limits):
+                print (
+                    f"   |__ Engine server disabled for {' '.join(key)}: "
+                    f"its globals differ from a fresh process")
+                pool.Close()
+                pool = None
+            POOLS[key] = pool
+
+    return POOLS[key]
+
+def Run(commands: list, limits: Sandbox.Limits):
+    """This function runs the script on an engine server.
+
+    args:
+        commands (list): command for executing JIT system.
+        limits (Sandbox.Limits): limits of the run.
+
+    returns:
+        (CompletedProcess) result of the clean (status 0) or timed out run,
+        or None if the run has to be done in a fresh process.
+    """
+
+    pool = GetPool(commands, limits)
+    if not pool:
+        return None
+
+    output = pool.Run(commands, limits.timeout)
+    if Sandbox.TimedOut(output):
+        return output
+    if not output or output.returncode != 0:
+        return None
+
+    return output
+
+@atexit.register
+def Shutdown():
+    with POOLS_LOCK:
+        for pool in POOLS.values():
+            if pool:
+                pool.Close()
+        POOLS.clear()
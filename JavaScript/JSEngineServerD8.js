@@ -0,0 +1,36 @@
+/*
+ *  This program turns d8 into a long-lived engine worker.
+ *  It reads a session token and then one script path per line from
+ *  stdin, and runs each script in a fresh realm (Realm.create), so the
+ *  scripts do not share the global object. The output of each script is
+ *  delimited by the token lines: "<token>:BEGIN" and "<token>:END:<status>".
+ *  A script that schedules a timer would outlive its realm, so it is
+ *  reported as failed and rerun in a fresh process.
+ *
+ *  Author: Anonymous.
+ */
+
+var token = readline();
+var path = readline();
+
+while (path !== undefined && path !== null && path !== "") {
+    var status = 0;
+    var realm = Realm.create();
+
+    Realm.shared = false;
+    Realm.eval(realm, "setTimeout = function () { Realm.shared = true; };");
+
+    print(token + ":BEGIN");
+    try {
+        Realm.eval(realm, read(path));
+    } catch (e) {
+        status = 1;
+    }
+    if (Realm.shared) {
+        status = 1;
+    }
+    Realm.dispose(realm);
+    print(token + ":END:" + status);
+
+    path = readline();
+}
@@ -0,0 +1,90 @@
+/*
+ *  This program turns node into a long-lived engine worker.
+ *  It reads a session token and then one script path per line from
+ *  stdin, and runs each script in a fresh context (vm.createContext), so
+ *  the scripts do not share the global object. As in a fresh node process,
+ *  the context has the host globals of node, and the script runs as a
+ *  CommonJS module with its own require, module, and exports. The output
+ *  of each script is delimited by the token lines: "<token>:BEGIN" and
+ *  "<token>:END:<status>". A script that schedules a timer would outlive
+ *  its run, so it is reported as failed and rerun in a fresh process.
+ *
+ *  Author: Anonymous.
+ */
+
+const fs = require('fs')
+const vm = require('vm')
+const path = require('path')
+const Module = require('module')
+const readline = require('readline')
+
+// Globals of node that are not built into a fresh context, e.g., process,
+// and the console, whose built-in version in a context prints nothing.
+const hostGlobals = Object.getOwnPropertyNames(globalThis).filter(
+    (name) => name === "console"
+              || !Object.prototype.hasOwnProperty.call(vm.runInNewContext("this"), name))
+
+var token = null
+var queue = Promise.resolve()
+var timersUsed = false
+
+function createContext() {
+    var context = vm.createContext({})
+    var contextGlobal = vm.runInContext("this", context)
+
+    for (const name of hostGlobals) {
+        Object.defineProperty(
+            contextGlobal, name, Object.getOwnPropertyDescriptor(globalThis, name))
+    }
+    contextGlobal.global = contextGlobal
+    for (const name of ["setTimeout", "setInterval", "setImmediate"]) {
+        contextGlobal[name] = function () { timersUsed = true }
+    }
+
+    return context
+}
+
+function runScript(scriptPath) {
+    var status = 0
+    timersUsed = false
+
+    process.stdout.write(token + ":BEGIN\n")
+    try {
+        var filename = path.resolve(scriptPath)
+        var dirname = path.dirname(filename)
+        var module = new Module(filename)
+        module.filename = filename
+        module.paths = Module._nodeModulePaths(dirname)
+
+        var script = vm.compileFunction(
+            fs.readFileSync(filename, 'utf8'),
+            ['exports', 'require', 'module', '__filename', '__dirname'],
+            {parsingContext: createContext(), filename: filename})
+        script.call(
+            module.exports, module.exports, Module.createRequire(filename),
+            module, filename, dirname)
+    } catch (e) {
+        status = 1
+    }
+
+    // Let the callbacks the script queued run before closing its output.
+    return new Promise((resolve) => {
+        setImmediate(() => {
+            if (timersUsed) {
+                status = 1
+            }
+            process.stdout.write(token + ":END:" + status + "\n")
+            resolve()
+        })
+    })
+}
+
+var input = readline.createInterface({input: process.stdin, terminal: false})
+
+input.on('line', (line) => {
+    if (token === null) {
+        token = line
+    } else if (line !== "") {
+        queue = queue.then(() => runScript(line))
+    }
+})
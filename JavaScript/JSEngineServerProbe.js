@@ -0,0 +1,29 @@
+/*
+ *  This program prints what a script sees of its global environment: the
+ *  type of the top-level this, the types of the host globals, and the names
+ *  of the properties of the global object. The engine server runs it once
+ *  on the server and once in a fresh process, and the server is used only
+ *  if the two outputs are the same.
+ *
+ *  Author: Anonymous.
+ */
+
+(function (__probeThis) {
+    var __probeGlobal = (0, eval)("this")
+    var __probeNames = [
+        "require", "process", "module", "exports", "__filename", "__dirname",
+        "global", "Buffer", "setTimeout", "setInterval", "setImmediate",
+        "queueMicrotask", "console", "print", "printErr", "load", "read",
+        "readbuffer", "readline", "write", "quit", "version", "arguments",
+        "Realm", "d8", "os", "gc", "WebAssembly", "SharedArrayBuffer", "Atomics"
+    ]
+    var __probeLines = []
+
+    __probeLines.push("this: " + typeof __probeThis + " " + (__probeThis === __probeGlobal))
+    for (var i = 0; i < __probeNames.length; i++) {
+        __probeLines.push(__probeNames[i] + ": " + eval("typeof " + __probeNames[i]))
+    }
+    __probeLines.push("globals: " + Object.getOwnPropertyNames(__probeGlobal).sort().join(","))
+
+    console.log(__probeLines.join("\n"))
+})(this)
@@ -0,0 +1,1461 @@
+"""
+    This file holds the native code generator that converts the ESTree AST
+    of esprima-python into JavaScript code without the round trip to node.
+    It is a port of escodegen 2.1.0 (https://github.com/estools/escodegen)
+    with its default options, i.e., four-space indentation, single quotes,
+    and no comments, so that the generated code is byte-identical to the
+    code of JSCodeGenerator.js.
+
+    Generate raises InvalidAST for the ASTs that escodegen cannot convert
+    either, e.g., a null literal without its value, which esprima-python's
+    toDict drops. Any other error, e.g., for the node types that are not
+    handled here (comprehensions), means that the caller has to fall back
+    to JSCodeGenerator.js.
+
+    Author: Anonymous.
+"""
+
+import bisect
+import contextlib
+import math
+import re
+
+INDENT = "    "
+SPACE = " "
+NEWLINE = "\n"
+
+# Operator precedences.
+SEQUENCE = 0
+YIELD = 1
+ASSIGNMENT = 1
+CONDITIONAL = 2
+ARROW_FUNCTION = 2
+COALESCE = 3
+LOGICAL_OR = 4
+LOGICAL_AND = 5
+BITWISE_OR = 6
+BITWISE_XOR = 7
+BITWISE_AND = 8
+EQUALITY = 9
+RELATIONAL = 10
+BITWISE_SHIFT = 11
+ADDITIVE = 12
+MULTIPLICATIVE = 13
+EXPONENTIATION = 14
+AWAIT = 15
+UNARY = 15
+POSTFIX = 16
+OPTIONAL_CHAINING = 17
+CALL = 18
+NEW = 19
+TAGGED_TEMPLATE = 20
+MEMBER = 21
+PRIMARY = 22
+# Precedence of a pattern generated without one, which is never parenthesized.
+NO_PRECEDENCE = -1
+
+BINARY_PRECEDENCE = {
+    '??': COALESCE, '||': LOGICAL_OR, '&&': LOGICAL_AND, '|': BITWISE_OR,
+    '^': BITWISE_XOR, '&': BITWISE_AND, '==': EQUALITY, '!=': EQUALITY,
+    '===': EQUALITY, '!==': EQUALITY, 'is': EQUALITY, 'isnt': EQUALITY,
+    '<': RELATIONAL, '>': RELATIONAL, '<=': RELATIONAL, '>=': RELATIONAL,
+    'in': RELATIONAL, 'instanceof': RELATIONAL, '<<': BITWISE_SHIFT,
+    '>>': BITWISE_SHIFT, '>>>': BITWISE_SHIFT, '+': ADDITIVE, '-': ADDITIVE,
+    '*': MULTIPLICATIVE, '%': MULTIPLICATIVE, '/': MULTIPLICATIVE,
+    '**': EXPONENTIATION,
+}
+
+# Flags.
+F_ALLOW_IN = 1
+F_ALLOW_CALL = 1 << 1
+F_ALLOW_UNPARATH_NEW = 1 << 2
+F_FUNC_BODY = 1 << 3
+F_DIRECTIVE_CTX = 1 << 4
+F_SEMICOLON_OPT = 1 << 5
+F_FOUND_COALESCE = 1 << 6
+
+# Expression flag sets (F_ALLOW_IN, F_ALLOW_CALL, F_ALLOW_UNPARATH_NEW).
+E_FTT = F_ALLOW_CALL | F_ALLOW_UNPARATH_NEW
+E_TTF = F_ALLOW_IN | F_ALLOW_CALL
+E_TTT = F_ALLOW_IN | F_ALLOW_CALL | F_ALLOW_UNPARATH_NEW
+E_TFF = F_ALLOW_IN
+E_FFT = F_ALLOW_UNPARATH_NEW
+E_TFT = F_ALLOW_IN | F_ALLOW_UNPARATH_NEW
+
+# Statement flag sets (F_ALLOW_IN, F_FUNC_BODY, F_DIRECTIVE_CTX, F_SEMICOLON_OPT).
+S_TFFF = F_ALLOW_IN
+S_TFFT = F_ALLOW_IN | F_SEMICOLON_OPT
+S_FFFF = 0
+S_TFTF = F_ALLOW_IN | F_DIRECTIVE_CTX
+S_TTFF = F_ALLOW_IN | F_FUNC_BODY
+
+STATEMENTS = {
+    "BlockStatement", "BreakStatement", "ContinueStatement", "ClassBody",
+    "ClassDeclaration", "DirectiveStatement", "DoWhileStatement",
+    "CatchClause", "DebuggerStatement", "EmptyStatement",
+    "ExportDefaultDeclaration", "ExportNamedDeclaration",
+    "ExportAllDeclaration", "ExpressionStatement", "ImportDeclaration",
+    "VariableDeclarator", "VariableDeclaration", "ThrowStatement",
+    "TryStatement", "SwitchStatement", "SwitchCase", "IfStatement",
+    "ForStatement", "ForInStatement", "ForOfStatement", "LabeledStatement",
+    "Program", "FunctionDeclaration", "ReturnStatement", "WhileStatement",
+    "WithStatement",
+}
+
+EXPRESSIONS = {
+    "SequenceExpression", "AssignmentExpression", "ArrowFunctionExpression",
+    "ConditionalExpression", "LogicalExpression", "BinaryExpression",
+    "CallExpression", "ChainExpression", "NewExpression", "MemberExpression",
+    "MetaProperty", "UnaryExpression", "YieldExpression", "AwaitExpression",
+    "UpdateExpression", "FunctionExpression", "ArrayPattern",
+    "ArrayExpression", "RestElement", "ClassExpression", "MethodDefinition",
+    "Property", "ObjectExpression", "AssignmentPattern", "ObjectPattern",
+    "ThisExpression", "Super", "Identifier", "ImportDefaultSpecifier",
+    "ImportNamespaceSpecifier", "ImportSpecifier", "ExportSpecifier",
+    "Literal", "SpreadElement", "TaggedTemplateExpression",
+    "TemplateElement", "TemplateLiteral", "ModuleSpecifier",
+    "ImportExpression",
+}
+
+# Node types of escodegen that esprima-python does not produce.
+ESCODEGEN_ONLY = {
+    "GeneratorExpression", "ComprehensionExpression", "ComprehensionBlock",
+}
+
+NON_ASCII_WHITESPACES = {
+    0x1680, 0x2000, 0x2001, 0x2002, 0x2003, 0x2004, 0x2005, 0x2006, 0x2007,
+    0x2008, 0x2009, 0x200A, 0x202F, 0x205F, 0x3000, 0xFEFF,
+}
+
+# The non-ASCII identifier part characters of ECMAScript 5.1 (Unicode
+# 9.0.0), as escodegen classifies them through esutils.
+NON_ASCII_IDENTIFIER_PART = (
+    "AA B5 BA C0-D6 D8-F6 F8-2C1 2C6-2D1 2E0-2E4 2EC 2EE 300-374 "
+    "376-377 37A-37D 37F 386 388-38A 38C 38E-3A1 3A3-3F5 3F7-481 "
+    "483-487 48A-52F 531-556 559 561-587 591-5BD 5BF 5C1-5C2 5C4-5C5 "
+    "5C7 5D0-5EA 5F0-5F2 610-61A 620-669 66E-6D3 6D5-6DC 6DF-6E8 "
+    "6EA-6FC 6FF 710-74A 74D-7B1 7C0-7F5 7FA 800-82D 840-85B 8A0-8B4 "
+    "8B6-8BD 8D4-8E1 8E3-963 966-96F 971-983 985-98C 98F-990 993-9A8 "
+    "9AA-9B0 9B2 9B6-9B9 9BC-9C4 9C7-9C8 9CB-9CE 9D7 9DC-9DD 9DF-9E3 "
+    "9E6-9F1 A01-A03 A05-A0A A0F-A10 A13-A28 A2A-A30 A32-A33 A35-A36 "
+    "A38-A39 A3C A3E-A42 A47-A48 A4B-A4D A51 A59-A5C A5E A66-A75 "
+    "A81-A83 A85-A8D A8F-A91 A93-AA8 AAA-AB0 AB2-AB3 AB5-AB9 ABC-AC5 "
+    "AC7-AC9 ACB-ACD AD0 AE0-AE3 AE6-AEF AF9 B01-B03 B05-B0C B0F-B10 "
+    "B13-B28 B2A-B30 B32-B33 B35-B39 B3C-B44 B47-B48 B4B-B4D B56-B57 "
+    "B5C-B5D B5F-B63 B66-B6F B71 B82-B83 B85-B8A B8E-B90 B92-B95 "
+    "B99-B9A B9C B9E-B9F BA3-BA4 BA8-BAA BAE-BB9 BBE-BC2 BC6-BC8 "
+    "BCA-BCD BD0 BD7 BE6-BEF C00-C03 C05-C0C C0E-C10 C12-C28 C2A-C39 "
+    "C3D-C44 C46-C48 C4A-C4D C55-C56 C58-C5A C60-C63 C66-C6F C80-C83 "
+    "C85-C8C C8E-C90 C92-CA8 CAA-CB3 CB5-CB9 CBC-CC4 CC6-CC8 CCA-CCD "
+    "CD5-CD6 CDE CE0-CE3 CE6-CEF CF1-CF2 D01-D03 D05-D0C D0E-D10 "
+    "D12-D3A D3D-D44 D46-D48 D4A-D4E D54-D57 D5F-D63 D66-D6F D7A-D7F "
+    "D82-D83 D85-D96 D9A-DB1 DB3-DBB DBD DC0-DC6 DCA DCF-DD4 DD6 "
+    "DD8-DDF DE6-DEF DF2-DF3 E01-E3A E40-E4E E50-E59 E81-E82 E84 "
+    "E87-E88 E8A E8D E94-E97 E99-E9F EA1-EA3 EA5 EA7 EAA-EAB EAD-EB9 "
+    "EBB-EBD EC0-EC4 EC6 EC8-ECD ED0-ED9 EDC-EDF F00 F18-F19 F20-F29 "
+    "F35 F37 F39 F3E-F47 F49-F6C F71-F84 F86-F97 F99-FBC FC6 1000-1049 "
+    "1050-109D 10A0-10C5 10C7 10CD 10D0-10FA 10FC-1248 124A-124D "
+    "1250-1256 1258 125A-125D 1260-1288 128A-128D 1290-12B0 12B2-12B5 "
+    "12B8-12BE 12C0 12C2-12C5 12C8-12D6 12D8-1310 1312-1315 1318-135A "
+    "135D-135F 1380-138F 13A0-13F5 13F8-13FD 1401-166C 166F-167F "
+    "1681-169A 16A0-16EA 16EE-16F8 1700-170C 170E-1714 1720-1734 "
+    "1740-1753 1760-176C 176E-1770 1772-1773 1780-17D3 17D7 17DC-17DD "
+    "17E0-17E9 180B-180D 1810-1819 1820-1877 1880-18AA 18B0-18F5 "
+    "1900-191E 1920-192B 1930-193B 1946-196D 1970-1974 1980-19AB "
+    "19B0-19C9 19D0-19D9 1A00-1A1B 1A20-1A5E 1A60-1A7C 1A7F-1A89 "
+    "1A90-1A99 1AA7 1AB0-1ABD 1B00-1B4B 1B50-1B59 1B6B-1B73 1B80-1BF3 "
+    "1C00-1C37 1C40-1C49 1C4D-1C7D 1C80-1C88 1CD0-1CD2 1CD4-1CF6 "
+    "1CF8-1CF9 1D00-1DF5 1DFB-1F15 1F18-1F1D 1F20-1F45 1F48-1F4D "
+    "1F50-1F57 1F59 1F5B 1F5D 1F5F-1F7D 1F80-1FB4 1FB6-1FBC 1FBE "
+    "1FC2-1FC4 1FC6-1FCC 1FD0-1FD3 1FD6-1FDB 1FE0-1FEC 1FF2-1FF4 "
+    "1FF6-1FFC 200C-200D 203F-2040 2054 2071 207F 2090-209C 20D0-20DC "
+    "20E1 20E5-20F0 2102 2107 210A-2113 2115 2119-211D 2124 2126 2128 "
+    "212A-212D 212F-2139 213C-213F 2145-2149 214E 2160-2188 2C00-2C2E "
+    "2C30-2C5E 2C60-2CE4 2CEB-2CF3 2D00-2D25 2D27 2D2D 2D30-2D67 2D6F "
+    "2D7F-2D96 2DA0-2DA6 2DA8-2DAE 2DB0-2DB6 2DB8-2DBE 2DC0-2DC6 "
+    "2DC8-2DCE 2DD0-2DD6 2DD8-2DDE 2DE0-2DFF 2E2F 3005-3007 3021-302F "
+    "3031-3035 3038-303C 3041-3096 3099-309A 309D-309F 30A1-30FA "
+    "30FC-30FF 3105-312D 3131-318E 31A0-31BA 31F0-31FF 3400-4DB5 "
+    "4E00-9FD5 A000-A48C A4D0-A4FD A500-A60C A610-A62B A640-A66F "
+    "A674-A67D A67F-A6F1 A717-A71F A722-A788 A78B-A7AE A7B0-A7B7 "
+    "A7F7-A827 A840-A873 A880-A8C5 A8D0-A8D9 A8E0-A8F7 A8FB A8FD "
+    "A900-A92D A930-A953 A960-A97C A980-A9C0 A9CF-A9D9 A9E0-A9FE "
+    "AA00-AA36 AA40-AA4D AA50-AA59 AA60-AA76 AA7A-AAC2 AADB-AADD "
+    "AAE0-AAEF AAF2-AAF6 AB01-AB06 AB09-AB0E AB11-AB16 AB20-AB26 "
+    "AB28-AB2E AB30-AB5A AB5C-AB65 AB70-ABEA ABEC-ABED ABF0-ABF9 "
+    "AC00-D7A3 D7B0-D7C6 D7CB-D7FB F900-FA6D FA70-FAD9 FB00-FB06 "
+    "FB13-FB17 FB1D-FB28 FB2A-FB36 FB38-FB3C FB3E FB40-FB41 FB43-FB44 "
+    "FB46-FBB1 FBD3-FD3D FD50-FD8F FD92-FDC7 FDF0-FDFB FE00-FE0F "
+    "FE20-FE2F FE33-FE34 FE4D-FE4F FE70-FE74 FE76-FEFC FF10-FF19 "
+    "FF21-FF3A FF3F FF41-FF5A FF66-FFBE FFC2-FFC7 FFCA-FFCF FFD2-FFD7 "
+    "FFDA-FFDC "
+)
+
+class InvalidAST(ValueError):
+    """The AST cannot be converted by escodegen either."""
+
+class Unsupported(ValueError):
+    """The AST is valid, but its conversion is left to escodegen."""
+
+def ParseRanges(table: str):
+    """This function parses the hex ranges of the character table.
+
+    args:
+        table (str): space-separated hex code points or ranges.
+
+    returns:
+        (list) sorted range starts.
+        (list) range ends in the order of the starts.
+    """
+
+    starts, ends = [], []
+    for item in table.split():
+        start, _, end = item.partition('-')
+        starts.append(int(start, 16))
+        ends.append(int(end or start, 16))
+
+    return starts, ends
+
+IDENTIFIER_PART_STARTS, IDENTIFIER_PART_ENDS = ParseRanges(NON_ASCII_IDENTIFIER_PART)
+
+def IsIdentifierPart(ch: str):
+    if not ch:
+        return False
+    code = ord(ch)
+    if code < 0x80:
+        return ch.isalnum() or ch in "$_"
+    idx = bisect.bisect_right(IDENTIFIER_PART_STARTS, code) - 1
+    return idx >= 0 and code <= IDENTIFIER_PART_ENDS[idx]
+
+def IsWhiteSpace(ch: str):
+    return ch in (" ", "\t", "\x0b", "\x0c", "\xa0") or (
+            len(ch) == 1 and ord(ch) in NON_ASCII_WHITESPACES)
+
+def IsLineTerminator(ch: str):
+    return ch in ("\n", "\r", "\u2028", "\u2029")
+
+def IsDecimalDigit(ch: str):
+    return ch in ("0", "1", "2", "3", "4", "5", "6", "7", "8", "9")
+
+def CharAt(text: str, idx: int):
+    """This function returns the character at the index, or an empty string
+    if the index is out of the text, as JavaScript's charAt does.
+    """
+
+    return text[idx] if -len(text) <= idx < len(text) else ""
+
+def EndsWithLineTerminator(text: str):
+    return IsLineTerminator(CharAt(text, -1))
+
+def HasLineTerminator(text: str):
+    return "\r" in text or "\n" in text
+
+def Truthy(value):
+    """This function checks the value as JavaScript does, where the
+    empty arrays and objects are true.
+    """
+
+    if isinstance(value, (list, dict)):
+        return True
+    if isinstance(value, float) and math.isnan(value):
+        return False
+
+    return bool(value)
+
+def IsNumber(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def CodeUnits(text: str):
+    """This function splits the text into its UTF-16 code units, which is
+    how JavaScript sees the strings.
+
+    args:
+        text (str): text to split.
+
+    returns:
+        (list) list of code units.
+    """
+
+    units = []
+    for ch in text:
+        code = ord(ch)
+        if code > 0xFFFF:
+            code -= 0x10000
+            units.append(0xD800 + (code >> 10))
+            units.append(0xDC00 + (code & 0x3FF))
+        else:
+            units.append(code)
+
+    return units
+
+def NumberToString(value: float):
+    """This function converts the number to a string as JavaScript's
+    Number.prototype.toString does.
+
+    args:
+        value (float): non-negative finite number.
+
+    returns:
+        (str) string of the number.
+    """
+
+    if value == 0:
+        return "0"
+
+    # repr gives the shortest digits that round-trip, as JavaScript does.
+    mantissa, _, exponent = repr(value).partition('e')
+    exponent = int(exponent) if exponent else 0
+    integer, _, fraction = mantissa.partition('.')
+    if integer == "0":
+        digits = fraction.lstrip('0')
+        point = exponent - (len(fraction) - len(digits))
+    else:
+        digits = integer + fraction
+        point = exponent + len(integer)
+    digits = digits.rstrip('0')
+    size = len(digits)
+
+    if size <= point <= 21:
+        return digits + '0' * (point - size)
+    elif 0 < point <= 21:
+        return f"{digits[:point]}.{digits[point:]}"
+    elif -6 < point <= 0:
+        return f"0.{'0' * -point}{digits}"
+
+    exponent = point - 1
+    sign = '+' if exponent >= 0 else '-'
+    if size == 1:
+        return f"{digits}e{sign}{abs(exponent)}"
+
+    return f"{digits[0]}.{digits[1:]}e{sign}{abs(exponent)}"
+
+def GenerateNumber(value):
+    """This function generates the numeric literal.
+
+    args:
+        value (int or float): value of the literal.
+
+    returns:
+        (str) numeric literal.
+    """
+
+    try:
+        value = float(value)
+    except OverflowError:
+        value = math.inf if value > 0 else -math.inf
+
+    if math.isnan(value):
+        raise InvalidAST("Numeric literal whose value is NaN")
+    if value < 0 or (value == 0 and math.copysign(1, value) < 0):
+        raise InvalidAST("Numeric literal whose value is negative")
+    if value == math.inf:
+        return "1e+400"
+
+    return NumberToString(value)
+
+def EscapeAllowedCharacter(code: int, nextCode):
+    if code == 0x08:
+        return "\\b"
+    if code == 0x0C:
+        return "\\f"
+    if code == 0x09:
+        return "\\t"
+
+    hexCode = f"{code:X}"
+    if code > 0xFF:
+        return "\\u" + hexCode.rjust(4, '0')
+    elif code == 0x00 and not (nextCode != None and 0x30 <= nextCode <= 0x39):
+        return "\\0"
+    elif code == 0x0B:
+        return "\\x0B"
+
+    return "\\x" + hexCode.rjust(2, '0')
+
+def EscapeDisallowedCharacter(code: int):
+    return {
+        0x5C: "\\\\", 0x0A: "\\n", 0x0D: "\\r",
+        0x2028: "\\u2028", 0x2029: "\\u2029",
+    }[code]
+
+def EscapeString(text: str):
+    """This function generates the single-quoted string literal.
+
+    args:
+        text (str): value of the literal.
+
+    returns:
+        (str) string literal.
+    """
+
+    units = CodeUnits(text)
+    result = []
+    singleQuotes = 0
+
+    for idx, code in enumerate(units):
+        if code == 0x27:
+            singleQuotes += 1
+        elif code in (0x0A, 0x0D, 0x2028, 0x2029, 0x5C):
+            result.append(EscapeDisallowedCharacter(code))
+            continue
+        elif (code < 0x20 or code > 0x7E) and not IsIdentifierPart(chr(code)):
+            nextCode = units[idx+1] if idx + 1 < len(units) else None
+            result.append(EscapeAllowedCharacter(code, nextCode))
+            continue
+        result.append(chr(code))
+
+    result = "".join(result)
+    if singleQuotes:
+        result = result.replace("'", "\\'")
+
+    return f"'{result}'"
+
+def Parenthesize(text: str, current: int, should: int):
+    if current < should:
+        return f"({text})"
+    return text
+
+def Join(left: str, right: str):
+    """This function joins the two fragments, with a space between them
+    if they would otherwise read as a single token.
+
+    args:
+        left (str): left fragment.
+        right (str): right fragment.
+
+    returns:
+        (str) joined fragments.
+    """
+
+    if not left:
+        return right
+    if not right:
+        return left
+
+    leftChar = left[-1]
+    rightChar = right[0]
+
+    if ((leftChar in "+-" and leftChar == rightChar)
+            or (IsIdentifierPart(leftChar) and IsIdentifierPart(rightChar))
+            or (leftChar == '/' and rightChar == 'i')):
+        return f"{left} {right}"
+    elif (IsWhiteSpace(leftChar) or IsLineTerminator(leftChar)
+            or IsWhiteSpace(rightChar) or IsLineTerminator(rightChar)):
+        return left + right
+
+    return left + SPACE + right
+
+def Name(node: dict):
+    """This function returns the name of the identifier. A missing name is
+    concatenated as JavaScript's undefined, as escodegen does.
+    """
+
+    if "name" not in node:
+        return "undefined"
+
+    name = node["name"]
+    if name == None:
+        return "null"
+
+    assert isinstance(name, str), f"ERROR: Identifier name {name} is not a string."
+
+    return name
+
+def GenerateAsyncPrefix(node: dict):
+    return "async " if Truthy(node.get("async")) else ""
+
+def GenerateStarSuffix(node: dict):
+    return "*" + SPACE if Truthy(node.get("generator")) else ""
+
+def GenerateMethodPrefix(prop: dict):
+    func = prop["value"]
+    prefix = GenerateAsyncPrefix(func)
+    if Truthy(func.get("generator")):
+        prefix += "*"
+
+    return prefix
+
+class CodeGenerator:
+    """Generator of the JavaScript code of an AST, one method per node type."""
+
+    def __init__(self):
+        # Indentation of the current line.
+        self.base = ""
+
+    @contextlib.contextmanager
+    def Indented(self):
+        previous = self.base
+        self.base += INDENT
+        try:
+            yield self.base
+        finally:
+            self.base = previous
+
+    def GenerateStatement(self, stmt: dict, flags: int):
+        nodeType = stmt.get("type")
+        if nodeType not in STATEMENTS:
+            Unknown(nodeType)
+
+        return getattr(self, nodeType)(stmt, flags)
+
+    def GenerateExpression(self, expr: dict, precedence: int, flags: int):
+        nodeType = expr.get("type") or "Property"
+        if nodeType not in EXPRESSIONS:
+            Unknown(nodeType)
+
+        return getattr(self, nodeType)(expr, precedence, flags)
+
+    def GeneratePattern(self, node: dict, precedence: int, flags: int):
+        if node["type"] == "Identifier":
+            return Name(node)
+        return self.GenerateExpression(node, precedence, flags)
+
+    def MaybeBlock(self, stmt: dict, flags: int):
+        if stmt["type"] == "BlockStatement":
+            return SPACE + self.GenerateStatement(stmt, flags)
+        if stmt["type"] == "EmptyStatement":
+            return ";"
+
+        with self.Indented():
+            return NEWLINE + self.base + self.GenerateStatement(stmt, flags)
+
+    def MaybeBlockSuffix(self, stmt: dict, result: str):
+        ends = EndsWithLineTerminator(result)
+        if stmt["type"] == "BlockStatement" and not ends:
+            return result + SPACE
+        if ends:
+            return result + self.base
+
+        return result + NEWLINE + self.base
+
+    def GenerateFunctionParams(self, node: dict):
+        params = node["params"]
+        defaults = node.get("defaults")
+        isArrow = node["type"] == "ArrowFunctionExpression"
+
+        if (isArrow and not Truthy(node.get("rest")) and not defaults
+                and len(params) == 1 and params[0]["type"] == "Identifier"):
+            return GenerateAsyncPrefix(node) + Name(params[0])
+
+        result = GenerateAsyncPrefix(node) if isArrow else ""
+        result += "("
+        hasDefault = defaults != None
+        for idx, param in enumerate(params):
+            if hasDefault and idx < len(defaults) and Truthy(defaults[idx]):
+                result += self.GenerateAssignment(
+                            param, defaults[idx], "=", ASSIGNMENT, E_TTT)
+            else:
+                result += self.GeneratePattern(param, ASSIGNMENT, E_TTT)
+            if idx + 1 < len(params):
+                result += "," + SPACE
+
+        if Truthy(node.get("rest")):
+            if params:
+                result += "," + SPACE
+            result += "..." + Name(node["rest"])
+
+        return result + ")"
+
+    def GenerateFunctionBody(self, node: dict):
+        result = self.GenerateFunctionParams(node)
+
+        if node["type"] == "ArrowFunctionExpression":
+            result += SPACE + "=>"
+
+        if Truthy(node.get("expression")):
+            result += SPACE
+            expr = self.GenerateExpression(node["body"], ASSIGNMENT, E_TTT)
+            if expr.startswith("{"):
+                expr = f"({expr})"
+            result += expr
+        else:
+            result += self.MaybeBlock(node["body"], S_TTFF)
+
+        return result
+
+    def GenerateIterationForStatement(self, operator: str, stmt: dict, flags: int):
+        result = "for" + (" await" if Truthy(stmt.get("await")) else "") + SPACE + "("
+        with self.Indented():
+            left = stmt["left"]
+            if left["type"] == "VariableDeclaration":
+                with self.Indented():
+                    result += left["kind"] + " "
+                    result += self.GenerateStatement(left["declarations"][0], S_FFFF)
+            else:
+                result += self.GenerateExpression(left, CALL, E_TTT)
+
+            result = Join(result, operator)
+            result = Join(
+                        result,
+                        self.GenerateExpression(stmt["right"], ASSIGNMENT, E_TTT)) + ")"
+
+        return result + self.MaybeBlock(stmt["body"], flags)
+
+    def GeneratePropertyKey(self, expr: dict, computed):
+        key = self.GenerateExpression(expr, ASSIGNMENT, E_TTT)
+        if Truthy(computed):
+            return f"[{key}]"
+        return key
+
+    def GenerateAssignment(
+            self, left: dict, right: dict, operator: str, precedence: int, flags: int):
+        if ASSIGNMENT < precedence:
+            flags |= F_ALLOW_IN
+
+        return Parenthesize(
+                self.GenerateExpression(left, CALL, flags)
+                + SPACE + operator + SPACE
+                + self.GenerateExpression(right, ASSIGNMENT, flags),
+                ASSIGNMENT, precedence)
+
+    def BodyFlags(self, flags: int):
+        return S_TFFT if flags & F_SEMICOLON_OPT else S_TFFF
+
+    ## Statements ====================================================
+
+    def BlockStatement(self, stmt: dict, flags: int):
+        result = "{" + NEWLINE
+
+        with self.Indented():
+            bodyFlags = S_TFFF
+            if flags & F_FUNC_BODY:
+                bodyFlags |= F_DIRECTIVE_CTX
+
+            body = stmt["body"]
+            for idx, item in enumerate(body):
+                if idx == len(body) - 1:
+                    bodyFlags |= F_SEMICOLON_OPT
+                fragment = self.base + self.GenerateStatement(item, bodyFlags)
+                result += fragment
+                if not EndsWithLineTerminator(fragment):
+                    result += NEWLINE
+
+        return result + self.base + "}"
+
+    def BreakStatement(self, stmt: dict, flags: int):
+        if Truthy(stmt.get("label")):
+            return "break " + Name(stmt["label"]) + ";"
+        return "break;"
+
+    def ContinueStatement(self, stmt: dict, flags: int):
+        if Truthy(stmt.get("label")):
+            return "continue " + Name(stmt["label"]) + ";"
+        return "continue;"
+
+    def ClassBody(self, stmt: dict, flags: int):
+        result = "{" + NEWLINE
+
+        with self.Indented() as indent:
+            body = stmt["body"]
+            for idx, item in enumerate(body):
+                result += indent + self.GenerateExpression(item, SEQUENCE, E_TTT)
+                if idx + 1 < len(body):
+                    result += NEWLINE
+
+        if not EndsWithLineTerminator(result):
+            result += NEWLINE
+
+        return result + self.base + "}"
+
+    def ClassDeclaration(self, stmt: dict, flags: int):
+        result = "class"
+        if Truthy(stmt.get("id")):
+            result = Join(result, self.GenerateExpression(stmt["id"], SEQUENCE, E_TTT))
+        if Truthy(stmt.get("superClass")):
+            fragment = Join(
+                        "extends",
+                        self.GenerateExpression(stmt["superClass"], UNARY, E_TTT))
+            result = Join(result, fragment)
+
+        return result + SPACE + self.GenerateStatement(stmt["body"], S_TFFT)
+
+    def DirectiveStatement(self, stmt: dict, flags: int):
+        directive = stmt["directive"]
+        quote = "'"
+        idx = 0
+        while idx < len(directive):
+            if directive[idx] == "'":
+                quote = '"'
+                break
+            elif directive[idx] == '"':
+                quote = "'"
+                break
+            elif directive[idx] == "\\":
+                idx += 1
+            idx += 1
+
+        return f"{quote}{directive}{quote};"
+
+    def DoWhileStatement(self, stmt: dict, flags: int):
+        result = Join("do", self.MaybeBlock(stmt["body"], S_TFFF))
+        result = self.MaybeBlockSuffix(stmt["body"], result)
+
+        return Join(
+                result,
+                "while" + SPACE + "("
+                + self.GenerateExpression(stmt["test"], SEQUENCE, E_TTT) + ");")
+
+    def CatchClause(self, stmt: dict, flags: int):
+        if Truthy(stmt.get("guard")):
+            raise Unsupported("Guarded catch clauses are not handled")
+
+        with self.Indented():
+            if Truthy(stmt.get("param")):
+                result = ("catch" + SPACE + "("
+                          + self.GenerateExpression(stmt["param"], SEQUENCE, E_TTT) + ")")
+            else:
+                result = "catch"
+
+        return result + self.MaybeBlock(stmt["body"], S_TFFF)
+
+    def DebuggerStatement(self, stmt: dict, flags: int):
+        return "debugger;"
+
+    def EmptyStatement(self, stmt: dict, flags: int):
+        return ";"
+
+    def ExportDefaultDeclaration(self, stmt: dict, flags: int):
+        result = Join("export", "default")
+        declaration = stmt["declaration"]
+        if declaration["type"] in STATEMENTS:
+            return Join(
+                    result, self.GenerateStatement(declaration, self.BodyFlags(flags)))
+
+        return Join(
+                result, self.GenerateExpression(declaration, ASSIGNMENT, E_TTT) + ";")
+
+    def GenerateSpecifierList(self, result: str, specifiers: list, start: int):
+        with self.Indented() as indent:
+            result += NEWLINE
+            for idx in range(start, len(specifiers)):
+                result += indent + self.GenerateExpression(specifiers[idx], SEQUENCE, E_TTT)
+                if idx + 1 < len(specifiers):
+                    result += "," + NEWLINE
+
+        if not EndsWithLineTerminator(result):
+            result += NEWLINE
+
+        return result
+
+    def ExportNamedDeclaration(self, stmt: dict, flags: int):
+        result = "export"
+
+        if Truthy(stmt.get("declaration")):
+            return Join(
+                    result,
+                    self.GenerateStatement(stmt["declaration"], self.BodyFlags(flags)))
+
+        specifiers = stmt.get("specifiers")
+        if Truthy(specifiers):
+            if len(specifiers) == 0:
+                result = Join(result, "{" + SPACE + "}")
+            elif specifiers[0]["type"] == "ExportBatchSpecifier":
+                raise Unsupported("Unknown node type: ExportBatchSpecifier")
+            else:
+                result = Join(result, "{")
+                result = self.GenerateSpecifierList(result, specifiers, 0)
+                result += self.base + "}"
+
+            if Truthy(stmt.get("source")):
+                result = Join(
+                            result,
+                            "from" + SPACE
+                            + self.GenerateExpression(stmt["source"], SEQUENCE, E_TTT) + ";")
+            else:
+                result += ";"
+
+        return result
+
+    def ExportAllDeclaration(self, stmt: dict, flags: int):
+        return ("export" + SPACE + "*" + SPACE + "from" + SPACE
+                + self.GenerateExpression(stmt["source"], SEQUENCE, E_TTT) + ";")
+
+    def ExpressionStatement(self, stmt: dict, flags: int):
+        result = self.GenerateExpression(stmt["expression"], SEQUENCE, E_TTT)
+
+        if (CharAt(result, 0) == "{" or IsClassPrefixed(result)
+                or IsFunctionPrefixed(result) or IsAsyncPrefixed(result)):
+            return f"({result});"
+
+        return result + ";"
+
+    def ImportDeclaration(self, stmt: dict, flags: int):
+        specifiers = stmt["specifiers"]
+        if len(specifiers) == 0:
+            return ("import" + SPACE
+                    + self.GenerateExpression(stmt["source"], SEQUENCE, E_TTT) + ";")
+
+        result = "import"
+        cursor = 0
+
+        if specifiers[cursor]["type"] == "ImportDefaultSpecifier":
+            result = Join(
+                        result,
+                        self.GenerateExpression(specifiers[cursor], SEQUENCE, E_TTT))
+            cursor += 1
+
+        if cursor < len(specifiers) and Truthy(specifiers[cursor]):
+            if cursor != 0:
+                result += ","
+
+            if specifiers[cursor]["type"] == "ImportNamespaceSpecifier":
+                result = Join(
+                            result,
+                            SPACE + self.GenerateExpression(specifiers[cursor], SEQUENCE, E_TTT))
+            else:
+                result += SPACE + "{"
+                if len(specifiers) - cursor == 1:
+                    result += (SPACE
+                               + self.GenerateExpression(specifiers[cursor], SEQUENCE, E_TTT)
+                               + SPACE + "}" + SPACE)
+                else:
+                    result = self.GenerateSpecifierList(result, specifiers, cursor)
+                    result += self.base + "}" + SPACE
+
+        return Join(
+                result,
+                "from" + SPACE
+                + self.GenerateExpression(stmt["source"], SEQUENCE, E_TTT) + ";")
+
+    def VariableDeclarator(self, stmt: dict, flags: int):
+        itemFlags = E_TTT if flags & F_ALLOW_IN else E_FTT
+        if Truthy(stmt.get("init")):
+            return (self.GenerateExpression(stmt["id"], ASSIGNMENT, itemFlags)
+                    + SPACE + "=" + SPACE
+                    + self.GenerateExpression(stmt["init"], ASSIGNMENT, itemFlags))
+
+        return self.GeneratePattern(stmt["id"], ASSIGNMENT, itemFlags)
+
+    def VariableDeclaration(self, stmt: dict, flags: int):
+        bodyFlags = S_TFFF if flags & F_ALLOW_IN else S_FFFF
+        declarations = stmt["declarations"]
+
+        def Block():
+            fragments = [self.GenerateStatement(node, bodyFlags) for node in declarations]
+            return " " + ("," + SPACE).join(fragments)
+
+        # The declarations are indented only if there are more than one.
+        if len(declarations) > 1:
+            with self.Indented():
+                result = stmt["kind"] + Block()
+        else:
+            result = stmt["kind"] + Block()
+
+        return result + ";"
+
+    def ThrowStatement(self, stmt: dict, flags: int):
+        return Join(
+                "throw", self.GenerateExpression(stmt["argument"], SEQUENCE, E_TTT)) + ";"
+
+    def TryStatement(self, stmt: dict, flags: int):
+        result = "try" + self.MaybeBlock(stmt["block"], S_TFFF)
+        result = self.MaybeBlockSuffix(stmt["block"], result)
+        finalizer = Truthy(stmt.get("finalizer"))
+
+        if Truthy(stmt.get("handlers")):
+            handlers = stmt["handlers"]
+        else:
+            handlers = list(stmt.get("guardedHandlers") or [])
+            handler = stmt.get("handler")
+            if Truthy(handler):
+                handlers += handler if isinstance(handler, list) else [handler]
+
+        for idx, handler in enumerate(handlers):
+            result = Join(result, self.GenerateStatement(handler, S_TFFF))
+            if finalizer or idx + 1 != len(handlers):
+                result = self.MaybeBlockSuffix(handler["body"], result)
+
+        if finalizer:
+            result = Join(result, "finally" + self.MaybeBlock(stmt["finalizer"], S_TFFF))
+
+        return result
+
+    def SwitchStatement(self, stmt: dict, flags: int):
+        with self.Indented():
+            result = ("switch" + SPACE + "("
+                      + self.GenerateExpression(stmt["discriminant"], SEQUENCE, E_TTT)
+                      + ")" + SPACE + "{" + NEWLINE)
+
+        cases = stmt.get("cases")
+        if Truthy(cases):
+            bodyFlags = S_TFFF
+            for idx, case in enumerate(cases):
+                if idx == len(cases) - 1:
+                    bodyFlags |= F_SEMICOLON_OPT
+                fragment = self.base + self.GenerateStatement(case, bodyFlags)
+                result += fragment
+                if not EndsWithLineTerminator(fragment):
+                    result += NEWLINE
+
+        return result + self.base + "}"
+
+    def SwitchCase(self, stmt: dict, flags: int):
+        with self.Indented():
+            if Truthy(stmt.get("test")):
+                result = Join(
+                            "case",
+                            self.GenerateExpression(stmt["test"], SEQUENCE, E_TTT)) + ":"
+            else:
+                result = "default:"
+
+            consequent = stmt["consequent"]
+            idx = 0
+            if consequent and consequent[0]["type"] == "BlockStatement":
+                result += self.MaybeBlock(consequent[0], S_TFFF)
+                idx = 1
+
+            if idx != len(consequent) and not EndsWithLineTerminator(result):
+                result += NEWLINE
+
+            bodyFlags = S_TFFF
+            while idx < len(consequent):
+                if idx == len(consequent) - 1 and flags & F_SEMICOLON_OPT:
+                    bodyFlags |= F_SEMICOLON_OPT
+                fragment = self.base + self.GenerateStatement(consequent[idx], bodyFlags)
+                result += fragment
+                if idx + 1 != len(consequent) and not EndsWithLineTerminator(fragment):
+                    result += NEWLINE
+                idx += 1
+
+        return result
+
+    def IfStatement(self, stmt: dict, flags: int):
+        with self.Indented():
+            result = ("if" + SPACE + "("
+                      + self.GenerateExpression(stmt["test"], SEQUENCE, E_TTT) + ")")
+
+        bodyFlags = self.BodyFlags(flags)
+        alternate = stmt.get("alternate")
+        if Truthy(alternate):
+            result += self.MaybeBlock(stmt["consequent"], S_TFFF)
+            result = self.MaybeBlockSuffix(stmt["consequent"], result)
+            if alternate["type"] == "IfStatement":
+                result = Join(result, "else " + self.GenerateStatement(alternate, bodyFlags))
+            else:
+                result = Join(result, Join("else", self.MaybeBlock(alternate, bodyFlags)))
+        else:
+            result += self.MaybeBlock(stmt["consequent"], bodyFlags)
+
+        return result
+
+    def ForStatement(self, stmt: dict, flags: int):
+        with self.Indented():
+            result = "for" + SPACE + "("
+            init = stmt.get("init")
+            if Truthy(init):
+                if init["type"] == "VariableDeclaration":
+                    result += self.GenerateStatement(init, S_FFFF)
+                else:
+                    result += self.GenerateExpression(init, SEQUENCE, E_FTT) + ";"
+            else:
+                result += ";"
+
+            if Truthy(stmt.get("test")):
+                result += SPACE + self.GenerateExpression(stmt["test"], SEQUENCE, E_TTT) + ";"
+            else:
+                result += ";"
+
+            if Truthy(stmt.get("update")):
+                result += SPACE + self.GenerateExpression(stmt["update"], SEQUENCE, E_TTT) + ")"
+            else:
+                result += ")"
+
+        return result + self.MaybeBlock(stmt["body"], self.BodyFlags(flags))
+
+    def ForInStatement(self, stmt: dict, flags: int):
+        return self.GenerateIterationForStatement("in", stmt, self.BodyFlags(flags))
+
+    def ForOfStatement(self, stmt: dict, flags: int):
+        return self.GenerateIterationForStatement("of", stmt, self.BodyFlags(flags))
+
+    def LabeledStatement(self, stmt: dict, flags: int):
+        return Name(stmt["label"]) + ":" + self.MaybeBlock(stmt["body"], self.BodyFlags(flags))
+
+    def Program(self, stmt: dict, flags: int):
+        result = ""
+        bodyFlags = S_TFTF
+
+        body = stmt["body"]
+        for idx, item in enumerate(body):
+            if idx == len(body) - 1:
+                bodyFlags |= F_SEMICOLON_OPT
+            fragment = self.base + self.GenerateStatement(item, bodyFlags)
+            result += fragment
+            if idx + 1 < len(body) and not EndsWithLineTerminator(fragment):
+                result += NEWLINE
+
+        return result
+
+    def FunctionDeclaration(self, stmt: dict, flags: int):
+        return (GenerateAsyncPrefix(stmt) + "function"
+                + (GenerateStarSuffix(stmt) or " ")
+                + (Name(stmt["id"]) if Truthy(stmt.get("id")) else "")
+                + self.GenerateFunctionBody(stmt))
+
+    def ReturnStatement(self, stmt: dict, flags: int):
+        if Truthy(stmt.get("argument")):
+            return Join(
+                    "return",
+                    self.GenerateExpression(stmt["argument"], SEQUENCE, E_TTT)) + ";"
+        return "return;"
+
+    def WhileStatement(self, stmt: dict, flags: int):
+        with self.Indented():
+            result = ("while" + SPACE + "("
+                      + self.GenerateExpression(stmt["test"], SEQUENCE, E_TTT) + ")")
+
+        return result + self.MaybeBlock(stmt["body"], self.BodyFlags(flags))
+
+    def WithStatement(self, stmt: dict, flags: int):
+        with self.Indented():
+            result = ("with" + SPACE + "("
+                      + self.GenerateExpression(stmt["object"], SEQUENCE, E_TTT) + ")")
+
+        return result + self.MaybeBlock(stmt["body"], self.BodyFlags(flags))
+
+    ## Expressions ===================================================
+
+    def SequenceExpression(self, expr: dict, precedence: int, flags: int):
+        if SEQUENCE < precedence:
+            flags |= F_ALLOW_IN
+
+        result = ("," + SPACE).join(
+                    self.GenerateExpression(item, ASSIGNMENT, flags)
+                    for item in expr["expressions"])
+
+        return Parenthesize(result, SEQUENCE, precedence)
+
+    def AssignmentExpression(self, expr: dict, precedence: int, flags: int):
+        return self.GenerateAssignment(
+                expr["left"], expr["right"], expr["operator"], precedence, flags)
+
+    def ArrowFunctionExpression(self, expr: dict, precedence: int, flags: int):
+        return Parenthesize(self.GenerateFunctionBody(expr), ARROW_FUNCTION, precedence)
+
+    def ConditionalExpression(self, expr: dict, precedence: int, flags: int):
+        if CONDITIONAL < precedence:
+            flags |= F_ALLOW_IN
+
+        return Parenthesize(
+                self.GenerateExpression(expr["test"], COALESCE, flags)
+                + SPACE + "?" + SPACE
+                + self.GenerateExpression(expr["consequent"], ASSIGNMENT, flags)
+                + SPACE + ":" + SPACE
+                + self.GenerateExpression(expr["alternate"], ASSIGNMENT, flags),
+                CONDITIONAL, precedence)
+
+    def LogicalExpression(self, expr: dict, precedence: int, flags: int):
+        if expr["operator"] == "??":
+            flags |= F_FOUND_COALESCE
+        return self.BinaryExpression(expr, precedence, flags)
+
+    def BinaryExpression(self, expr: dict, precedence: int, flags: int):
+        operator = expr["operator"]
+        currentPrecedence = BINARY_PRECEDENCE[operator]
+        leftPrecedence = POSTFIX if operator == "**" else currentPrecedence
+        rightPrecedence = currentPrecedence if operator == "**" else currentPrecedence + 1
+
+        if currentPrecedence < precedence:
+            flags |= F_ALLOW_IN
+
+        fragment = self.GenerateExpression(expr["left"], leftPrecedence, flags)
+        if CharAt(fragment, -1) == "/" and IsIdentifierPart(CharAt(operator, 0)):
+            result = fragment + " " + operator
+        else:
+            result = Join(fragment, operator)
+
+        fragment = self.GenerateExpression(expr["right"], rightPrecedence, flags)
+        if ((operator == "/" and CharAt(fragment, 0) == "/")
+                or (operator[-1:] == "<" and fragment[:3] == "!--")):
+            result += " " + fragment
+        else:
+            result = Join(result, fragment)
+
+        if operator == "in" and not flags & F_ALLOW_IN:
+            return f"({result})"
+        if operator in ("||", "&&") and flags & F_FOUND_COALESCE:
+            return f"({result})"
+
+        return Parenthesize(result, currentPrecedence, precedence)
+
+    def GenerateArguments(self, arguments: list):
+        return "(" + ("," + SPACE).join(
+                        self.GenerateExpression(item, ASSIGNMENT, E_TTT)
+                        for item in arguments) + ")"
+
+    def CallExpression(self, expr: dict, precedence: int, flags: int):
+        result = self.GenerateExpression(expr["callee"], CALL, E_TTF)
+        if Truthy(expr.get("optional")):
+            result += "?."
+        result += self.GenerateArguments(expr["arguments"])
+
+        if not flags & F_ALLOW_CALL:
+            return f"({result})"
+
+        return Parenthesize(result, CALL, precedence)
+
+    def ChainExpression(self, expr: dict, precedence: int, flags: int):
+        if OPTIONAL_CHAINING < precedence:
+            flags |= F_ALLOW_CALL
+
+        result = self.GenerateExpression(expr["expression"], OPTIONAL_CHAINING, flags)
+
+        return Parenthesize(result, OPTIONAL_CHAINING, precedence)
+
+    def NewExpression(self, expr: dict, precedence: int, flags: int):
+        # The arguments are always parenthesized by default.
+        result = Join("new", self.GenerateExpression(expr["callee"], NEW, E_TFF))
+        result += self.GenerateArguments(expr["arguments"])
+
+        return Parenthesize(result, NEW, precedence)
+
+    def MemberExpression(self, expr: dict, precedence: int, flags: int):
+        result = self.GenerateExpression(
+                    expr["object"], CALL, E_TTF if flags & F_ALLOW_CALL else E_TFF)
+        optional = Truthy(expr.get("optional"))
+
+        if Truthy(expr.get("computed")):
+            if optional:
+                result += "?."
+            result += "[" + self.GenerateExpression(
+                                expr["property"], SEQUENCE,
+                                E_TTT if flags & F_ALLOW_CALL else E_TFT) + "]"
+        else:
+            # 1.toString() is not valid, so an integer needs a space.
+            if (not optional and expr["object"]["type"] == "Literal"
+                    and IsNumber(expr["object"].get("value"))):
+                if ("." not in result and not re.search("[eExX]", result)
+                        and IsDecimalDigit(CharAt(result, -1))
+                        and not (len(result) >= 2 and result[0] == "0")):
+                    result += " "
+            result += "?." if optional else "."
+            result += Name(expr["property"])
+
+        return Parenthesize(result, MEMBER, precedence)
+
+    def MetaProperty(self, expr: dict, precedence: int, flags: int):
+        meta = expr["meta"] if isinstance(expr["meta"], str) else Name(expr["meta"])
+        prop = expr["property"] if isinstance(expr["property"], str) else Name(expr["property"])
+        return Parenthesize(f"{meta}.{prop}", MEMBER, precedence)
+
+    def UnaryExpression(self, expr: dict, precedence: int, flags: int):
+        operator = expr["operator"]
+        fragment = self.GenerateExpression(expr["argument"], UNARY, E_TTT)
+
+        if len(operator) > 2:
+            result = Join(operator, fragment)
+        else:
+            leftChar = CharAt(operator, -1)
+            rightChar = CharAt(fragment, 0)
+            if ((leftChar in ("+", "-") and leftChar == rightChar)
+                    or (IsIdentifierPart(leftChar) and IsIdentifierPart(rightChar))):
+                result = operator + " " + fragment
+            else:
+                result = operator + fragment
+
+        return Parenthesize(result, UNARY, precedence)
+
+    def YieldExpression(self, expr: dict, precedence: int, flags: int):
+        result = "yield*" if Truthy(expr.get("delegate")) else "yield"
+        if Truthy(expr.get("argument")):
+            result = Join(result, self.GenerateExpression(expr["argument"], YIELD, E_TTT))
+
+        return Parenthesize(result, YIELD, precedence)
+
+    def AwaitExpression(self, expr: dict, precedence: int, flags: int):
+        result = Join(
+                    "await*" if Truthy(expr.get("all")) else "await",
+                    self.GenerateExpression(expr["argument"], AWAIT, E_TTT))
+
+        return Parenthesize(result, AWAIT, precedence)
+
+    def UpdateExpression(self, expr: dict, precedence: int, flags: int):
+        if Truthy(expr.get("prefix")):
+            return Parenthesize(
+                    expr["operator"] + self.GenerateExpression(expr["argument"], UNARY, E_TTT),
+                    UNARY, precedence)
+
+        return Parenthesize(
+                self.GenerateExpression(expr["argument"], POSTFIX, E_TTT) + expr["operator"],
+                POSTFIX, precedence)
+
+    def FunctionExpression(self, expr: dict, precedence: int, flags: int):
+        result = GenerateAsyncPrefix(expr) + "function"
+        if Truthy(expr.get("id")):
+            result += (GenerateStarSuffix(expr) or " ") + Name(expr["id"])
+        else:
+            result += GenerateStarSuffix(expr) or SPACE
+
+        return result + self.GenerateFunctionBody(expr)
+
+    def ArrayPattern(self, expr: dict, precedence: int, flags: int):
+        return self.ArrayExpression(expr, precedence, flags, True)
+
+    def ArrayExpression(self, expr: dict, precedence: int, flags: int, isPattern=False):
+        elements = expr["elements"]
+        if not elements:
+            return "[]"
+
+        multiline = False if isPattern else len(elements) > 1
+        result = "[" + (NEWLINE if multiline else "")
+
+        with self.Indented() as indent:
+            for idx, element in enumerate(elements):
+                if not Truthy(element):
+                    if multiline:
+                        result += indent
+                    if idx + 1 == len(elements):
+                        result += ","
+                else:
+                    result += indent if multiline else ""
+                    result += self.GenerateExpression(element, ASSIGNMENT, E_TTT)
+                if idx + 1 < len(elements):
+                    result += "," + (NEWLINE if multiline else SPACE)
+
+        if multiline and not EndsWithLineTerminator(result):
+            result += NEWLINE
+
+        return result + (self.base if multiline else "") + "]"
+
+    def RestElement(self, expr: dict, precedence: int, flags: int):
+        return "..." + self.GeneratePattern(expr["argument"], NO_PRECEDENCE, 0)
+
+    def ClassExpression(self, expr: dict, precedence: int, flags: int):
+        return self.ClassDeclaration(expr, flags)
+
+    def MethodDefinition(self, expr: dict, precedence: int, flags: int):
+        result = "static" + SPACE if Truthy(expr.get("static")) else ""
+        key = self.GeneratePropertyKey(expr["key"], expr.get("computed"))
+
+        if expr["kind"] in ("get", "set"):
+            fragment = Join(expr["kind"], key) + self.GenerateFunctionBody(expr["value"])
+        else:
+            fragment = (GenerateMethodPrefix(expr) + key
+                        + self.GenerateFunctionBody(expr["value"]))
+
+        return Join(result, fragment)
+
+    def Property(self, expr: dict, precedence: int, flags: int):
+        if expr.get("kind") in ("get", "set"):
+            return (expr["kind"] + " "
+                    + self.GeneratePropertyKey(expr["key"], expr.get("computed"))
+                    + self.GenerateFunctionBody(expr["value"]))
+
+        if Truthy(expr.get("shorthand")):
+            if expr["value"]["type"] == "AssignmentPattern":
+                return self.AssignmentPattern(expr["value"], SEQUENCE, E_TTT)
+            return self.GeneratePropertyKey(expr["key"], expr.get("computed"))
+
+        if Truthy(expr.get("method")):
+            return (GenerateMethodPrefix(expr)
+                    + self.GeneratePropertyKey(expr["key"], expr.get("computed"))
+                    + self.GenerateFunctionBody(expr["value"]))
+
+        return (self.GeneratePropertyKey(expr["key"], expr.get("computed"))
+                + ":" + SPACE
+                + self.GenerateExpression(expr["value"], ASSIGNMENT, E_TTT))
+
+    def ObjectExpression(self, expr: dict, precedence: int, flags: int):
+        properties = expr["properties"]
+        if not properties:
+            return "{}"
+        multiline = len(properties) > 1
+
+        with self.Indented():
+            fragment = self.GenerateExpression(properties[0], SEQUENCE, E_TTT)
+
+        if not multiline and not HasLineTerminator(fragment):
+            return "{" + SPACE + fragment + SPACE + "}"
+
+        with self.Indented() as indent:
+            result = "{" + NEWLINE + indent + fragment
+            if multiline:
+                result += "," + NEWLINE
+                for idx in range(1, len(properties)):
+                    result += indent + self.GenerateExpression(properties[idx], SEQUENCE, E_TTT)
+                    if idx + 1 < len(properties):
+                        result += "," + NEWLINE
+
+        if not EndsWithLineTerminator(result):
+            result += NEWLINE
+
+        return result + self.base + "}"
+
+    def AssignmentPattern(self, expr: dict, precedence: int, flags: int):
+        return self.GenerateAssignment(expr["left"], expr["right"], "=", precedence, flags)
+
+    def ObjectPattern(self, expr: dict, precedence: int, flags: int):
+        properties = expr["properties"]
+        if not properties:
+            return "{}"
+
+        if len(properties) == 1:
+            prop = properties[0]
+            multiline = prop["type"] == "Property" and prop["value"]["type"] != "Identifier"
+        else:
+            multiline = any(
+                    prop["type"] == "Property" and not Truthy(prop.get("shorthand"))
+                    for prop in properties)
+
+        result = "{" + (NEWLINE if multiline else "")
+
+        with self.Indented() as indent:
+            for idx, prop in enumerate(properties):
+                result += indent if multiline else ""
+                result += self.GenerateExpression(prop, SEQUENCE, E_TTT)
+                if idx + 1 < len(properties):
+                    result += "," + (NEWLINE if multiline else SPACE)
+
+        if multiline and not EndsWithLineTerminator(result):
+            result += NEWLINE
+
+        return result + (self.base if multiline else "") + "}"
+
+    def ThisExpression(self, expr: dict, precedence: int, flags: int):
+        return "this"
+
+    def Super(self, expr: dict, precedence: int, flags: int):
+        return "super"
+
+    def Identifier(self, expr: dict, precedence: int, flags: int):
+        return Name(expr)
+
+    def ImportDefaultSpecifier(self, expr: dict, precedence: int, flags: int):
+        return Name(expr.get("id") or expr["local"])
+
+    def ImportNamespaceSpecifier(self, expr: dict, precedence: int, flags: int):
+        local = expr.get("id") or expr.get("local")
+        if Truthy(local):
+            return "*" + SPACE + "as " + Name(local)
+        return "*"
+
+    def ImportSpecifier(self, expr: dict, precedence: int, flags: int):
+        imported = Name(expr["imported"])
+        local = expr.get("local")
+        if Truthy(local) and Name(local) != imported:
+            return imported + " as " + Name(local)
+        return imported
+
+    def ExportSpecifier(self, expr: dict, precedence: int, flags: int):
+        local = Name(expr["local"])
+        exported = expr.get("exported")
+        if Truthy(exported) and Name(exported) != local:
+            return local + " as " + Name(exported)
+        return local
+
+    def Literal(self, expr: dict, precedence: int, flags: int):
+        if Truthy(expr.get("regex")):
+            return f"/{expr['regex']['pattern']}/{expr['regex']['flags']}"
+        if Truthy(expr.get("bigint")):
+            return f"{expr['bigint']}n"
+
+        # Unlike the null value, a missing value is not a literal escodegen
+        # can generate.
+        if "value" not in expr:
+            raise InvalidAST("Literal without value")
+
+        value = expr["value"]
+        if value == None:
+            return "null"
+        elif isinstance(value, str):
+            return EscapeString(value)
+        elif isinstance(value, bool):
+            return "true" if value else "false"
+        elif IsNumber(value):
+            return GenerateNumber(value)
+
+        raise Unsupported(f"Literal of {type(value).__name__} is not handled")
+
+    def SpreadElement(self, expr: dict, precedence: int, flags: int):
+        return "..." + self.GenerateExpression(expr["argument"], ASSIGNMENT, E_TTT)
+
+    def TaggedTemplateExpression(self, expr: dict, precedence: int, flags: int):
+        itemFlags = E_TTF if flags & F_ALLOW_CALL else E_TFF
+        result = (self.GenerateExpression(expr["tag"], CALL, itemFlags)
+                  + self.GenerateExpression(expr["quasi"], PRIMARY, E_FFT))
+
+        return Parenthesize(result, TAGGED_TEMPLATE, precedence)
+
+    def TemplateElement(self, expr: dict, precedence: int, flags: int):
+        # The raw value, as the cooked one breaks the tagged templates.
+        return expr["value"]["raw"]
+
+    def TemplateLiteral(self, expr: dict, precedence: int, flags: int):
+        quasis = expr["quasis"]
+        result = "`"
+        for idx, quasi in enumerate(quasis):
+            result += self.GenerateExpression(quasi, PRIMARY, E_TTT)
+            if idx + 1 < len(quasis):
+                result += ("${" + SPACE
+                           + self.GenerateExpression(expr["expressions"][idx], SEQUENCE, E_TTT)
+                           + SPACE + "}")
+
+        return result + "`"
+
+    def ModuleSpecifier(self, expr: dict, precedence: int, flags: int):
+        return self.Literal(expr, precedence, flags)
+
+    def ImportExpression(self, expr: dict, precedence: int, flags: int):
+        return Parenthesize(
+                "import(" + self.GenerateExpression(expr["source"], ASSIGNMENT, E_TTT) + ")",
+                CALL, precedence)
+
+def Unknown(nodeType):
+    """This function raises the error for the node type that is not
+    generated in its place.
+
+    args:
+        nodeType (str): type of the node.
+
+    returns:
+        None.
+    """
+
+    if nodeType in STATEMENTS or nodeType in EXPRESSIONS or nodeType in ESCODEGEN_ONLY:
+        raise Unsupported(f"Node type {nodeType} is not handled here")
+
+    raise InvalidAST(f"Unknown node type: {nodeType}")
+
+def IsClassPrefixed(fragment: str):
+    if fragment[:5] != "class":
+        return False
+    ch = CharAt(fragment, 5)
+    return ch == "{" or IsWhiteSpace(ch) or IsLineTerminator(ch)
+
+def IsFunctionPrefixed(fragment: str):
+    if fragment[:8] != "function":
+        return False
+    ch = CharAt(fragment, 8)
+    return ch in ("(", "*") or IsWhiteSpace(ch) or IsLineTerminator(ch)
+
+def IsAsyncPrefixed(fragment: str):
+    if fragment[:5] != "async" or not IsWhiteSpace(CharAt(fragment, 5)):
+        return False
+
+    idx = 6
+    while idx < len(fragment) and IsWhiteSpace(fragment[idx]):
+        idx += 1
+    if idx == len(fragment) or fragment[idx:idx+8] != "function":
+        return False
+
+    ch = CharAt(fragment, idx + 8)
+    return ch in ("(", "*") or IsWhiteSpace(ch) or IsLineTerminator(ch)
+
+def Generate(ast: dict):
+    """This function generates the JavaScript code of the AST.
+
+    args:
+        ast (dict): AST, usually of the whole program.
+
+    returns:
+        (str) generated code.
+    """
+
+    codegen = CodeGenerator()
+    nodeType = ast.get("type")
+
+    if nodeType in STATEMENTS:
+        return codegen.GenerateStatement(ast, S_TFFF)
+    elif nodeType in EXPRESSIONS:
+        return codegen.GenerateExpression(ast, SEQUENCE, E_TTT)
+
+    Unknown(nodeType)
@@ -0,0 +1,334 @@
+"""
+    This file holds the asyncio pipeline that overlaps the code generation
+    and the execution of the JS variants. The stages are:
+
+        AST -> JS codegen -> JIT-off run -> JIT-on run -> analysis
+
+    Each stage runs on its own workers, and the stages are connected with
+    bounded queues, so a variant moves on as soon as a stage is done with
+    it, and the throughput is bound by the slowest stage rather than by the
+    sum of the stages. The codegen workers are processes, each with its own
+    code generation service, so the ASTs are converted concurrently.
+
+    The AST variants are taken from the passed iterable as the codegen stage
+    asks for them. With a code dedup, the variants whose code was seen
+    before are dropped at the codegen stage, and, with a target number of
+    variants, the next AST variants are taken in their place.
+
+    Author: Anonymous.
+"""
+
+import os, sys
+import asyncio
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import JavaScript.JSCodeGenServer as JSCodeGenServer
+import JavaScript.JSVariantLearning as JSVariantLearning
+import Shared.ParallelRunner as ParallelRunner
+
+# Marks the end of the stream in the queues.
+DONE = None
+
+class CodegenCounts:
+    """Number of the AST variants that the codegen stage kept or dropped,
+    so the feeding of the ASTs can wait for the variants in flight."""
+
+    def __init__(self):
+        self.kept = 0
+        self.dropped = 0
+        self.changed = asyncio.Condition()
+
+    async def Count(self, kept: bool):
+        async with self.changed:
+            if kept:
+                self.kept += 1
+            else:
+                self.dropped += 1
+            self.changed.notify_all()
+
+async def CodegenStage(
+        astQueue, jitOffQueue, variantsPath: str, codegens, dedup, counts: CodegenCounts):
+    """This stage generates the JS code of the AST variant. The AST of a
+    variant whose code was seen before is removed, and the variant is not run.
+
+    args:
+        astQueue (Queue): queue of (variant id, AST path).
+        jitOffQueue (Queue): queue of (variant id, JS path).
+        variantsPath (str): directory where the JS variants are stored.
+        codegens (ProcessPoolExecutor): codegen worker processes.
+        dedup (CodeDedup): code dedup of the variants, if any.
+        counts (CodegenCounts): number of the kept and dropped variants.
+
+    returns:
+        None.
+    """
+
+    loop = asyncio.get_running_loop()
+
+    while True:
+        item = await astQueue.get()
+        if item is DONE:
+            break
+        variantId, astFilePath = item
+        name, ext = os.path.splitext(os.path.basename(astFilePath))
+        JSCodeFilePath = f"{variantsPath}/{name}.js"
+
+        code = await loop.run_in_executor(
+                    codegens, JSCodeGenServer.GenerateFromFile, astFilePath)
+
+        # As with the bulk codegen, an invalid AST has no code to run.
+        if code == None:
+            await counts.Count(True)
+            continue
+        if dedup and not dedup.Add(code):
+            os.remove(astFilePath)
+            await counts.Count(False)
+            continue
+        with open(JSCodeFilePath, 'w') as f:
+            f.write(code)
+        await counts.Count(True)
+        await jitOffQueue.put((variantId, JSCodeFilePath))
+
+async def JITOffStage(jitOffQueue, jitOnQueue, jitOffCommand: list):
+    """This stage runs the JS variant with the JIT compilation off.
+
+    args:
+        jitOffQueue (Queue): queue of (variant id, JS path).
+        jitOnQueue (Queue): queue of (variant id, JS path, JIT-off output).
+        jitOffCommand (list): command to execute VM with jit compilation off.
+
+    returns:
+        None.
+    """
+
+    while True:
+        item = await jitOffQueue.get()
+        if item is DONE:
+            break
+        variantId, path = item
+        jitOffOut = await asyncio.to_thread(
+                        JSVariantLearning.RunJITOff, jitOffCommand[:-1] + [path])
+        await jitOnQueue.put((variantId, path, jitOffOut))
+
+async def JITOnStage(jitOnQueue, analysisQueue, jitOnCommand: list):
+    """This stage runs the JS variant with the JIT compilation on.
+
+    args:
+        jitOnQueue (Queue): queue of (variant id, JS path, JIT-off output).
+        analysisQueue (Queue): queue of (variant id, JIT-on output, JIT-off output).
+        jitOnCommand (list): command to execute VM with jit compilation on.
+
+    returns:
+        None.
+    """
+
+    while True:
+        item = await jitOnQueue.get()
+        if item is DONE:
+            break
+        variantId, path, jitOffOut = item
+        # The JIT-off run is repeated if the JIT-on run cannot run where it did.
+        jitOnOut, jitOffOut = await asyncio.to_thread(
+                        JSVariantLearning.RunJITOn, jitOnCommand[:-1] + [path], jitOffOut)
+        await analysisQueue.put((variantId, jitOnOut, jitOffOut))
+
+async def AnalysisStage(analysisQueue, results: dict, analyze):
+    """This stage hands the results of the JS variant to the analysis.
+
+    args:
+        analysisQueue (Queue): queue of (variant id, JIT-on output, JIT-off output).
+        results (dict): variant id to (JIT-on output, JIT-off output).
+        analyze (function): function called with the variant id, JIT-on output,
+        and JIT-off output as soon as the variant is done, if any.
+
+    returns:
+        None.
+    """
+
+    while True:
+        item = await analysisQueue.get()
+        if item is DONE:
+            break
+        variantId, jitOnOut, jitOffOut = item
+        results[variantId] = (jitOnOut, jitOffOut)
+        if analyze:
+            analyze(variantId, jitOnOut, jitOffOut)
+
+async def FeedStage(astFilePaths, astQueue, counts: CodegenCounts, target: int):
+    """This stage takes the AST variants from the iterable and feeds them
+    to the codegen stage. With a target, a variant is taken only while the
+    kept variants and the variants in flight are fewer than the target, so
+    the taken variants after the first ones only replace the dropped ones.
+
+    args:
+        astFilePaths (iterable): AST variant paths.
+        astQueue (Queue): queue of (variant id, AST path).
+        counts (CodegenCounts): number of the kept and dropped variants.
+        target (int): number of the variants to keep, or None for all.
+
+    returns:
+        (list) ids of the fed variants in the order of the iterable.
+    """
+
+    variantIds = []
+    astFilePaths = iter(astFilePaths)
+
+    while True:
+        # The next variant is taken only after the wait, as taking it
+        # generates it.
+        if target != None:
+            async with counts.changed:
+                await counts.changed.wait_for(
+                        lambda: len(variantIds) - counts.dropped < target
+                                or counts.kept >= target)
+            if counts.kept >= target:
+                break
+        astFilePath = next(astFilePaths, None)
+        if astFilePath == None:
+            break
+        variantId = int(astFilePath.split('__')[-1].split('.')[0])
+        variantIds.append(variantId)
+        await astQueue.put((variantId, astFilePath))
+
+    return variantIds
+
+async def CloseStages(feed, stages: tuple):
+    """This function feeds the AST variants, and then closes the stages one
+    after the other, so every variant goes through.
+
+    args:
+        feed (coroutine): feeding of the AST variants.
+        stages (tuple): tuple of (list of stage tasks, input queue of the stage).
+
+    returns:
+        (list) ids of the fed variants in the order of the iterable.
+    """
+
+    variantIds = await feed
+
+    for stage, queue in stages:
+        for task in stage:
+            await queue.put(DONE)
+        await asyncio.gather(*stage)
+
+    return variantIds
+
+async def RunStages(
+        astFilePaths, variantsPath: str, jitOnCommand: list,
+        jitOffCommand: list, workers: int, analyze, dedup, target: int):
+    """This function connects the stages with the bounded queues and
+    streams the AST variants through them.
+
+    args:
+        astFilePaths (iterable): AST variant paths.
+        variantsPath (str): directory where the JS variants are stored.
+        jitOnCommand (list): command to execute VM with jit compilation on.
+        jitOffCommand (list): command to execute VM with jit compilation off.
+        workers (int): number of workers per stage.
+        analyze (function): analysis of the finished variants, if any.
+        dedup (CodeDedup): code dedup of the variants, if any.
+        target (int): number of the variants to keep, or None for all.
+
+    returns:
+        (dict) variant id to (JIT-on output, JIT-off output).
+        (list) ids of the fed variants in the order of the iterable.
+    """
+
+    # The runs are blocking calls, so every worker of the two run stages
+    # gets its own thread. The codegen workers are fresh processes, as the
+    # forked ones would inherit the threads of the engine runs.
+    asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=workers*2))
+    codegenProcesses = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=JSCodeGenServer.Configure,
+            initargs=(JSCodeGenServer.CODE_GENERATOR,))
+
+    astQueue = asyncio.Queue(maxsize=workers*2)
+    jitOffQueue = asyncio.Queue(maxsize=workers*2)
+    jitOnQueue = asyncio.Queue(maxsize=workers*2)
+    analysisQueue = asyncio.Queue(maxsize=workers*2)
+
+    results = {}
+    counts = CodegenCounts()
+
+    codegens = [asyncio.create_task(
+                    CodegenStage(
+                        astQueue, jitOffQueue, variantsPath, codegenProcesses,
+                        dedup, counts))
+                for i in range(workers)]
+    jitOffs = [asyncio.create_task(
+                    JITOffStage(jitOffQueue, jitOnQueue, jitOffCommand))
+               for i in range(workers)]
+    jitOns = [asyncio.create_task(
+                    JITOnStage(jitOnQueue, analysisQueue, jitOnCommand))
+              for i in range(workers)]
+    analysis = asyncio.create_task(AnalysisStage(analysisQueue, results, analyze))
+
+    stages = codegens + jitOffs + jitOns + [analysis]
+    feed = asyncio.create_task(
+                CloseStages(
+                    FeedStage(astFilePaths, astQueue, counts, target),
+                    (
+                        (codegens, astQueue), (jitOffs, jitOffQueue),
+                        (jitOns, jitOnQueue), ([analysis], analysisQueue))))
+
+    # The first stage that fails cancels all the others, as the stages
+    # before it would wait forever on its queue, and its error is raised.
+    try:
+        await asyncio.gather(feed, *stages)
+    except BaseException:
+        for task in [feed] + stages:
+            task.cancel()
+        await asyncio.gather(feed, *stages, return_exceptions=True)
+        raise
+    finally:
+        codegenProcesses.shutdown(cancel_futures=True)
+
+    variantIds = feed.result()
+
+    return results, variantIds
+
+def RunPipeline(
+        astFilePaths, variantsPath: str, jitOnCommand: list,
+        jitOffCommand: list, workers: int, analyze=None, dedup=None, target: int=None):
+    """This function generates the JS code of the AST variants and runs them
+    with the JIT compilation on and off in the pipeline.
+
+    args:
+        astFilePaths (iterable): AST variant paths.
+        variantsPath (str): directory where the JS variants are stored.
+        jitOnCommand (list): command to execute VM with jit compilation on.
+        jitOffCommand (list): command to execute VM with jit compilation off.
+        workers (int): number of workers per stage (0 for all cores).
+        analyze (function): function called with the variant id, JIT-on output,
+        and JIT-off output as soon as the variant is done, if any.
+        dedup (CodeDedup): code dedup of the variants, if any.
+        target (int): number of the variants to keep, or None for all.
+
+    returns:
+        (list) list of (variant id, JIT-on output, JIT-off output) in the
+        order of the passed AST variants, without the invalid ASTs and
+        the duplicates.
+    """
+
+    workers = ParallelRunner.GetWorkerCount(workers)
+
+    results, variantIds = asyncio.run(RunStages(
+                            astFilePaths, variantsPath, jitOnCommand, jitOffCommand,
+                            workers, analyze, dedup, target))
+
+    outputs = []
+    for variantId in variantIds:
+        if variantId not in results:
+            continue
+        jitOnOut, jitOffOut = results[variantId]
+        outputs.append((variantId, jitOnOut, jitOffOut))
+
+    return outputs
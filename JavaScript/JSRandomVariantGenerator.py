@@ -8,7 +8,6 @@
 
 import os, sys
 import json
-import copy
 import random
 import subprocess
 import argparse
@@ -22,6 +21,12 @@ sys.path.append(parentdir)
 
 import JavaScript.JSAstGenerator as JSAstG
 import JavaScript.SharedEditors as Shared
+import JavaScript.JSCodeGenServer as JSCodeGenServer
+import Shared.VariantDelta as VariantDelta
+import Shared.CodeDedup as CodeDedup
+
+# Number of runs of every variant, i.e., with the JIT compilation on and off.
+RUNS_PER_VARIANT = 2
 
 def RandomVariantGenerator(
         variantsPath: str, astDirPath: str, fileBase: str, originalJS: str, number: int,
@@ -29,6 +34,9 @@ def RandomVariantGenerator(
 ):
     """This function calls ast_editor specified N times to modify
     the original input program's ast and generate variant input programs.
+    The variants whose code is the same as that of the original or of a
+    variant before are not stored, so they are not run, and the next
+    variants are generated in their place.
 
     args:
         variantsPath (str): directory where all variants will be stored.
@@ -41,53 +49,138 @@ def RandomVariantGenerator(
         (dict) keep a map between the variant id-to-edited node id.
     """
 
-    astFilePaths = []
     astId2editNodeId = {}
     
     # Generate AST for the original JS code.
     # G = (V, E).
     originalAST = JSAstG.AstGenerator(originalJS)
 
-    # Generate AST variants and store them to the astDirPath.
-    astVariants = randomASTVariantGenerator(originalAST.toDict(), number, langInfo)
+    # Holds the generated variants as their edits to the original AST.
+    astVariants = VariantDelta.VariantStore(originalAST.toDict())
+
+    # Variants are deduplicated by their generated code, including
+    # the variants with the same code as the original.
+    codes = SeedDedup(astVariants.seed)
+    storedIds = []
 
-    for variantId, astVariant in astVariants.items():
+    # The variants are generated and materialized one at a time, while
+    # being written, until the number of the stored variants is reached.
+    for variantId in RandomASTVariants(astVariants, langInfo):
+        ast = astVariants.Materialize(variantId)
+        code = JSCodeGenServer.GenerateAST(ast)
+        # An invalid AST has no code, and is stored as before.
+        if code != None and not codes.Add(code):
+            continue
         variantFilePath = f"{astDirPath}/{fileBase}-variant__{variantId}.json"
-        astFilePaths.append(variantFilePath)
         with open(variantFilePath, 'w') as ast_f:
-            json.dump(astVariant[0], ast_f)
-        astId2editNodeId[variantId] = astVariant[1]
-        variantId += 1
-
-    # Generate JS code variants based on the generated AST variants.
-    Shared.JSCodeGenerator(variantsPath, astFilePaths)
+            json.dump(ast, ast_f)
+        if code != None:
+            with open(f"{variantsPath}/{fileBase}-variant__{variantId}.js", 'w') as js_f:
+                js_f.write(code)
+        astId2editNodeId[variantId] = astVariants.Get(variantId).nodeIds[0]
+        storedIds.append(variantId)
+        if len(storedIds) == number*2 - 1:
+            break
+    astVariants.SaveEditLog(astDirPath, storedIds)
+    codes.Report()
 
     return originalAST.toDict(), astId2editNodeId
 
-def randomASTVariantGenerator(originalAST: dict, number: int, langInfo: dict):
-    """This function edits the original AST to generate N number of AST variants.
+class VariantStream:
+    """AST variants that are generated and written one at a time, as the
+    pipeline asks for them. The pipeline generates their codes, and drops
+    the duplicates, so a dropped variant is replaced by the next one."""
+
+    def __init__(
+            self, astDirPath: str, fileBase: str, originalJS: str, number: int,
+            langInfo: dict):
+        """
+        args:
+            astDirPath (str): directory where all asts will be stored.
+            fileBase (str): name of the original input file without the extension.
+            originalJS (str): original JS code to generate variants from.
+            number (int): user-specified number to generate N number of variants.
+            langInfo (dict): information about the JS language, such as types and methods, etc.
+        """
+
+        self.astDirPath = astDirPath
+        self.fileBase = fileBase
+        self.langInfo = langInfo
+        self.astVariants = VariantDelta.VariantStore(
+                                JSAstG.AstGenerator(originalJS).toDict())
+        # Number of the variants to run.
+        self.target = number*2 - 1
+        # Variants are deduplicated by their generated code in the pipeline.
+        self.codes = SeedDedup(self.astVariants.seed)
+        self.astId2editNodeId = {}
+        self.writtenIds = []
+
+    def __iter__(self):
+        for variantId in RandomASTVariants(self.astVariants, self.langInfo):
+            with open(self.ASTPath(variantId), 'w') as ast_f:
+                json.dump(self.astVariants.Materialize(variantId), ast_f)
+            self.astId2editNodeId[variantId] = self.astVariants.Get(variantId).nodeIds[0]
+            self.writtenIds.append(variantId)
+            yield self.ASTPath(variantId)
+
+    def ASTPath(self, variantId: int):
+        return f"{self.astDirPath}/{self.fileBase}-variant__{variantId}.json"
+
+    def Close(self):
+        """This function writes the edit log of the variants that the
+        pipeline kept, i.e., whose ASTs were not removed as duplicates.
+
+        returns:
+            None.
+        """
+
+        storedIds = [
+            variantId for variantId in self.writtenIds
+            if os.path.exists(self.ASTPath(variantId))
+        ]
+        for variantId in set(self.writtenIds) - set(storedIds):
+            del self.astId2editNodeId[variantId]
+        self.astVariants.SaveEditLog(self.astDirPath, storedIds)
+        self.codes.Report()
+
+def SeedDedup(seed: dict):
+    """This function creates the code dedup of the variants, which holds
+    the code of the original, if it can be generated.
 
     args:
-        originalAST (dict): abstract syntax tree of the original input code.
-        number (int): user-specified number to generate N number of variants.
-        langInfo (dict): information about the JS language, such as types and methods, etc.
+        seed (dict): original AST.
 
     returns:
-        (dict) dictionary of ast variant-to-edited target node id.
+        (CodeDedup) code dedup.
+    """
+
+    codes = CodeDedup.CodeDedup(RUNS_PER_VARIANT)
+    originalCode = JSCodeGenServer.GenerateAST(seed)
+    if originalCode != None:
+        codes.Add(originalCode)
+
+    return codes
+
+def RandomASTVariants(astVariants: VariantDelta.VariantStore, langInfo: dict):
+    """This function edits the original AST one node at a time, and adds
+    every new AST variant to the variant store.
+
+    args:
+        astVariants (VariantStore): store of the variants of the original AST.
+        langInfo (dict): information about the JS language, such as types and methods, etc.
+
+    yields:
+        (int) id of the new AST variant.
     """
 
-    # Lists to hold the generated variants.
-    astVariants_ref = [originalAST]
-    astVariants = {}
     # True if needing the target node id.
     need_target = True
 
-    # Scans the tree once to find the total number of nodes
-    # in the tree.
-    total_nodes = Shared.treeScanner(originalAST, 1)
+    # Indexes the tree once, which also finds the total number
+    # of nodes in the tree.
+    index = Shared.indexTree(astVariants.seed)
+    total_nodes = index.Total()
 
-    # Tracks the number of generated variants number.
-    generated = 1
     # Sets the target_node_id to 1.
     target_node_id = 1
 
@@ -96,35 +189,54 @@ def randomASTVariantGenerator(originalAST: dict, number: int, langInfo: dict):
   
     # Call ast_editor function to modify the original input program's AST.
     for i in range(1, total_nodes*2):
+        # Edit AST tree until actually one node was edited. The editing can fail if
+        # the node type is currently not handle, which then the WARNING will be printed.
+        # If such case happen, then we want to choose another node to edit without incrementing i.
+        while need_target:
+            # Randomly select the node id between 1..N-1, where N = |V|.
+            #target_node_id = randint(1, total_nodes - 1)
+            # The variant shares all but the edited path with the original AST.
+            ast_copy, need_target = Shared.indexedEditor(
+                                        index, target_node_id, langInfo, id2edit)
+            if target_node_id >= total_nodes:
+                target_node_id = 1
+            else:
+                # Either a new ast variant was generated or not, we increment the target_node_id
+                # to point to the next node.
+                target_node_id += 1
+
+        # IF the editing was successful, need_target will be set to False.
+        # Thus, we need to manually set to True, to the main for-loop continues.
+        need_target = True
+        # If the variant does not already exist in the astVariants, add to it.
+        variantId = astVariants.Add(ast_copy, [target_node_id-1])
+        if variantId != None:
+            yield variantId
+
+        if target_node_id > total_nodes:
+            target_node_id = 1
+
+def randomASTVariantGenerator(originalAST: dict, number: int, langInfo: dict):
+    """This function edits the original AST to generate N number of AST variants.
+
+    args:
+        originalAST (dict): abstract syntax tree of the original input code.
+        number (int): user-specified number to generate N number of variants.
+        langInfo (dict): information about the JS language, such as types and methods, etc.
+
+    returns:
+        (VariantStore) deltas of the ast variants with the edited target node ids.
+    """
+
+    # Holds the generated variants as their edits to the original AST.
+    astVariants = VariantDelta.VariantStore(originalAST)
+
+    # Tracks the number of generated variants number.
+    generated = 1
+    for variantId in RandomASTVariants(astVariants, langInfo):
+        generated += 1
         if generated == number*2:
             break
-        else:
-            ast_copy = copy.deepcopy(originalAST)
-            # Edit AST tree until actually one node was edited. The editing can fail if
-            # the node type is currently not handle, which then the WARNING will be printed.
-            # If such case happen, then we want to choose another node to edit without incrementing i.
-            while need_target:
-                # Randomly select the node id between 1..N-1, where N = |V|.
-                #target_node_id = randint(1, total_nodes - 1)
-                need_target = Shared.ast_editor(ast_copy, target_node_id, langInfo, id2edit)
-                if target_node_id >= total_nodes:
-                    target_node_id = 1
-                else:
-                    # Either a new ast variant was generated or not, we increment the target_node_id
-                    # to point to the next node.
-                    target_node_id += 1
-
-            # IF the editing was successful, need_target will be set to False.
-            # Thus, we need to manually set to True, to the main for-loop continues.
-            need_target = True
-            # If the variant does not already exist in the astVariants list, add to it.
-            if ast_copy not in astVariants_ref:
-                astVariants_ref.append(ast_copy)
-                astVariants[generated] = [ast_copy, target_node_id-1]
-                generated += 1
-
-            if target_node_id > total_nodes:
-                target_node_id = 1
 
     return astVariants
 
@@ -159,5 +271,5 @@ if __name__ == "__main__":
         # Generate AST variants and store them to the astDirPath.
         astVariants = randomASTVariantGenerator(originalAST.toDict(), number, langInfo)
 
-        for id, ast in astVariants.items():
-            print ("Modified AST: ", id, ast)
+        for id in astVariants.Ids():
+            print ("Modified AST: ", id, astVariants.Materialize(id))
@@ -0,0 +1,317 @@
+"""
+    This file generates the code of a JS variant by patching the source code
+    of the seed. The seed is parsed with the source ranges of the nodes, and
+    the variant is compared with the seed AST. Only the nodes edited by
+    modifyElement (literals, operators, identifiers, etc.) are converted by
+    the native code generator, and their code is spliced into the seed code
+    at the range of the seed node. The rest of the seed code, including its
+    formatting, is kept as is.
+
+    An edited node is spliced only where its code is parsed back into the
+    same node. Otherwise, e.g., for the structural edits, the variant is
+    left to the full code generation.
+
+    Author: Anonymous.
+"""
+
+import os, sys
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import esprima
+
+import JavaScript.JSNativeCodeGenerator as JSNativeCodeGenerator
+
+# The nodes whose code is a single token.
+PRIMARIES = {"Identifier", "Literal", "ThisExpression"}
+
+# The nodes whose descendants are binding or assignment targets.
+PATTERNS = {"ObjectPattern", "ArrayPattern", "AssignmentPattern", "RestElement"}
+
+# The (parent type, key) of the children that are not expressions, i.e.,
+# names, bindings, and assignment targets.
+NON_EXPRESSION_SLOTS = {
+    ("VariableDeclarator", "id"), ("FunctionDeclaration", "id"),
+    ("FunctionDeclaration", "params"), ("FunctionExpression", "id"),
+    ("FunctionExpression", "params"), ("ArrowFunctionExpression", "params"),
+    ("ClassDeclaration", "id"), ("ClassExpression", "id"), ("CatchClause", "param"),
+    ("LabeledStatement", "label"), ("BreakStatement", "label"),
+    ("ContinueStatement", "label"), ("AssignmentExpression", "left"),
+    ("UpdateExpression", "argument"), ("ForInStatement", "left"),
+    ("ForOfStatement", "left"), ("MetaProperty", "meta"),
+    ("MetaProperty", "property"),
+}
+
+# The characters after which a parenthesized expression cannot be taken
+# as the arguments of a call on the preceding code.
+SAFE_PRECEDING = set("([,=+-*%&|^!~?:<>;{")
+# The keywords after which a parenthesized expression is safe as well.
+SAFE_KEYWORDS = {
+    "return", "typeof", "void", "delete", "in", "of", "instanceof", "case",
+    "throw", "new", "else", "do", "yield", "await",
+}
+
+class SeedSource:
+    """Source code of the seed with the AST and the node ranges."""
+
+    def __init__(self, code: str, ast: dict=None):
+        """
+        args:
+            code (str): source code of the seed.
+            ast (dict): AST of the seed the variants are generated from, if any.
+        """
+
+        self.code = code
+        self.ranged = esprima.parseScript(code, range=True).toDict()
+        self.ast = StripRanges(self.ranged)
+
+        # The variants share the unedited subtrees with the seed AST they
+        # are copied from, so those subtrees are compared by identity.
+        if ast != None and ast == self.ast:
+            self.ast = ast
+
+        # If the code of the seed AST cannot be generated, e.g., for the null
+        # literals without a value, neither can the code of the variants
+        # that keep the invalid nodes, so they are not patched either.
+        try:
+            JSNativeCodeGenerator.Generate(self.ast)
+            self.valid = True
+        except (JSNativeCodeGenerator.InvalidAST, JSNativeCodeGenerator.Unsupported):
+            self.valid = False
+
+def StripRanges(node):
+    """This function copies the AST without the "range" fields, i.e., the
+    AST as the variant generators see it.
+
+    args:
+        node (dict): AST with the ranges.
+
+    returns:
+        (dict) AST without the ranges.
+    """
+
+    if isinstance(node, dict):
+        return {key: StripRanges(value) for key, value in node.items() if key != "range"}
+    elif isinstance(node, list):
+        return [StripRanges(elem) for elem in node]
+
+    return node
+
+def IsWordChar(ch: str):
+    return ch == "$" or ch == "_" or ch.isalnum() or JSNativeCodeGenerator.IsIdentifierPart(ch)
+
+def IsExpressionSlot(parent: dict, key: str, inPattern: bool):
+    """This function checks whether the child of the parent node at the key
+    is an expression, i.e., whether any expression in parentheses can take
+    its place.
+
+    args:
+        parent (dict): parent node.
+        key (str): key of the child in the parent node.
+        inPattern (bool): True if the parent is within a pattern.
+
+    returns:
+        (bool) True if the child is an expression.
+    """
+
+    parentType = parent.get("type")
+
+    if inPattern or (parentType, key) in NON_EXPRESSION_SLOTS:
+        return False
+    elif parentType == "MemberExpression" and key == "property":
+        return JSNativeCodeGenerator.Truthy(parent.get("computed"))
+    elif parentType in ("Property", "MethodDefinition") and key == "key":
+        return JSNativeCodeGenerator.Truthy(parent.get("computed"))
+    elif parentType == "ExpressionStatement" and "directive" in parent:
+        return False
+
+    return True
+
+def IsSafePreceding(code: str, start: int):
+    """This function checks whether the code before the start can be followed
+    by a parenthesized expression without changing how it is parsed.
+
+    args:
+        code (str): source code of the seed.
+        start (int): start of the node.
+
+    returns:
+        (bool) True if it is safe.
+    """
+
+    idx = start - 1
+    while idx >= 0 and code[idx].isspace():
+        idx -= 1
+
+    if idx < 0 or code[idx] in SAFE_PRECEDING:
+        return True
+
+    end = idx + 1
+    while idx >= 0 and IsWordChar(code[idx]):
+        idx -= 1
+
+    return code[idx+1:end] in SAFE_KEYWORDS
+
+def PatchNode(
+        code: str, seedNode: dict, rangedNode: dict, variantNode: dict,
+        parent: dict, key: str, inPattern: bool, patches: list):
+    """This function adds the patch of the edited node, if it can be spliced.
+
+    args:
+        code (str): source code of the seed.
+        seedNode (dict): node of the seed.
+        rangedNode (dict): node of the seed with the range.
+        variantNode (dict): edited node of the variant.
+        parent (dict): parent node of the variant.
+        key (str): key of the node in the parent.
+        inPattern (bool): True if the parent is within a pattern.
+        patches (list): list of (start, end, code) to add the patch to.
+
+    returns:
+        (bool) True if the patch was added.
+    """
+
+    # The key and the value of a shorthand property are the same code.
+    if (
+            not isinstance(variantNode, dict) or "range" not in rangedNode
+            or seedNode.get("type") not in JSNativeCodeGenerator.EXPRESSIONS
+            or variantNode.get("type") not in JSNativeCodeGenerator.EXPRESSIONS
+            or (parent.get("type") == "Property"
+                and JSNativeCodeGenerator.Truthy(parent.get("shorthand")))
+    ):
+        return False
+
+    start, end = rangedNode["range"]
+    text = JSNativeCodeGenerator.Generate(variantNode)
+
+    if not IsExpressionSlot(parent, key, inPattern):
+        # Only a name or a literal of the same kind can take the place.
+        if (
+                seedNode["type"] != variantNode["type"]
+                or seedNode["type"] not in ("Identifier", "Literal")
+                or type(seedNode.get("value")) != type(variantNode.get("value"))
+                or "regex" in variantNode
+        ):
+            return False
+        patches.append((start, end, text))
+        return True
+
+    before = code[start-1] if start > 0 else ""
+    after = code[end] if end < len(code) else ""
+
+    # A single token spliced as is must not merge with the code around it.
+    if (
+            seedNode["type"] in PRIMARIES and variantNode["type"] in PRIMARIES
+            and text and not text.startswith("/")
+            and not (IsWordChar(before) and IsWordChar(text[0]))
+            and not (IsWordChar(after) and IsWordChar(text[-1]))
+            and not (after == "." and text[-1].isdigit())
+    ):
+        patches.append((start, end, text))
+        return True
+
+    # Anything else is spliced in parentheses, so the precedence of the
+    # surrounding code does not matter.
+    if not IsSafePreceding(code, start):
+        return False
+    patches.append((start, end, f"({text})"))
+
+    return True
+
+def DiffNodes(
+        code: str, seedNode: dict, rangedNode: dict, variantNode: dict,
+        parent: dict, key: str, inPattern: bool, patches: list):
+    """This function recursively compares the seed node with the variant node
+    and collects the patches of the edited nodes.
+
+    args:
+        code (str): source code of the seed.
+        seedNode (dict): node of the seed.
+        rangedNode (dict): node of the seed with the range.
+        variantNode (dict): node of the variant.
+        parent (dict): parent node of the variant.
+        key (str): key of the node in the parent.
+        inPattern (bool): True if the parent is within a pattern.
+        patches (list): list of (start, end, code) patches.
+
+    returns:
+        (bool) True if all edits can be patched.
+    """
+
+    if seedNode == variantNode:
+        return True
+
+    # The node itself is edited if any of its own fields is.
+    edited = (
+        not isinstance(variantNode, dict)
+        or seedNode.keys() != variantNode.keys()
+    )
+    if not edited:
+        for field, value in seedNode.items():
+            other = variantNode[field]
+            if isinstance(value, dict) != isinstance(other, dict):
+                edited = True
+            elif isinstance(value, list):
+                edited = not isinstance(other, list) or len(value) != len(other)
+            elif not isinstance(value, dict):
+                edited = value != other
+            if edited:
+                break
+
+    if edited:
+        return PatchNode(
+                code, seedNode, rangedNode, variantNode, parent, key, inPattern, patches)
+
+    childInPattern = inPattern or seedNode.get("type") in PATTERNS
+    for field, value in seedNode.items():
+        if isinstance(value, dict):
+            children = [(value, rangedNode[field], variantNode[field])]
+        elif isinstance(value, list):
+            children = zip(value, rangedNode[field], variantNode[field])
+        else:
+            continue
+        for seedChild, rangedChild, variantChild in children:
+            if seedChild == variantChild:
+                continue
+            # An array hole turned into an element or vice versa.
+            if not isinstance(seedChild, dict):
+                return False
+            if not DiffNodes(
+                    code, seedChild, rangedChild, variantChild, variantNode, field,
+                    childInPattern, patches):
+                return False
+
+    return True
+
+def Patch(seed: SeedSource, variant: dict):
+    """This function generates the code of the variant by patching the seed code.
+
+    args:
+        seed (SeedSource): seed to patch.
+        variant (dict): AST of the variant.
+
+    returns:
+        (str) code of the variant, or None if it cannot be patched, e.g., for
+        the structural edits. JSNativeCodeGenerator.InvalidAST is raised if
+        the code of an edited node cannot be generated.
+    """
+
+    if not seed.valid or seed.ast.get("type") != variant.get("type"):
+        return None
+
+    patches = []
+    if not DiffNodes(seed.code, seed.ast, seed.ranged, variant, {}, None, False, patches):
+        return None
+
+    patches.sort()
+    parts = []
+    last = 0
+    for start, end, text in patches:
+        parts.append(seed.code[last:start])
+        parts.append(text)
+        last = end
+    parts.append(seed.code[last:])
+
+    return "".join(parts)
@@ -16,9 +16,104 @@ sys.path.append(parentdir)
 
 import JavaScript.JSAstGenerator as JSAstG
 import JavaScript.SharedEditors as SharedEditors
+import JavaScript.JSEngineServer as JSEngineServer
+import JavaScript.JSBatchRunner as JSBatchRunner
+import JavaScript.JSCodeGenServer as JSCodeGenServer
+import Shared.ParallelRunner as ParallelRunner
+import Shared.ExecutionCache as ExecutionCache
+import Shared.Sandbox as Sandbox
+import Shared.OutputDigest as OutputDigest
+import Shared.VariantDelta as VariantDelta
+import Shared.StructuralHash as StructuralHash
 
 JSEXT = ".js"
 
+# Verdicts of the variant executions.
+BUGGY = "buggy"
+NONBUGGY = "non-buggy"
+TIMEOUT = "timeout"
+
+# Limits of every JS engine run. The timeout is calibrated per seed.
+LIMITS = Sandbox.Limits()
+
+# Kill the JIT-on run as soon as its stdout diverges from the JIT-off stdout.
+EARLY_KILL = False
+# Number of variants packed into a single engine process (0 or 1 disables it).
+BATCH_SIZE = 0
+# Directory where the stdouts of the buggy variants are kept. None keeps nothing.
+OUTPUTS_DIR = None
+# Environments of the engine server and the batch runs in the execution cache.
+SERVER = "engine-server"
+BATCH = "batch"
+
+def ConfigureExecution(arguments: dict):
+    """This function configures how the variants are executed by RunJITExe.
+
+    args:
+        arguments (dict): user arguments.
+
+    returns:
+        None.
+    """
+
+    if "root" in arguments:
+        root_path = arguments["root"]
+    else:
+        root_path = arguments["dirPath"]
+
+    # Run the variants on long-lived engine processes instead of
+    # starting a new process for every run.
+    if arguments.get("engineServer", False):
+        JSEngineServer.Enable(ParallelRunner.GetWorkerCount(arguments.get("workers", 0)))
+
+    # Generate the JS code in Python instead of on node, if selected.
+    JSCodeGenServer.Configure(arguments.get("codeGenerator", JSCodeGenServer.ESCODEGEN))
+
+    # Reuse the results of the programs that were already executed.
+    ExecutionCache.Configure(
+            f"{root_path}/misc/execution_cache.db",
+            arguments.get("cacheSize", ExecutionCache.DEFAULT_SIZE_MB))
+
+    LIMITS.memoryMB = arguments.get("memoryLimit", 0)
+    LIMITS.cpuSeconds = arguments.get("cpuLimit", 0)
+
+    global EARLY_KILL, BATCH_SIZE, OUTPUTS_DIR
+    EARLY_KILL = arguments.get("earlyDivergenceKill", False)
+    BATCH_SIZE = arguments.get("batchSize", 0)
+
+    # The stdouts are released at the verdict, and written to disk only for
+    # the buggy variants.
+    OUTPUTS_DIR = f"{root_path}/misc/outputs"
+    if not os.path.exists(OUTPUTS_DIR):
+        os.makedirs(OUTPUTS_DIR)
+
+def CalibrateTimeout(jitOffCommand: list, seed_path: str, arguments: dict):
+    """This function calibrates the timeout of the JS engine runs from
+    the runtime of the seed with the JIT compilation off.
+
+    args:
+        jitOffCommand (list): command to execute VM with jit compilation off.
+        seed_path (str): path to the seed input.
+        arguments (dict): user arguments.
+
+    returns:
+        (float) calibrated timeout in seconds.
+    """
+
+    LIMITS.timeout = Sandbox.Calibrate(
+                        jitOffCommand[:-1] + [seed_path],
+                        arguments.get("timeoutFactor", Sandbox.TIMEOUT_FACTOR),
+                        arguments.get("minTimeout", Sandbox.MIN_TIMEOUT))
+
+    return LIMITS.timeout
+
+def PrintCacheStats():
+    """This function prints the hit and miss counters of the execution cache.
+    """
+
+    hits, misses = ExecutionCache.Stats()
+    print (f"   |__ Execution cache: {hits} hits, {misses} misses")
+
 def Learning(
         variantsPath: str, exeCommands: dict, variantId2editNodeId: dict, 
         seed_ast: dict, randASTsPath):
@@ -57,60 +152,373 @@ def Learning(
     if not variantId2editNodeId:
         variantId2editNodeId = get_EditedNodeIds(seed_ast, randASTsPath)
 
-    for variant in variants:
-        if variant.endswith(JSEXT):
-            variantId = int(variant.split('__')[1].split('.')[0])
-
-            # Update the last element with the variant file path.
-            jitOnCommand[-1] = f"{variantsPath}/{variant}"
-            jitOffCommand[-1] = f"{variantsPath}/{variant}"
-
-            # Run variant twice.
-            jitOnOut = RunJITExe(jitOnCommand)
-            jitOffOut = RunJITExe(jitOffCommand)
+    # Run every variant twice, JIT-on and JIT-off, on all workers.
+    results = RunVariants(
+                variantsPath, variants, jitOnCommand, jitOffCommand,
+                exeCommands.get("workers", 0))
 
-            # Analyze the results and get a set of target AST node IDs.
-            is_buggy = ResultAnalyzer(
-                            variantId, jitOnOut, 
-                            jitOffOut, variantId2editNodeId, 
-                            targetASTNodeIds)
+    for variantId, jitOnOut, jitOffOut in results:
+        # Analyze the results and get a set of target AST node IDs.
+        is_buggy = ResultAnalyzer(
+                        variantId, jitOnOut, 
+                        jitOffOut, variantId2editNodeId, 
+                        targetASTNodeIds)
 
-            if is_buggy:
-                buggyVariantIDs.append(variantId)
+        if is_buggy:
+            buggyVariantIDs.append(variantId)
+            KeepOutputs(jitOnOut, jitOffOut)
 
     return targetASTNodeIds, buggyVariantIDs, jitOnCommand, jitOffCommand
 
 def get_EditedNodeIds(seed_ast: dict, randASTsPath: str):
-    """
+    """This function finds the edited node id of every random variant.
+    The ids are read from the edit log written by the random generator.
+    Without the log, they are recovered by comparing the variant ASTs with
+    the seed AST, where the hashes of the seed are computed once.
+
+    args:
+        seed_ast (dict): seed input's ast.
+        randASTsPath (str): directory where the random variant asts are stored.
+
+    returns:
+        (dict) variant id to edited node id.
     """
 
+    editLog = VariantDelta.LoadEditLog(randASTsPath)
+    if editLog != None:
+        return {
+            variantId: edits["nodeIds"][0]
+            for variantId, edits in editLog.items() if edits["nodeIds"]
+        }
+
     # Get the list of files under variants directory.
     random_asts = os.listdir(randASTsPath)
 
     variantId2editNodeId = {}
+    hasher = StructuralHash.StructuralHasher(strict=True)
 
     for fname in random_asts:
         variantId = int(fname.split('__')[1].split('.')[0])
         ast_path = f"{randASTsPath}/{fname}"
         with open (ast_path) as f:
             ast = json.load(f)
-            ids = SharedEditors.compareTrees(seed_ast, ast)
-            variantId2editNodeId[variantId] = ids[0]
+            ids = SharedEditors.compareTrees(seed_ast, ast, hasher)
+            # A variant that only adds nodes has no edited node of the seed.
+            if ids:
+                variantId2editNodeId[variantId] = ids[0]
 
     return variantId2editNodeId
 
-def RunJITExe(commands: list):
+def RunVariants(
+        variantsPath: str, variants: list, jitOnCommand: list, 
+        jitOffCommand: list, workers: int):
+    """This function runs every JS variant with the JIT compilation on and off.
+    All (variant, JIT-on) and (variant, JIT-off) runs are fanned out together
+    to the workers. With EARLY_KILL or the engine servers, the two runs of a
+    variant make up a single job instead, so both run in the same environment.
+
+    args:
+        variantsPath (str): directory where the variants are stored.
+        variants (list): list of file names under the variantsPath.
+        jitOnCommand (list): command to execute VM with jit compilation on.
+        jitOffCommand (list): command to execute VM with jit compilation off.
+        workers (int): number of workers (0 for all cores).
+
+    returns:
+        (list) list of (variant id, JIT-on output, JIT-off output) in the
+        order of the passed variants.
+    """
+
+    if BATCH_SIZE > 1:
+        return RunVariantsInBatches(
+                variantsPath, variants, jitOnCommand, jitOffCommand, workers)
+
+    variantIds = []
+    jobs = []
+    for variant in variants:
+        if variant.endswith(JSEXT):
+            variantIds.append(int(variant.split('__')[1].split('.')[0]))
+            variantPath = f"{variantsPath}/{variant}"
+            # Each job gets its own copy of the command, so the concurrent
+            # jobs do not overwrite each other's last element.
+            if EARLY_KILL or JSEngineServer.Enabled():
+                # The JIT-on run needs the JIT-off stdout, or has to run
+                # where the JIT-off run did, so the two runs of a variant
+                # make up a single job.
+                jobs.append((jitOnCommand[:-1] + [variantPath],
+                             jitOffCommand[:-1] + [variantPath]))
+            else:
+                jobs.append((jitOnCommand[:-1] + [variantPath],))
+                jobs.append((jitOffCommand[:-1] + [variantPath],))
+
+    if EARLY_KILL or JSEngineServer.Enabled():
+        outputs = []
+        for jitOnOut, jitOffOut in ParallelRunner.RunAll(jobs, RunDifferential, workers):
+            outputs.extend([jitOnOut, jitOffOut])
+    else:
+        outputs = ParallelRunner.RunAll(jobs, RunJITExe, workers)
+
+    results = []
+    for i, variantId in enumerate(variantIds):
+        results.append((variantId, outputs[2*i], outputs[2*i+1]))
+
+    return results
+
+def RunVariantsInBatches(
+        variantsPath: str, variants: list, jitOnCommand: list,
+        jitOffCommand: list, workers: int):
+    """This function runs the JS variants in batches of BATCH_SIZE variants
+    per engine process, with the JIT compilation on and off. The batches
+    are fanned out to the workers.
+
+    args:
+        variantsPath (str): directory where the variants are stored.
+        variants (list): list of file names under the variantsPath.
+        jitOnCommand (list): command to execute VM with jit compilation on.
+        jitOffCommand (list): command to execute VM with jit compilation off.
+        workers (int): number of workers (0 for all cores).
+
+    returns:
+        (list) list of (variant id, JIT-on output, JIT-off output) in the
+        order of the passed variants.
+    """
+
+    variantIds = []
+    paths = []
+    for variant in variants:
+        if variant.endswith(JSEXT):
+            variantIds.append(int(variant.split('__')[1].split('.')[0]))
+            paths.append(f"{variantsPath}/{variant}")
+
+    jobs = []
+    for i in range(0, len(paths), BATCH_SIZE):
+        jobs.append((jitOnCommand, jitOffCommand, paths[i:i+BATCH_SIZE]))
+
+    outputs = []
+    for batchOutputs in ParallelRunner.RunAll(jobs, RunBatch, workers):
+        outputs.extend(batchOutputs)
+
+    results = []
+    for variantId, (jitOnOut, jitOffOut) in zip(variantIds, outputs):
+        results.append((variantId, jitOnOut, jitOffOut))
+
+    return results
+
+def RunBatch(jitOnCommand: list, jitOffCommand: list, paths: list):
+    """This function runs a batch of variants with the JIT compilation on and
+    off, each in a single engine process. Only the variants that are clean
+    and non-buggy in both batches keep the batch results. The rest, i.e.,
+    the variants that throw, are buggy, ran near the timeout, or belong to a
+    batch that crashed, are re-run one at a time, so the verdicts are the
+    same as RunJITExe's.
+    The batch runs are cached apart from the runs in a fresh process.
+
+    args:
+        jitOnCommand (list): command to execute VM with jit compilation on.
+        jitOffCommand (list): command to execute VM with jit compilation off.
+        paths (list): list of variant paths.
+
+    returns:
+        (list) list of (JIT-on output, JIT-off output) per variant.
+    """
+
+    jitOnOuts = RunCachedBatch(jitOnCommand, paths)
+    jitOffOuts = RunCachedBatch(jitOffCommand, paths)
+
+    outputs = []
+    for path, jitOnOut, jitOffOut in zip(paths, jitOnOuts, jitOffOuts):
+        jitOnOut = OutputDigest.FromOutput(jitOnOut)
+        jitOffOut = OutputDigest.FromOutput(jitOffOut)
+        if (
+                not jitOnOut or not jitOffOut
+                or Verdict(jitOnOut, jitOffOut) != NONBUGGY
+        ):
+            jitOnOut, jitOffOut = RunDifferential(
+                                    jitOnCommand[:-1] + [path],
+                                    jitOffCommand[:-1] + [path])
+        outputs.append((jitOnOut, jitOffOut))
+
+    return outputs
+
+def RunCachedBatch(command: list, paths: list):
+    """This function runs the variants of the batch whose batch runs are not
+    in the execution cache in a single engine process, and caches the
+    answered runs.
+
+    args:
+        command (list): command to execute VM.
+        paths (list): list of variant paths.
+
+    returns:
+        (list) list of CompletedProcess per variant, where None means that
+        the variant has to be run in a fresh process.
+    """
+
+    outputs = []
+    for path in paths:
+        outputs.append(ExecutionCache.Lookup(
+                        command[:-1] + [path], path, command[0], BATCH, LIMITS))
+
+    missing = [idx for idx, output in enumerate(outputs) if output == None]
+    if not missing:
+        return outputs
+
+    batchOuts = JSBatchRunner.Run(command[:-1], [paths[idx] for idx in missing], LIMITS)
+    for idx, output in zip(missing, batchOuts):
+        ExecutionCache.Store(
+                command[:-1] + [paths[idx]], paths[idx], output, command[0], BATCH, LIMITS)
+        outputs[idx] = output
+
+    return outputs
+
+def RunJITExe(commands: list, onServer: bool=False):
     """This function runs the variant with the passed command 
-    under subprocess and returns the output result.
+    under subprocess and returns the output result. The result is
+    taken from the execution cache if the same program was already
+    executed with the same command and engine.
 
     args:
         commands (list): command for executing JIT system.
+        onServer (bool): run the variant on an engine server instead of
+        a fresh process.
 
     returns:
-    
+        (OutputRecord) record of the execution, or None if the variant
+        was to run on an engine server and the server did not answer.
     """
 
-    output = subprocess.run(commands, capture_output=True, text=True)
+    if onServer:
+        output = ExecutionCache.CachedRun(
+                    commands, ExecuteOnServer, commands[-1], commands[0], SERVER, LIMITS)
+    else:
+        output = ExecutionCache.CachedRun(
+                    commands, ExecuteJIT, commands[-1], commands[0], limits=LIMITS)
+
+    record = OutputDigest.FromOutput(output)
+    if record:
+        record.server = onServer
+
+    return record
+
+def RunDifferential(jitOnCommand: list, jitOffCommand: list):
+    """This function runs the variant with the JIT compilation off and on.
+    With EARLY_KILL, the JIT-off run goes first, and the JIT-on run is
+    killed as soon as its stdout diverges from the JIT-off stdout, i.e.,
+    as soon as the variant is known to be buggy.
+
+    args:
+        jitOnCommand (list): command to execute VM with jit compilation on.
+        jitOffCommand (list): command to execute VM with jit compilation off.
+
+    returns:
+        (OutputRecord) record of the execution with JIT compilation on.
+        (OutputRecord) record of the execution without JIT compilation.
+    """
+
+    jitOffOut = RunJITOff(jitOffCommand)
+
+    return RunJITOn(jitOnCommand, jitOffOut)
+
+def RunJITOff(jitOffCommand: list):
+    """This function runs the variant with the JIT compilation off, on an
+    engine server if the engine has them, and in a fresh process otherwise.
+    With EARLY_KILL, the run always goes to a fresh process, as the JIT-on
+    run is streamed in a fresh process.
+
+    args:
+        jitOffCommand (list): command to execute VM with jit compilation off.
+
+    returns:
+        (OutputRecord) record of the execution without JIT compilation.
+    """
+
+    if not EARLY_KILL and JSEngineServer.GetPool(jitOffCommand, LIMITS):
+        jitOffOut = RunJITExe(jitOffCommand, True)
+        if jitOffOut:
+            return jitOffOut
+
+    return RunJITExe(jitOffCommand)
+
+def RunJITOn(jitOnCommand: list, jitOffOut):
+    """This function runs the variant with the JIT compilation on, after its
+    JIT-off run, in the same environment as the JIT-off run. If the engine
+    server does not answer the JIT-on run, the JIT-off run is repeated in a
+    fresh process, so the two runs of a variant never come from different
+    environments. With EARLY_KILL, the run is streamed against the JIT-off stdout.
+
+    args:
+        jitOnCommand (list): command to execute VM with jit compilation on.
+        jitOffOut (OutputRecord): record of the execution without JIT compilation.
+
+    returns:
+        (OutputRecord) record of the execution with JIT compilation on.
+        (OutputRecord) record of the execution without JIT compilation.
+    """
+
+    if jitOffOut.server:
+        jitOnOut = RunJITExe(jitOnCommand, True)
+        if jitOnOut:
+            return jitOnOut, jitOffOut
+        jitOffOut = RunJITExe(jitOffOut.args)
+
+    if not EARLY_KILL or Sandbox.TimedOut(jitOffOut):
+        return RunJITExe(jitOnCommand), jitOffOut
+
+    expected = jitOffOut.ReadStdout()
+    if expected == None:
+        return RunJITExe(jitOnCommand), jitOffOut
+
+    return RunStreamingJITExe(jitOnCommand, expected), jitOffOut
+
+def RunStreamingJITExe(commands: list, expected: str):
+    """This function runs the variant in a fresh process and kills it at the
+    first line of stdout that does not match the expected stdout. A run that
+    was killed is not cached, as its stdout is only partial.
+
+    args:
+        commands (list): command for executing JIT system.
+        expected (str): expected stdout, i.e., the stdout of the JIT-off run.
+
+    returns:
+        (OutputRecord) record of the execution.
+    """
+
+    output = ExecutionCache.Lookup(commands, commands[-1], commands[0], limits=LIMITS)
+    if output:
+        return OutputDigest.FromOutput(output)
+
+    output = Sandbox.RunStreaming(commands, LIMITS, expected)
+    ExecutionCache.Store(commands, commands[-1], output, commands[0], limits=LIMITS)
+
+    return OutputDigest.FromOutput(output)
+
+def ExecuteJIT(commands: list):
+    """This function executes the variant in a fresh process.
+
+    args:
+        commands (list): command for executing JIT system.
+
+    returns:
+        (CompletedProcess) result of the execution.
+    """
+
+    output = Sandbox.Run(commands, LIMITS)
+
+    return output
+
+def ExecuteOnServer(commands: list):
+    """This function executes the variant on an engine server.
+
+    args:
+        commands (list): command for executing JIT system.
+
+    returns:
+        (CompletedProcess) result of the execution, or None if it has to
+        be done in a fresh process.
+    """
+
+    # Engine servers answer only the clean runs and the timeouts.
+    output = JSEngineServer.Run(commands, LIMITS)
 
     return output
 
@@ -131,16 +539,85 @@ def ResultAnalyzer(
         None
     """
 
-    is_buggy = True
+    verdict = Verdict(jitOnOut, jitOffOut)
+    is_buggy = verdict == BUGGY
 
     # If jitOnOut is equal to jitOffOut, the variant does not trigger bug in the JIT.
-    if str(jitOnOut.returncode) == '0' and jitOnOut.stdout == jitOffOut.stdout:
+    if (
+            verdict == NONBUGGY and str(jitOnOut.returncode) == '0'
+            and variantId in variantId2editNodeId
+    ):
         astNodeId = variantId2editNodeId[variantId]
         if astNodeId not in targetASTNodeIds:
             targetASTNodeIds.append(astNodeId)
+
+    return is_buggy
+
+def Verdict(jitOnOut, jitOffOut):
+    """This function returns the verdict of the variant. The variants that
+    timed out either with or without the JIT are neither buggy nor non-buggy.
+    The stdouts of a variant that is not buggy are no longer needed, so they
+    are released from the records.
+
+    args:
+        jitOnOut (OutputRecord): record of the execution with JIT compilation on.
+        jitOffOut (OutputRecord): record of the execution without JIT compilation.
+
+    returns:
+        (str) one of BUGGY, NONBUGGY, or TIMEOUT.
+    """
+
+    if Sandbox.TimedOut(jitOnOut) or Sandbox.TimedOut(jitOffOut):
+        verdict = TIMEOUT
+    elif IsBuggy(jitOnOut, jitOffOut):
+        return BUGGY
+    else:
+        verdict = NONBUGGY
+
+    for output in (jitOnOut, jitOffOut):
+        if isinstance(output, OutputDigest.OutputRecord):
+            output.Release()
+
+    return verdict
+
+def IsBuggy(jitOnOut, jitOffOut):
+    """This function decides whether the variant triggers the bug in the JIT
+    by comparing the results of the executions with and without the JIT.
+
+    args:
+        jitOnOut (OutputRecord): record of the execution with JIT compilation on.
+        jitOffOut (OutputRecord): record of the execution without JIT compilation.
+
+    returns:
+        (bool) True if the variant is buggy. False, otherwise.
+    """
+
+    is_buggy = True
+    same_stdout = OutputDigest.SameStdout(jitOnOut, jitOffOut)
+
+    if str(jitOnOut.returncode) == '0' and same_stdout:
         is_buggy = False
     # jitOnOut == jitOffOut, which is empty output, if error occurs.
-    elif str(jitOnOut.returncode) != '0' and jitOnOut.stdout == jitOffOut.stdout:
+    elif str(jitOnOut.returncode) != '0' and same_stdout:
         is_buggy = False
 
     return is_buggy
+
+def KeepOutputs(jitOnOut, jitOffOut):
+    """This function writes the full stdouts of the buggy variant to the
+    OUTPUTS_DIR, named after the variant.
+
+    args:
+        jitOnOut (OutputRecord): record of the execution with JIT compilation on.
+        jitOffOut (OutputRecord): record of the execution without JIT compilation.
+
+    returns:
+        None.
+    """
+
+    if not OUTPUTS_DIR:
+        return
+
+    name = os.path.basename(jitOnOut.args[-1])
+    OutputDigest.Keep(jitOnOut, f"{OUTPUTS_DIR}/{name}.jit-on.out")
+    OutputDigest.Keep(jitOffOut, f"{OUTPUTS_DIR}/{name}.jit-off.out")
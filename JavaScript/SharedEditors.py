@@ -6,6 +6,8 @@
 """
 
 import os, sys
+import copy
+import json
 import random
 import subprocess
 
@@ -17,6 +19,12 @@ parentdir = os.path.dirname(currentdir)
 sys.path.append(parentdir)
 
 import Shared.SequenceAlignment as SEQAlign
+import Shared.NodeIndex as NodeIndex
+import Shared.PathCopy as PathCopy
+import Shared.StructuralHash as StructuralHash
+import JavaScript.JSCodeGenServer as JSCodeGenServer
+import JavaScript.JSVariantLearning as JSVariantLearning
+import JavaScript.JSCandidateSlot as JSCandidateSlot
 
 # Get current path.
 currentdir = os.path.dirname(os.path.realpath(__file__))
@@ -47,13 +55,9 @@ def JSCodeGenerator(rootPath: str, astFilePaths: list):
         None.
     """
 
-    for astFilePath in astFilePaths:
-        f = os.path.basename(astFilePath)
-        name, ext = os.path.splitext(f)
-        JSCodeFilePath = f"{rootPath}/{name}.js"
-
-        subprocess.run(
-                [NODEJS, JSCODEGENERATOR, astFilePath, JSCodeFilePath])
+    # Convert all ASTs in a single node run, where each AST
+    # <name>.json is written to <rootPath>/<name>.js.
+    JSCodeGenServer.GenerateBatch(rootPath, astFilePaths)
 
 def SingleJSCodeGenerator(astpath: str, jspath: str):
     """This function generates Javascript code from the ast.
@@ -66,7 +70,8 @@ def SingleJSCodeGenerator(astpath: str, jspath: str):
         None.
     """
 
-    subprocess.run([NODEJS, JSCODEGENERATOR, astpath, jspath])
+    # Convert the AST on the long-lived code generation service.
+    JSCodeGenServer.GenerateFile(astpath, jspath)
 
 def ast_editor(
         ast: dict, target_node_id: int, langInfo: dict, id2edit: dict):
@@ -95,6 +100,123 @@ def ast_editor(
 
     return need_new_target[0]
 
+def indexTree(ast: dict):
+    """This function indexes the nodes of the ast in a single traversal,
+    with the same node ids and loop flags as treeModifier.
+
+    args:
+        ast (dict): ast tree.
+
+    returns:
+        (NodeIndex) index of the nodes, where the skip flag marks the
+        nodes of the loop initializers and conditions.
+    """
+
+    index = NodeIndex.NodeIndex(ast)
+
+    nodeIndexer(ast, 1, index, None, None, NodeIndex.NO_INDEX, 0, [False])
+
+    return index
+
+def nodeIndexer(
+        ast: dict, depth: int, index, parent: dict, key: str, listIdx: int,
+        level: int, is_loop_edit: list):
+    """This function recursively traverses the tree in the order of
+    treeModifier and indexes every node.
+
+    args:
+        ast (dict): ast tree.
+        depth (int): node id tracker.
+        index (NodeIndex): index of the nodes.
+        parent (dict): parent node.
+        key (str): key of the node in the parent.
+        listIdx (int): index of the node in the list of the key.
+        level (int): depth of the node in the tree.
+        is_loop_edit (list): flag to indicate whether the current node is a loop node or not.
+
+    returns:
+        (int) node id of the node.
+    """
+
+    if ast:
+        for child_key, value in ast.items():
+            # The line to mark the flag that the loop begin.
+            if child_key == "type" and value == FORLOOP:
+                is_loop_edit[0] = True
+
+            if isinstance(value, list):
+                for idx, elem in enumerate(value):
+                    if isinstance(elem, dict):
+                        index.Locate(elem, ast, child_key, idx)
+                    depth = nodeIndexer(
+                                elem, depth, index, ast, child_key, idx,
+                                level+1, is_loop_edit) + 1
+            elif isinstance(value, dict):
+                index.Locate(value, ast, child_key, NodeIndex.NO_INDEX)
+                depth = nodeIndexer(
+                            value, depth, index, ast, child_key, NodeIndex.NO_INDEX,
+                            level+1, is_loop_edit) + 1
+
+            # The line to avoid editing the loop condition.
+            if is_loop_edit[0] and child_key == "test":
+                is_loop_edit[0] = False
+
+    nodeType = ast.get("type") if isinstance(ast, dict) else None
+    index.Set(depth, ast, parent, key, listIdx, nodeType, level, is_loop_edit[0])
+
+    return depth
+
+def indexedEditor(index, target_node_id: int, langInfo: dict, id2edit: dict):
+    """This function edits the target node, as ast_editor does, on a copy
+    of the indexed ast, where only the path to the target node is copied.
+    The target node is found by the index instead of a tree traversal.
+
+    args:
+        index (NodeIndex): index of the original ast.
+        target_node_id (int): target node id to edit.
+        langInfo (dict): information about the JS language,
+        such as types and methods, etc.
+        id2edit (dict): node id to edited node.
+
+    returns:
+        (dict) edited copy of the ast.
+        (bool) True if a new target is needed, i.e., nothing was edited.
+    """
+
+    # The nodes of the loop initializers and conditions are not edited.
+    if not index.Has(target_node_id) or index.skips[target_node_id]:
+        return dict(index.root), True
+
+    node = index.nodes[target_node_id]
+    if not node:
+        # Editing a missing node changes nothing.
+        return dict(index.root), False
+    elif node["type"] in OPERATIONS:
+        ast_copy, node_copy = pathCopy(index, target_node_id)
+        modifyElement(node_copy, langInfo, id2edit, target_node_id)
+        return ast_copy, False
+
+    return dict(index.root), True
+
+def pathCopy(index, nodeId: int):
+    """This function makes a copy-on-write copy of the indexed ast for
+    editing the node of the node id. Only the nodes on the path from the
+    root to the node are copied, and the node is copied deeply, as the
+    editors may change its children as well.
+
+    args:
+        index (NodeIndex): index of the ast.
+        nodeId (int): id of the node to edit.
+
+    returns:
+        (dict) copy of the ast.
+        (dict) copy of the node in the copied ast.
+    """
+
+    ast_copy, copies = PathCopy.PathCopy(index.root, index.Path(nodeId))
+
+    return ast_copy, copies[id(index.nodes[nodeId])]
+
 def treeScanner(ast: dict, depth: int):
     """This function recursively traverses the ast and
     returns the number of nodes in the tree. For example,
@@ -144,18 +266,26 @@ def assignIds(ast: dict, depth: int, id2node: dict):
 
     return depth
 
-def compareTrees(t1: dict, t2: dict):
+def compareTrees(t1: dict, t2: dict, hasher=None):
     """This function compares the two trees and returns the node id(s)
-    of t1 that is different to t2.
+    of t1 that is different to t2. If the trees have the same shape, the
+    ids are found by the subtree hashes (hashDiffTrees), and the trees are
+    aligned otherwise (with the diff, if they differ in a few nodes).
 
     args:
         t1 (dict): first tree.
         t2 (dict): secound tree.
+        hasher (StructuralHasher): strict hasher to reuse the hashes of t1
+        cached over the calls, if any.
 
     returns:
         (list) list of t1 node ids.
     """
 
+    ids = hashDiffTrees(t1, t2, hasher)
+    if ids != None:
+        return ids
+
     t1_id2node = {}
     t2_id2node = {}
     t1_id2nodeStr = {}
@@ -168,7 +298,7 @@ def compareTrees(t1: dict, t2: dict):
     for id, node in t2_id2node.items():
         t2_id2nodeStr[id] = str(node)
 
-    alignment = SEQAlign.SequenceAlignment(
+    alignment = SEQAlign.FastSequenceAlignment(
                             list(t1_id2nodeStr.values()),
                             list(t2_id2nodeStr.values()))
 
@@ -180,6 +310,112 @@ def compareTrees(t1: dict, t2: dict):
 
     return ids
 
+def hashDiffTrees(t1: dict, t2: dict, hasher=None):
+    """This function finds the node ids of t1 that are different to t2 by
+    their subtree hashes, without aligning the trees. The ids are those of
+    compareTrees, i.e., the positions of the nodes in the sequence of the
+    nodes of assignIds. When the trees have the same shape, the alignment
+    matches the nodes at the same positions, so the ids are the positions
+    (other than the first) of the nodes whose strings differ. The subtrees
+    with the same hash are skipped.
+
+    args:
+        t1 (dict): first tree.
+        t2 (dict): secound tree.
+        hasher (StructuralHasher): strict hasher, if any.
+
+    returns:
+        (list) list of t1 node ids, or None if the trees differ structurally.
+    """
+
+    if hasher == None:
+        hasher = StructuralHash.StructuralHasher(strict=True)
+    assert hasher.strict, "The hashes must follow the strings of the nodes."
+    hasher.Hash(t1, remember=True)
+
+    ids = []
+    if hashDiffer(t1, t2, hasher, {}, [0], ids):
+        return ids
+
+    return None
+
+def hashDiffer(
+        n1, n2, hasher, memo: dict, position: list, ids: list):
+    """This function recursively compares the two nodes in the order of
+    assignIds, and collects the positions of the differing nodes.
+
+    args:
+        n1: node of the first tree.
+        n2: node of the second tree.
+        hasher (StructuralHasher): strict hasher.
+        memo (dict): hashes of the nodes of the second tree.
+        position (list): position of the next node in the sequence.
+        ids (list): list of positions of the differing nodes.
+
+    returns:
+        (bool) False if the nodes differ structurally.
+    """
+
+    if hasher.Digest(n1, memo) == hasher.Digest(n2, memo):
+        position[0] += countIds(n1)
+        return True
+
+    if n1 and n2:
+        if (
+            not isinstance(n1, dict) or not isinstance(n2, dict)
+            or list(n1) != list(n2) or "type" not in n1
+            or n1["type"] != n2["type"]
+        ):
+            return False
+        for key, value in n1.items():
+            other = n2[key]
+            if isinstance(value, list):
+                if not isinstance(other, list) or len(value) != len(other):
+                    return False
+                for elem, otherElem in zip(value, other):
+                    if not hashDiffer(elem, otherElem, hasher, memo, position, ids):
+                        return False
+            elif isinstance(value, dict):
+                if not isinstance(other, dict):
+                    return False
+                if not hashDiffer(value, other, hasher, memo, position, ids):
+                    return False
+            elif isinstance(other, (list, dict)):
+                return False
+    elif n1 or n2:
+        return False
+
+    if not n1 or n1["type"] in OPERATIONS:
+        if position[0] > 0:
+            ids.append(position[0])
+        position[0] += 1
+
+    return True
+
+def countIds(ast: dict):
+    """This function counts the nodes that assignIds assigns ids to.
+
+    args:
+        ast (dict): ast tree.
+
+    returns:
+        (int) number of nodes.
+    """
+
+    count = 0
+    if ast:
+        for key, value in ast.items():
+            if isinstance(value, list):
+                for elem in value:
+                    count += countIds(elem)
+            elif isinstance(value, dict):
+                count += countIds(value)
+
+    if not ast or ast["type"] in OPERATIONS:
+        count += 1
+
+    return count
+
 def treeModifier(
         ast: dict, depth: int, target_node_id: int, accept: list,
         need_new_target: list, langInfo: dict, is_loop_edit: list,
@@ -748,32 +984,28 @@ def mapGenerator():
 ##
 
 def checkModified(ast_copy: dict, rootPath: str, jitOnCommand: list, jitOffCommand: list):
-    """
-    """
+    """This function generates the code of the modified AST and runs it with and
+    without JIT compilation.
 
-    temporary_ast_path = f"{rootPath}/misc/temp_ast.json"
-    with open(temporary_ast_path, 'w') as ast_f:
-        json.dump(ast_copy, ast_f)
-    temporary_js_path = f"{rootPath}/misc/temp_js.js"
+    args:
+        ast_copy (dict): modified AST.
+        rootPath (str): root directory path.
+        jitOnCommand (list): command to execute VM with jit compilation on.
+        jitOffCommand (list): command to execute VM with jit compilation off.
 
-    Shared.SingleJSCodeGenerator(temporary_ast_path, temporary_js_path)
+    returns:
+        (str) verdict of the modified AST, i.e., BUGGY, NONBUGGY, or TIMEOUT,
+        or None if the code of the modified AST could not be generated.
+    """
 
-    jitOnCommand[-1] = temporary_js_path
-    jitOffCommand[-1] = temporary_js_path
+    # The candidate is written only to the slot of this worker.
+    candidate_path = JSCandidateSlot.WriteCandidate(ast_copy)
+    if candidate_path == None:
+        return None
 
-    jitOnOut = JSVariantLearning.RunJITExe(jitOnCommand)
-    jitOffOut = JSVariantLearning.RunJITExe(jitOffCommand)
+    jitOnCommand = jitOnCommand[:-1] + [candidate_path]
+    jitOffCommand = jitOffCommand[:-1] + [candidate_path]
 
-    is_buggy = True
-    if (
-            str(jitOnOut.returncode) == '0' 
-            and jitOnOut.stdout == jitOffOut.stdout
-    ):
-        is_buggy = False
-    elif (
-            str(jitOnOut.returncode) != '0' 
-            and jitOnOut.stdout == jitOffOut.stdout
-    ):
-        is_buggy = False
+    jitOnOut, jitOffOut = JSVariantLearning.RunDifferential(jitOnCommand, jitOffCommand)
 
-    return is_buggy
+    return JSVariantLearning.Verdict(jitOnOut, jitOffOut)
@@ -8,24 +8,30 @@ import copy
 # Code to import modules from other directories.
 # Soruce: https://codeolives.com/2020/01/10/python-reference-module-in-parent-directory/
 currentdir = os.path.dirname(os.path.realpath(__file__))
-parentdir = os.path.dirname(currentdir)
-sys.path.append(parentdir)
-
-import DPGen4JIT.JavaScript.JSRandomVariantGenerator as JSRandomVariantGenerator
-import DPGen4JIT.JavaScript.JSVariantLearning as JSVariantLearning
-import DPGen4JIT.JavaScript.JSControlledVariantGenerator as JSControlledVariantGenerator
-import DPGen4JIT.JavaScript.SharedEditors as SharedEditors
-import DPGen4JIT.JavaScript.JSAstGenerator as JSAstG
-import DPGen4JIT.Shared.SequenceAlignment as SEQAlign
-import DPGen4JIT.Shared.SelectInputs as SelectInputs
-import DPGen4JIT.C.SourceToSource as C_S2S
-import DPGen4JIT.C.CRandomGenerator as CRandomGen
-import DPGen4JIT.C.CLearning as CLearning
-import DPGen4JIT.C.CDirectedGenerator as CDirected
-import DPGen4JIT.C.CSelectInputs as CSelect
-import DPGen4JIT.Shared.General as General
-
-import DPGen4JIT.C.Shared as Shared
+sys.path.append(currentdir)
+
+# The modules import each other through the Shared, C and JavaScript
+# packages, so they are imported the same way here, and every module is
+# loaded once: the configured modules are the ones they use.
+import JavaScript.JSRandomVariantGenerator as JSRandomVariantGenerator
+import JavaScript.JSVariantLearning as JSVariantLearning
+import JavaScript.JSControlledVariantGenerator as JSControlledVariantGenerator
+import JavaScript.JSPipeline as JSPipeline
+import JavaScript.SharedEditors as SharedEditors
+import JavaScript.JSAstGenerator as JSAstG
+import Shared.SequenceAlignment as SEQAlign
+import Shared.SelectInputs as SelectInputs
+import C.SourceToSource as C_S2S
+import C.CRandomGenerator as CRandomGen
+import C.CLearning as CLearning
+import C.CDirectedGenerator as CDirected
+import C.MutationPlan as MutationPlan
+import C.CSelectInputs as CSelect
+import Shared.General as General
+import Shared.CodeDedup as CodeDedup
+import Shared.FingerprintStore as FingerprintStore
+
+import C.Shared as Shared
 
 JSEXT = ".js"
 
@@ -201,53 +207,53 @@ def get_controlled_inputs(
                     target_ast_node_ids, seed_file_base, 
                     seed_ast, language_info, jit_on, jit_off)
 
-def classify_inputs(inputs_path: str, jit_on: list, jit_off: list):
+def classify_inputs(
+        inputs_path: str, jit_on: list, jit_off: list, workers: int=0,
+        ast_stream=None):
     """This function classifies inputs into buggies and non-buggies.
 
     args:
         inputs_path (str): directory path where inputs are stored.
         jit_on (list): command-line to execute VM with JIT compilation on.
         jit_off (list): command-line to execute VM with JIT compilation off.
+        workers (int): number of workers to run the inputs (0 for all cores).
+        ast_stream (VariantStream): asts of the inputs whose codes are not
+        generated yet. If given, the codes are generated, deduplicated, and
+        run in the pipeline.
 
     returns:
         (list) list of buggy input ids.
         (list) list of non-buggy input ids.
+        (list) list of input ids that timed out.
     """
 
     buggy_ids = []
     nonbuggy_ids = []
+    timeout_ids = []
+
+    def classify(input_id, jitOnOut, jitOffOut):
+        verdict = JSVariantLearning.Verdict(jitOnOut, jitOffOut)
+        if verdict == JSVariantLearning.BUGGY:
+            buggy_ids.append(input_id)
+            JSVariantLearning.KeepOutputs(jitOnOut, jitOffOut)
+        elif verdict == JSVariantLearning.NONBUGGY:
+            nonbuggy_ids.append(input_id)
+        else:
+            timeout_ids.append(input_id)
+
+    if ast_stream:
+        # The inputs are classified by the analysis stage as soon as they are run.
+        JSPipeline.RunPipeline(
+            ast_stream, inputs_path, jit_on, jit_off, workers, classify,
+            ast_stream.codes, ast_stream.target)
+        ast_stream.Close()
+    else:
+        inputs = os.listdir(inputs_path)
+        results = JSVariantLearning.RunVariants(inputs_path, inputs, jit_on, jit_off, workers)
+        for input_id, jitOnOut, jitOffOut in results:
+            classify(input_id, jitOnOut, jitOffOut)
 
-    inputs = os.listdir(inputs_path)
-
-    for input_file in inputs:
-        if input_file.endswith(JSEXT):
-            input_path = f"{inputs_path}/{input_file}"
-            input_id = int(input_file.split('__')[1].split('.')[0])
-
-            jit_on[-1] = input_path
-            jit_off[-1] = input_path
-
-            jitOnOut = JSVariantLearning.RunJITExe(jit_on)
-            jitOffOut = JSVariantLearning.RunJITExe(jit_off)
-
-            is_buggy = True
-            if (
-                    str(jitOnOut.returncode) == '0'
-                    and jitOnOut.stdout == jitOffOut.stdout
-            ):
-                is_buggy = False
-            elif (
-                    str(jitOnOut.returncode) != '0'
-                    and jitOnOut.stdout == jitOffOut.stdout
-            ):
-                is_buggy = False
-
-            if is_buggy:
-                buggy_ids.append(input_id)
-            else:
-                nonbuggy_ids.append(input_id)
-
-    return buggy_ids, nonbuggy_ids
+    return buggy_ids, nonbuggy_ids, timeout_ids
 
 def get_inputs_to_analyze(
         seed_path: str, seed_ast: str, last_id: int, inputs_dir: str, 
@@ -298,7 +304,7 @@ def get_inputs_to_analyze(
 
 def check_selected_inputs(
         inputs_dir: str, jit_on: list, jit_off: list, 
-        selected_b: list, selected_nb: list):
+        selected_b: list, selected_nb: list, workers: int=0):
     """This function checks whether the selected inputs are correctly 
     classified or not.
 
@@ -308,12 +314,13 @@ def check_selected_inputs(
         jit_off (list): command-line to execute VM with JIT compilation off.
         selected_b (list): list of selected buggy ids.
         selected_nb (list): list of selected non-buggy ids.
+        workers (int): number of workers to run the inputs (0 for all cores).
 
     returns:
         None.
     """
 
-    buggy_ids, nonbuggy_ids = classify_inputs(inputs_dir, jit_on, jit_off)
+    buggy_ids, nonbuggy_ids, _ = classify_inputs(inputs_dir, jit_on, jit_off, workers)
 
     for id in selected_b:
         if id not in buggy_ids:
@@ -333,36 +340,62 @@ def check_selected_inputs(
 #                                                             #
 ###############################################################
 
-def GenerateCodesFromASTs(asts: list, srcPath: str, astPath: str):
+def GenerateCodesFromASTs(asts, srcPath: str, astPath: str, runsPerCode: int=1):
     """This function generates and write C codes to .c file 
-    from the AST.
+    from the AST. The ASTs are materialized from their deltas
+    one at a time, and the edit log is written next to them.
+    The ASTs whose code is the same as that of the seed or of
+    an AST before are not written, so they are not compiled.
 
     args:
-        asts (list): list of ASTs without duplicates.
+        asts (VariantStore): deltas of the ASTs without duplicates.
         srcPath (str): path to directory where C files will be
         stored.
         astPath (str): path to directory where AST files will be
         stored.
+        runsPerCode (int): number of compilations of every C file.
 
     returns:
         (set) set of C file paths.
     """
 
     CFiles = set()
+    storedIds = []
+
+    codes = CodeDedup.CodeDedup(runsPerCode)
+    codes.Add(C_S2S.ast_to_c(copy.deepcopy(asts.seed)))
 
-    # zeroth ast is the original ast.
-    for i in range(1, len(asts)):
-        dumpToJson(f"{astPath}/ast__{i}.json", asts[i])
+    for i in asts.Ids():
+        ast = asts.Materialize(i)
+        code = C_S2S.ast_to_c(copy.deepcopy(ast))
+        if not codes.Add(code):
+            continue
 
-        code = C_S2S.ast_to_c(copy.deepcopy(asts[i]))
+        dumpToJson(f"{astPath}/ast__{i}.json", ast)
 
         with open(f"{srcPath}/poc_variant__{i}.c", "w") as f:
             f.write(code)
 
         CFiles.add(f"{srcPath}/poc_variant__{i}.c")
+        storedIds.append(i)
+
+    asts.SaveEditLog(astPath, storedIds)
+    codes.Report()
 
     return CFiles
 
+def GetFingerprints(asts):
+    """This function maps the ids of the ASTs to their fingerprints.
+
+    args:
+        asts (VariantStore): deltas of the ASTs.
+
+    returns:
+        (dict) AST id to fingerprint.
+    """
+
+    return {i: asts.Get(i).fingerprint for i in asts.Ids()}
+
 ###############################################################
 #                                                             #
 #                       MAIN FUNCTIONS                        #
@@ -390,6 +423,11 @@ def JSGenerator(arguments: dict):
 
     lang_info = arguments["language_info"]
 
+    # Number of workers to run the inputs concurrently (0 for all cores).
+    workers = arguments.get("workers", 0)
+    # Overlap the code generation and the runs of the random inputs.
+    pipeline = arguments.get("pipeline", False)
+
     random_ipt_dir = f"{root_path}/random"
     random_ast_dir = f"{root_path}/random/asts"
     controlled_ipt_dir = f"{root_path}/controlled"
@@ -404,6 +442,9 @@ def JSGenerator(arguments: dict):
 
     create_dirs(root_path)
 
+    JSVariantLearning.ConfigureExecution(arguments)
+    timeout = JSVariantLearning.CalibrateTimeout(jit_off, seed_path, arguments)
+
     language_info = load_json(lang_info)
 
     seed_file_base = os.path.splitext(os.path.basename(seed_path))[0]
@@ -413,9 +454,18 @@ def JSGenerator(arguments: dict):
 
         seed_ast = None
         ipt_id2edit_node_id = None
+        rand_ast_stream = None
         # Random input generation.
         rands = os.listdir(random_ast_dir)
-        if not rands:
+        if not rands and pipeline:
+            print ("PHASE 1: Generating inputs randomly.")
+            # The inputs are generated as the pipeline runs them.
+            rand_ast_stream = JSRandomVariantGenerator.VariantStream(
+                                random_ast_dir, seed_file_base, seed_code,
+                                user_n, language_info)
+            seed_ast = rand_ast_stream.astVariants.seed
+            ipt_id2edit_node_id = rand_ast_stream.astId2editNodeId
+        elif not rands:
             print ("PHASE 1: Generating inputs randomly.")
             (
                 seed_ast,
@@ -426,9 +476,13 @@ def JSGenerator(arguments: dict):
         else:
             print ("PHASE 1: Loading inputs randomly.")
         # Classify inputs.
-        rand_buggy_ids, rand_nonbuggy_ids = classify_inputs(random_ipt_dir, jit_on, jit_off)
+        rand_buggy_ids, rand_nonbuggy_ids, rand_timeout_ids = classify_inputs(
+                                            random_ipt_dir, jit_on, jit_off, workers,
+                                            rand_ast_stream)
         print (f"   |__ Generated random buggy inputs: {rand_buggy_ids}")
         print (f"   |__ Generated random non-buggy inputs: {rand_nonbuggy_ids}")
+        print (f"   |__ Timed out random inputs ({timeout:.2f}s): {rand_timeout_ids}")
+        JSVariantLearning.PrintCacheStats()
         # If seed_ast does not exist, simply generate one from the seed code.
         if not seed_ast:
             seed_ast = (JSAstG.AstGenerator(seed_code)).toDict()
@@ -440,6 +494,15 @@ def JSGenerator(arguments: dict):
             jit_on,
             jit_off
         ) = learn_inputs(random_ipt_dir, arguments, ipt_id2edit_node_id, seed_ast, random_ast_dir)
+        # The candidates of the controlled generation are patched from the seed code.
+        if arguments.get("sourcePatch", True):
+            JSControlledVariantGenerator.JSCandidateSlot.SetSeed(seed_code, seed_ast)
+        # The verdicts of the candidates classified in the earlier runs on the
+        # seed are reused.
+        fingerprints = FingerprintStore.OpenStore(
+                            root_path, seed_ast, [jit_on[:-1], jit_off[:-1]],
+                            JSVariantLearning.LIMITS)
+        JSControlledVariantGenerator.SetFingerprintStore(fingerprints)
         # Select inputs generated in a controlled way.
         print ("PHASE 3: Generating inputs based on the learning.")
         last_id = get_controlled_inputs(
@@ -449,9 +512,13 @@ def JSGenerator(arguments: dict):
                     seed_file_base, seed_ast, language_info, 
                     jit_on, jit_off)
         # Classify inputs.
-        buggy_ids, nonbuggy_ids = classify_inputs(controlled_ipt_dir, jit_on, jit_off)
+        buggy_ids, nonbuggy_ids, timeout_ids = classify_inputs(
+                                            controlled_ipt_dir, jit_on, jit_off, workers)
         print (f"   |__ Generated controlled buggy inputs: {buggy_ids}")
         print (f"   |__ Generated controlled non-buggy inputs: {nonbuggy_ids}")
+        print (f"   |__ Timed out controlled inputs ({timeout:.2f}s): {timeout_ids}")
+        JSVariantLearning.PrintCacheStats()
+        fingerprints.Report()
         # Select buggy and non-buggy input ids to be used in the analysis.
         print ("PHASE 4: Select inputs to use in the fault localization.")
         (
@@ -462,7 +529,10 @@ def JSGenerator(arguments: dict):
                 random_ipt_dir, rand_buggy_ids, controlled_ipt_dir)
         # Check to make sure the selected inputs are correctly classified.
         check_selected_inputs(
-                inputs_dir, jit_on, jit_off, selected_buggy_ids, selected_nonbuggy_ids)
+                inputs_dir, jit_on, jit_off, selected_buggy_ids, selected_nonbuggy_ids,
+                workers)
+
+        JSVariantLearning.PrintCacheStats()
 
         selected_buggy_ids.sort()
         selected_nonbuggy_ids.sort()
@@ -503,21 +573,36 @@ def CGenerator(arguments):
 
     # Create directories.
     create_dirs(root_path)
+    CLearning.ConfigureExecution(arguments)
+    CLearning.CalibrateTimeout(arguments, seed_path)
     # Convert C source code to python3 'dict' object.
     ast_dict = C_S2S.file_to_dict(seed_path)
+    # Scan the seed once for both the random and the directed mutations.
+    plan = MutationPlan.GetPlan(ast_dict, f"{root_path}/misc")
+    
+    # The verdicts of the programs classified in the earlier runs on the
+    # seed are reused.
+    commands = [[arguments["compilerPath"]] + arguments["arguments"]]
+    commands.extend(
+            arguments[f"compiler{i}"] for i in range(1, arguments["numberOfComps"]+1))
+    fingerprints = FingerprintStore.OpenStore(root_path, ast_dict, commands, CLearning.LIMITS)
     
     # Generate C code randomly.
-    asts, fileId2NodeId = CRandomGen.CRandomGenerator(ast_dict, lang_info)
+    asts, fileId2NodeId = CRandomGen.CRandomGenerator(ast_dict, lang_info, plan)
     assert (
-        len(asts) == len(fileId2NodeId)+1
-    ), f"ERROR: CRandom: len(asts) != len(fileId2NodeId)+1"
-    CFiles = GenerateCodesFromASTs(asts, random_iptDir, random_astDir)
+        len(asts) == len(fileId2NodeId)
+    ), f"ERROR: CRandom: len(asts) != len(fileId2NodeId)"
+    # Every C file is compiled by the target compiler and the oracle compilers.
+    runsPerCode = 1 + arguments["numberOfComps"]
+    CFiles = GenerateCodesFromASTs(asts, random_iptDir, random_astDir, runsPerCode)
     # Identify the target node IDs to edit during the directed mutation.
-    nodeIds = CLearning.CLearning(arguments, random_binsDir, CFiles, random_iptDir, fileId2NodeId)
+    nodeIds = CLearning.CLearning(
+                arguments, random_binsDir, CFiles, random_iptDir, fileId2NodeId,
+                fingerprints, GetFingerprints(asts))
     print (f"Set of Target Node IDs: {nodeIds}")
     # Generate C code using the directed method.
-    asts = CDirected.CDirectedGenerator(ast_dict, lang_info, nodeIds, user_n)
-    CFiles = GenerateCodesFromASTs(asts, controlled_iptDir, controlled_astDir)
+    asts = CDirected.CDirectedGenerator(ast_dict, lang_info, nodeIds, user_n, plan)
+    CFiles = GenerateCodesFromASTs(asts, controlled_iptDir, controlled_astDir, runsPerCode)
 
     #
     (
@@ -525,7 +610,7 @@ def CGenerator(arguments):
         selectedNonBuggyIds
     ) = CSelect.SelectInputs(
             arguments, ast_dict, controlled_binsDir, CFiles, controlled_iptDir, 
-            root_path, seed_path, user_n)
+            root_path, seed_path, user_n, fingerprints, GetFingerprints(asts))
 
     print (f"SELECTED: Buggy IDs: {selectedBuggyIds}")
     print (f"SELECTED: NonBuggy IDs: {selectedNonBuggyIds}")
@@ -0,0 +1,94 @@
+"""
+    This file holds the deduplication of the variants by their generated
+    code. Two ASTs may differ only in the parts the code generation drops,
+    e.g., the raw of a JS Literal or the coord of a pycparser node, so they
+    pass the AST dedup but are the same program. A variant is kept only if
+    the hash of its whitespace-normalized code was not seen before, so every
+    program is run (or compiled) once.
+
+    Author: Anonymous.
+"""
+
+import hashlib
+
+# Size of the code digests in bytes.
+DIGEST_SIZE = 16
+
+class CodeDedup:
+    """Digests of the normalized codes of the kept variants."""
+
+    def __init__(self, runsPerCode: int=1):
+        """
+        args:
+            runsPerCode (int): number of executions (or compilations) of
+            every kept code, for counting the saved executions.
+        """
+
+        self.runsPerCode = runsPerCode
+        self.digests = set()
+        self.duplicates = 0
+
+    def Add(self, code: str):
+        """This function adds the code unless the same normalized code was
+        added before.
+
+        args:
+            code (str): generated code of the variant.
+
+        returns:
+            (bool) True if the code was added.
+        """
+
+        digest = CodeDigest(code)
+        if digest in self.digests:
+            self.duplicates += 1
+            return False
+
+        self.digests.add(digest)
+
+        return True
+
+    def Saved(self):
+        """This function returns the number of executions saved by not
+        running the duplicates."""
+
+        return self.duplicates * self.runsPerCode
+
+    def Report(self):
+        """This function prints the number of the duplicates and of the
+        executions saved by dropping them."""
+
+        print (
+            f"   |__ Code dedup: {self.duplicates} duplicate variants, "
+            f"{self.Saved()} executions saved")
+
+def NormalizeCode(code: str):
+    """This function normalizes the whitespaces of the code, i.e., the line
+    endings, the trailing whitespaces, and the blank lines. The whitespaces
+    within a line are kept, as they may be in a string literal.
+
+    args:
+        code (str): code.
+
+    returns:
+        (str) normalized code.
+    """
+
+    lines = [line.rstrip() for line in code.splitlines()]
+
+    return "\n".join(line for line in lines if line)
+
+def CodeDigest(code: str):
+    """This function hashes the normalized code.
+
+    args:
+        code (str): code.
+
+    returns:
+        (bytes) digest of the code.
+    """
+
+    # The JS strings may hold lone surrogates.
+    normalized = NormalizeCode(code).encode("utf-8", "surrogatepass")
+
+    return hashlib.blake2b(normalized, digest_size=DIGEST_SIZE).digest()
@@ -0,0 +1,317 @@
+"""
+    This file holds the persistent, content-addressed cache of execution
+    results. A result is keyed by the hash of the executed program, the
+    full command line (with the program path left out, so the same program
+    moved to another directory still hits), the identity of the engine
+    binary (size, mtime, and hash), and the limits of the execution, i.e.,
+    the timeout and the memory and CPU limits.
+
+    The cache is an sqlite database bounded in size, where the least
+    recently used results are evicted first.
+
+    Author: Anonymous.
+"""
+
+import os
+import hashlib
+import shutil
+import sqlite3
+import subprocess
+import threading
+import time
+
+# Placeholder for the program path in the command line of the key.
+PROGRAM = "<program>"
+# Default upper bound of the cache size in megabytes.
+DEFAULT_SIZE_MB = 1024
+
+# The cache used by CachedRun. None disables caching.
+CACHE = None
+
+# (path, size, mtime) to the hash of the engine binary.
+ENGINE_HASHES = {}
+ENGINE_LOCK = threading.Lock()
+
+class ExecutionCache:
+    """Size-bounded LRU cache of execution results stored in sqlite."""
+
+    def __init__(self, path: str, maxBytes: int):
+        self.maxBytes = maxBytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, returncode INTEGER, stdout TEXT, "
+                "stderr TEXT, size INTEGER, used REAL)")
+        self.connection.commit()
+        # Running total of the sizes of the stored results.
+        self.total = self.connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def Get(self, key: str, commands: list):
+        """This function looks up the result of the key.
+
+        args:
+            key (str): key of the execution.
+            commands (list): command of the execution.
+
+        returns:
+            (CompletedProcess) cached result, or None on a miss.
+        """
+
+        with self.lock:
+            row = self.connection.execute(
+                    "SELECT returncode, stdout, stderr FROM results WHERE key = ?",
+                    (key,)).fetchone()
+            if not row:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.connection.execute(
+                    "UPDATE results SET used = ? WHERE key = ?", (time.time(), key))
+            self.connection.commit()
+
+        return subprocess.CompletedProcess(commands, row[0], row[1], row[2])
+
+    def Put(self, key: str, output):
+        """This function stores the result of the key and evicts the least
+        recently used results if the cache grows over its size.
+
+        args:
+            key (str): key of the execution.
+            output (CompletedProcess): result of the execution.
+
+        returns:
+            None.
+        """
+
+        stdout = output.stdout or ""
+        stderr = output.stderr or ""
+        size = len(stdout) + len(stderr)
+
+        with self.lock:
+            row = self.connection.execute(
+                    "SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            if row:
+                self.total -= row[0]
+            self.connection.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, output.returncode, stdout, stderr, size, time.time()))
+            self.total += size
+            while self.total > self.maxBytes:
+                row = self.connection.execute(
+                        "SELECT key, size FROM results ORDER BY used LIMIT 1").fetchone()
+                if not row:
+                    break
+                self.connection.execute("DELETE FROM results WHERE key = ?", (row[0],))
+                self.total -= row[1]
+            self.connection.commit()
+
+    def Stats(self):
+        """This function returns the hit and miss counters of the cache.
+
+        returns:
+            (int) number of hits.
+            (int) number of misses.
+        """
+
+        return self.hits, self.misses
+
+def Configure(path: str, sizeMB: int=DEFAULT_SIZE_MB):
+    """This function opens the cache that CachedRun uses. Zero size
+    disables the cache.
+
+    args:
+        path (str): path to the cache database.
+        sizeMB (int): upper bound of the cache size in megabytes.
+
+    returns:
+        None.
+    """
+
+    global CACHE
+
+    if sizeMB and sizeMB > 0:
+        CACHE = ExecutionCache(path, sizeMB * 1024 * 1024)
+    else:
+        CACHE = None
+
+def HashFile(path: str):
+    """This function computes the sha256 hash of the file content.
+
+    args:
+        path (str): path to the file.
+
+    returns:
+        (str) hex digest.
+    """
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+def EngineIdentity(engine: str):
+    """This function returns the identity of the engine binary, i.e.,
+    its size, mtime, and hash. The hash is computed once per (size, mtime).
+
+    args:
+        engine (str): path or name of the engine binary.
+
+    returns:
+        (str) engine identity.
+    """
+
+    path = shutil.which(engine) or engine
+    stat = os.stat(path)
+    identity = (path, stat.st_size, stat.st_mtime_ns)
+
+    with ENGINE_LOCK:
+        if identity not in ENGINE_HASHES:
+            ENGINE_HASHES[identity] = HashFile(path)
+
+    return f"{stat.st_size}:{stat.st_mtime_ns}:{ENGINE_HASHES[identity]}"
+
+def ComputeKey(
+        commands: list, programPath: str, engine: str=None, environment: str=None,
+        limits=None):
+    """This function computes the key of the execution.
+
+    args:
+        commands (list): command of the execution.
+        programPath (str): path to the executed program.
+        engine (str): engine binary that runs the program, if any.
+        environment (str): environment of the execution other than a fresh
+        process, e.g., an engine server, if any.
+        limits (Limits): limits of the execution, if any.
+
+    returns:
+        (str) key of the execution.
+    """
+
+    argv = [PROGRAM if arg == programPath else arg for arg in commands]
+
+    key = hashlib.sha256()
+    key.update(HashFile(programPath).encode())
+    key.update("\0".join(argv).encode())
+    if engine:
+        key.update(EngineIdentity(engine).encode())
+    if environment:
+        key.update(f"\0{environment}".encode())
+    if limits:
+        key.update(f"\0{limits.timeout}:{limits.memoryMB}:{limits.cpuSeconds}".encode())
+
+    return key.hexdigest()
+
+def Cacheable(output):
+    """This function checks whether the result can be cached. The runs that
+    return None or time out are not cached, as they depend on the timeout
+    and the machine load. The runs killed on divergence have only a part
+    of their output.
+
+    args:
+        output (CompletedProcess): result of the execution.
+
+    returns:
+        (bool) True if the result can be cached.
+    """
+
+    return (
+            output != None
+            and not getattr(output, "timed_out", False)
+            and not getattr(output, "diverged", False)
+    )
+
+def Lookup(
+        commands: list, programPath: str, engine: str=None,
+        environment: str=None, limits=None):
+    """This function returns the cached result of the execution without
+    running it.
+
+    args:
+        commands (list): command of the execution.
+        programPath (str): path to the executed program.
+        engine (str): engine binary that runs the program, if any.
+        environment (str): environment of the execution, if any.
+        limits (Limits): limits of the execution, if any.
+
+    returns:
+        (CompletedProcess) cached result, or None on a miss.
+    """
+
+    cache = CACHE
+    if not cache:
+        return None
+
+    return cache.Get(ComputeKey(commands, programPath, engine, environment, limits), commands)
+
+def Store(
+        commands: list, programPath: str, output, engine: str=None,
+        environment: str=None, limits=None):
+    """This function stores the result of the execution, if it can be cached.
+
+    args:
+        commands (list): command of the execution.
+        programPath (str): path to the executed program.
+        output (CompletedProcess): result of the execution.
+        engine (str): engine binary that runs the program, if any.
+        environment (str): environment of the execution, if any.
+        limits (Limits): limits of the execution, if any.
+
+    returns:
+        None.
+    """
+
+    cache = CACHE
+    if cache and Cacheable(output):
+        cache.Put(ComputeKey(commands, programPath, engine, environment, limits), output)
+
+def CachedRun(
+        commands: list, run, programPath: str, engine: str=None,
+        environment: str=None, limits=None):
+    """This function returns the cached result of the execution, or runs
+    it and stores the result, if it can be cached.
+
+    args:
+        commands (list): command of the execution.
+        run (function): function that executes the command.
+        programPath (str): path to the executed program.
+        engine (str): engine binary that runs the program, if any.
+        environment (str): environment of the execution, if any.
+        limits (Limits): limits of the execution, if any.
+
+    returns:
+        (CompletedProcess) result of the execution.
+    """
+
+    cache = CACHE
+    if not cache:
+        return run(commands)
+
+    key = ComputeKey(commands, programPath, engine, environment, limits)
+    output = cache.Get(key, commands)
+    if output:
+        return output
+
+    output = run(commands)
+    if Cacheable(output):
+        cache.Put(key, output)
+
+    return output
+
+def Stats():
+    """This function returns the hit and miss counters of the cache.
+
+    returns:
+        (int) number of hits.
+        (int) number of misses.
+    """
+
+    if not CACHE:
+        return 0, 0
+
+    return CACHE.Stats()
@@ -0,0 +1,176 @@
+"""
+    This file holds the persistent store of the variant fingerprints of a
+    seed, so a rerun on the same seed (to top up N, or after a crash) does
+    not run the variants it already classified. The store is a directory
+    of two append-only files:
+    - the set of the seen fingerprints, as their raw digests,
+    - the verdicts of the classified fingerprints, one per line.
+
+    A fingerprint with a verdict is not run again, and its verdict is used
+    instead. A fingerprint seen without a verdict is run again, so a variant
+    that timed out, which depends on the machine load, is retried in the
+    later runs. The stores are keyed by the fingerprint of the seed, the
+    commands the variants are run with, the identity of their engine or
+    compiler binaries, and the limits of the runs, so a store is not used
+    with another engine or compiler build, or under other limits.
+
+    Author: Anonymous.
+"""
+
+import os, sys
+import hashlib
+import json
+import threading
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import Shared.ExecutionCache as ExecutionCache
+import Shared.StructuralHash as StructuralHash
+
+# File names of the seen fingerprints and of the verdicts.
+SEEN_FILE = "seen.bin"
+VERDICT_FILE = "verdicts.log"
+
+class FingerprintStore:
+    """On-disk set of the seen fingerprints with their verdicts."""
+
+    def __init__(self, storeDir: str):
+        """
+        args:
+            storeDir (str): directory of the store of the seed.
+        """
+
+        self.storeDir = storeDir
+        self.seen = set()
+        # Fingerprint to its verdict.
+        self.verdicts = {}
+        # Number of the lookups that found the verdict of the fingerprint.
+        self.hits = 0
+        self.lock = threading.Lock()
+
+        if not os.path.exists(storeDir):
+            os.makedirs(storeDir)
+        self.Load()
+
+    def Load(self):
+        """This function reads the store. A digest or a line that was cut
+        short by a crash is truncated, so the next records are appended
+        after the last whole one.
+
+        returns:
+            None.
+        """
+
+        seenPath = f"{self.storeDir}/{SEEN_FILE}"
+        if os.path.exists(seenPath):
+            with open(seenPath, 'rb') as f:
+                data = f.read()
+            size = StructuralHash.DIGEST_SIZE
+            whole = len(data) - len(data) % size
+            for start in range(0, whole, size):
+                self.seen.add(data[start:start+size].hex())
+            if whole != len(data):
+                os.truncate(seenPath, whole)
+
+        verdictPath = f"{self.storeDir}/{VERDICT_FILE}"
+        if os.path.exists(verdictPath):
+            with open(verdictPath, 'rb') as f:
+                data = f.read()
+            whole = data.rfind(b"\n") + 1
+            for line in data[:whole].decode().splitlines():
+                fingerprint, verdict = line.split("\t")
+                self.verdicts[fingerprint] = verdict
+                self.seen.add(fingerprint)
+            if whole != len(data):
+                os.truncate(verdictPath, whole)
+
+    def __len__(self):
+        return len(self.seen)
+
+    def __contains__(self, fingerprint: str):
+        return fingerprint in self.seen
+
+    def Lookup(self, fingerprint: str):
+        """This function looks for the verdict of the fingerprint.
+
+        args:
+            fingerprint (str): fingerprint of the variant.
+
+        returns:
+            (str) verdict of the fingerprint, or None if it was not
+            classified, i.e., it has to be run.
+        """
+
+        with self.lock:
+            verdict = self.verdicts.get(fingerprint)
+            if verdict != None:
+                self.hits += 1
+
+            return verdict
+
+    def Record(self, fingerprint: str, verdict: str=None):
+        """This function records the fingerprint and its verdict, if any.
+
+        args:
+            fingerprint (str): fingerprint of the variant.
+            verdict (str): verdict of the variant, or None.
+
+        returns:
+            None.
+        """
+
+        with self.lock:
+            if fingerprint not in self.seen:
+                self.seen.add(fingerprint)
+                with open(f"{self.storeDir}/{SEEN_FILE}", 'ab') as f:
+                    f.write(bytes.fromhex(fingerprint))
+            if verdict != None and self.verdicts.get(fingerprint) != verdict:
+                self.verdicts[fingerprint] = verdict
+                with open(f"{self.storeDir}/{VERDICT_FILE}", 'a') as f:
+                    f.write(f"{fingerprint}\t{verdict}\n")
+
+    def Report(self):
+        print (
+            f"   |__ Fingerprint store: {self.hits} verdicts reused from the earlier runs, "
+            f"{len(self.seen)} seen, {len(self.verdicts)} classified")
+
+def StoreKey(seed: dict, commands: list, limits=None):
+    """This function hashes the seed, the commands to run the variants,
+    the identities of the binaries of the commands, and the limits.
+
+    args:
+        seed (dict): seed AST.
+        commands (list): commands to run the variants, without the program.
+        limits (Limits): limits of the runs, if any.
+
+    returns:
+        (str) key of the store.
+    """
+
+    digest = hashlib.blake2b(digest_size=StructuralHash.DIGEST_SIZE)
+    digest.update(StructuralHash.StructuralHasher().Hash(seed))
+    digest.update(json.dumps(commands).encode())
+    for command in commands:
+        digest.update(f"\0{ExecutionCache.EngineIdentity(command[0])}".encode())
+    if limits:
+        digest.update(f"\0{limits.timeout}:{limits.memoryMB}:{limits.cpuSeconds}".encode())
+
+    return digest.hexdigest()
+
+def OpenStore(rootDir: str, seed: dict, commands: list, limits=None):
+    """This function opens the store of the seed under the misc directory.
+
+    args:
+        rootDir (str): root directory path.
+        seed (dict): seed AST.
+        commands (list): commands to run the variants, without the program.
+        limits (Limits): limits of the runs, if any.
+
+    returns:
+        (FingerprintStore) store of the seed.
+    """
+
+    return FingerprintStore(
+            f"{rootDir}/misc/fingerprints/{StoreKey(seed, commands, limits)}")
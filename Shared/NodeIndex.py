@@ -0,0 +1,131 @@
+"""
+    This file holds the flattened index of the AST nodes. The tree is walked
+    once, in the order of the editors of the language, and every node id is
+    mapped to its node, its parent, its key (and list index) in the
+    parent, its node type, its depth, and its skip flag. Targeting and
+    skip checks are then lookups, and the path from the root to a node,
+    which PathCopy.py copies for editing the node, is a walk up the index.
+
+    The numbering itself is left to the builders of the languages
+    (JavaScript/SharedEditors.indexTree and C/Shared.indexTree), so the
+    node ids stay the same as those of the recursive walks.
+
+    Author: Anonymous.
+"""
+
+import os, sys
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import Shared.PathCopy as PathCopy
+
+# List index of the nodes that are not list elements.
+NO_INDEX = PathCopy.NO_INDEX
+
+class NodeIndex:
+    """Arrays of node id to node, parent, key, list index, node type, depth,
+    and skip flag."""
+
+    def __init__(self, root: dict):
+        """
+        args:
+            root (dict): root of the AST.
+        """
+
+        self.root = root
+        self.nodes = [None]
+        self.parents = [None]
+        self.keys = [None]
+        self.indices = [NO_INDEX]
+        self.types = [None]
+        self.depths = [0]
+        self.skips = bytearray(1)
+        self.present = bytearray(1)
+        # id() of every node in the tree to its (parent, key, list index),
+        # for walking up from a node to the root.
+        self.locations = {id(root): (None, None, NO_INDEX)}
+
+    def Locate(self, node, parent: dict, key: str, index: int):
+        """This function records where the node is in the tree.
+
+        args:
+            node (dict): node.
+            parent (dict): parent node.
+            key (str): key of the node in the parent.
+            index (int): index of the node in the list of the key, or NO_INDEX.
+
+        returns:
+            None.
+        """
+
+        self.locations[id(node)] = (parent, key, index)
+
+    def Set(
+            self, nodeId: int, node, parent: dict, key: str, index: int,
+            nodeType: str, depth: int, skip: bool=False):
+        """This function indexes the node at the node id.
+
+        args:
+            nodeId (int): node id.
+            node (dict): node.
+            parent (dict): parent node, as the editor of the language sees it.
+            key (str): key of the node in its parent.
+            index (int): index of the node in the list of the key, or NO_INDEX.
+            nodeType (str): type of the node.
+            depth (int): depth of the node in the tree.
+            skip (bool): True if the node is not to be edited.
+
+        returns:
+            None.
+        """
+
+        if nodeId >= len(self.nodes):
+            grow = nodeId + 1 - len(self.nodes)
+            self.nodes.extend([None] * grow)
+            self.parents.extend([None] * grow)
+            self.keys.extend([None] * grow)
+            self.indices.extend([NO_INDEX] * grow)
+            self.types.extend([None] * grow)
+            self.depths.extend([0] * grow)
+            self.skips.extend(bytes(grow))
+            self.present.extend(bytes(grow))
+
+        self.nodes[nodeId] = node
+        self.parents[nodeId] = parent
+        self.keys[nodeId] = key
+        self.indices[nodeId] = index
+        self.types[nodeId] = nodeType
+        self.depths[nodeId] = depth
+        self.skips[nodeId] = skip
+        self.present[nodeId] = True
+
+    def Has(self, nodeId: int):
+        return 0 < nodeId < len(self.present) and bool(self.present[nodeId])
+
+    def Total(self):
+        """This function returns the largest node id."""
+
+        return len(self.nodes) - 1
+
+    def Path(self, nodeId: int):
+        """This function returns the path from the root to the node of the
+        node id, as PathCopy.PathCopy takes it, without walking the tree.
+
+        args:
+            nodeId (int): node id.
+
+        returns:
+            (list) list of (key, list index or NO_INDEX) from the root.
+        """
+
+        path = []
+        current = self.nodes[nodeId]
+        while current is not self.root:
+            parent, key, index = self.locations[id(current)]
+            path.append((key, index))
+            current = parent
+        path.reverse()
+
+        return path
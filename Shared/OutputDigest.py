@@ -0,0 +1,177 @@
+"""
+    This file holds the compact records of the execution outputs. Instead of
+    holding the decoded stdout and stderr of every run in memory, a run is
+    kept as a small record of its return code, the blake2b digests and the
+    sizes of its stdout and stderr, and the timeout/divergence flags. All
+    equality checks of the outputs compare the digests.
+
+    The stdout itself is kept in memory only while it is needed, i.e., for
+    the streamed JIT-on run of EARLY_KILL and until the verdict. The stdout
+    of a variant that is not buggy is released at the verdict, and only the
+    stdouts of the buggy variants are written to disk, when they are kept.
+
+    Author: Anonymous.
+"""
+
+import hashlib
+
+# Size of the digests in bytes.
+DIGEST_SIZE = 16
+
+class OutputRecord:
+    """Bounded-size record of an execution output."""
+
+    __slots__ = (
+            "args", "returncode", "stdoutDigest", "stderrDigest", "stdoutSize",
+            "stderrSize", "stdout", "timed_out", "diverged", "server")
+
+    def __init__(
+            self, args, returncode, stdoutDigest, stderrDigest, stdoutSize,
+            stderrSize, stdout=None, timed_out=False, diverged=False, server=False):
+        """
+        args:
+            args (list): command of the execution.
+            returncode (int): return code of the execution.
+            stdoutDigest (str): digest of the stdout.
+            stderrDigest (str): digest of the stderr.
+            stdoutSize (int): size of the stdout in bytes.
+            stderrSize (int): size of the stderr in bytes.
+            stdout (bytes): encoded stdout, until it is released.
+            timed_out (bool): True if the execution timed out.
+            diverged (bool): True if the execution was killed on divergence.
+            server (bool): True if the execution ran on an engine server
+            instead of a fresh process.
+        """
+
+        self.args = args
+        self.returncode = returncode
+        self.stdoutDigest = stdoutDigest
+        self.stderrDigest = stderrDigest
+        self.stdoutSize = stdoutSize
+        self.stderrSize = stderrSize
+        self.stdout = stdout
+        self.timed_out = timed_out
+        self.diverged = diverged
+        self.server = server
+
+    def ReadStdout(self):
+        """This function returns the full stdout of the execution.
+
+        returns:
+            (str) stdout, or None if it is not kept.
+        """
+
+        if self.stdout == None:
+            return None
+
+        return self.stdout.decode("utf-8", errors="surrogateescape")
+
+    def Release(self):
+        """This function drops the stdout, once it is no longer needed.
+
+        returns:
+            None.
+        """
+
+        self.stdout = None
+
+def Encode(text):
+    """This function encodes the decoded output back to bytes.
+
+    args:
+        text (str or bytes): output.
+
+    returns:
+        (bytes) encoded output.
+    """
+
+    if text == None:
+        return b""
+    elif isinstance(text, bytes):
+        return text
+
+    return text.encode("utf-8", errors="surrogateescape")
+
+def Digest(text):
+    """This function computes the digest of the output.
+
+    args:
+        text (str or bytes): output.
+
+    returns:
+        (str) hex digest.
+    """
+
+    return hashlib.blake2b(Encode(text), digest_size=DIGEST_SIZE).hexdigest()
+
+def FromOutput(output):
+    """This function turns the output of the execution into a record.
+
+    args:
+        output (CompletedProcess): result of the execution.
+
+    returns:
+        (OutputRecord) record of the execution, or None if output is None.
+    """
+
+    if output == None or isinstance(output, OutputRecord):
+        return output
+
+    stdout = Encode(output.stdout)
+    stderr = Encode(output.stderr)
+
+    return OutputRecord(
+                output.args, output.returncode, Digest(stdout), Digest(stderr),
+                len(stdout), len(stderr), stdout,
+                timed_out=getattr(output, "timed_out", False),
+                diverged=getattr(output, "diverged", False))
+
+def StdoutDigest(output):
+    """This function returns the digest of the stdout of either a record or
+    a CompletedProcess.
+
+    args:
+        output (OutputRecord or CompletedProcess): result of the execution.
+
+    returns:
+        (str) hex digest of the stdout.
+    """
+
+    if isinstance(output, OutputRecord):
+        return output.stdoutDigest
+
+    return Digest(output.stdout)
+
+def SameStdout(output1, output2):
+    """This function checks whether the two executions have the same stdout.
+
+    args:
+        output1 (OutputRecord or CompletedProcess): result of the first execution.
+        output2 (OutputRecord or CompletedProcess): result of the second execution.
+
+    returns:
+        (bool) True if the stdouts are the same.
+    """
+
+    return StdoutDigest(output1) == StdoutDigest(output2)
+
+def Keep(output, path: str):
+    """This function writes the full stdout of the execution to disk, and
+    releases it from the record.
+
+    args:
+        output (OutputRecord): result of the execution.
+        path (str): path to write the stdout to.
+
+    returns:
+        None.
+    """
+
+    if output.stdout == None:
+        with open(path, "w") as f:
+            f.write(f"<stdout of {output.stdoutSize} bytes with digest {output.stdoutDigest}>\n")
+        return
+
+    with open(path, "wb") as f:
+        f.write(output.stdout)
+    output.Release()
@@ -0,0 +1,55 @@
+"""
+    This file holds the concurrent execution engine that runs independent
+    jobs, e.g., the JIT-on and JIT-off runs of the generated variants, on
+    a pool of workers.
+
+    Since every job spends its time waiting on a child process (JS engine,
+    compiler, or binary), the workers are threads: the child processes run
+    on all cores while the GIL is released by the waiting thread.
+
+    Author: Anonymous.
+"""
+
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+
+def GetWorkerCount(workers: int):
+    """This function returns the number of workers to use. Zero, negative,
+    or missing value means 'use all available cores'.
+
+    args:
+        workers (int): user specified number of workers.
+
+    returns:
+        (int) number of workers.
+    """
+
+    if not workers or workers < 1:
+        return os.cpu_count() or 1
+
+    return workers
+
+def RunAll(jobs: list, function, workers: int):
+    """This function runs the function with every job's arguments
+    concurrently and returns the results in the order of the jobs.
+
+    args:
+        jobs (list): list of argument tuples, one per job.
+        function (function): function to call for each job.
+        workers (int): number of workers.
+
+    returns:
+        (list) list of results in the same order as the jobs.
+    """
+
+    workers = min(GetWorkerCount(workers), len(jobs))
+
+    if workers <= 1:
+        return [function(*job) for job in jobs]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(function, *job) for job in jobs]
+        results = [future.result() for future in futures]
+
+    return results
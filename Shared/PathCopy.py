@@ -0,0 +1,55 @@
+"""
+    This file holds the copy-on-write copy of an AST for editing a single
+    node. Only the dicts and lists on the path from the root to the node
+    are copied, and the node itself is copied deeply, as the editors may
+    change its children as well. All other subtrees are shared with the
+    original AST, so they must not be edited in place.
+
+    The path is given as the keys (and list indices) from the root to the
+    node, so the copy is the same for the ASTs of all languages.
+
+    Author: Anonymous.
+"""
+
+import copy
+
+# List index of the steps that are not into a list.
+NO_INDEX = -1
+
+def PathCopy(root: dict, path: list):
+    """This function copies the AST for editing the node at the end of the
+    path.
+
+    args:
+        root (dict): root of the AST.
+        path (list): list of (key, list index or NO_INDEX) from the root to
+        the node.
+
+    returns:
+        (dict) copy of the AST.
+        (dict) id() of the original nodes on the path to their copies.
+    """
+
+    if not path:
+        root_copy = copy.deepcopy(root)
+        return root_copy, {id(root): root_copy}
+
+    root_copy = dict(root)
+    copies = {id(root): root_copy}
+    container = root_copy
+    for step, (key, index) in enumerate(path):
+        if index != NO_INDEX:
+            container[key] = list(container[key])
+            slots, slot = container[key], index
+        else:
+            slots, slot = container, key
+
+        current = slots[slot]
+        if step == len(path) - 1:
+            slots[slot] = copy.deepcopy(current)
+        else:
+            slots[slot] = dict(current)
+        container = slots[slot]
+        copies[id(current)] = container
+
+    return root_copy, copies
@@ -0,0 +1,240 @@
+"""
+    This file holds the sandboxed run primitive shared by the JS engine
+    runs and the C binary runs. Every run:
+    - starts in its own process group, so the whole group is killed when
+      the run expires,
+    - is capped with RLIMIT_AS and RLIMIT_CPU, if requested,
+    - is marked as timed out instead of being dropped when it expires.
+
+    RunStreaming additionally compares the stdout of the run line by line
+    with the expected stdout, and kills the run as soon as it diverges.
+
+    Author: Anonymous.
+"""
+
+import os
+import math
+import resource
+import signal
+import subprocess
+import threading
+import time
+
+# Default wall-clock timeout in seconds.
+DEFAULT_TIMEOUT = 10
+# Multiple of the seed's own runtime used as the calibrated timeout.
+TIMEOUT_FACTOR = 10
+# Lower bound of the calibrated timeout in seconds.
+MIN_TIMEOUT = 1
+
+class Limits:
+    """Limits of the sandboxed runs."""
+
+    def __init__(self, timeout: float=DEFAULT_TIMEOUT, memoryMB: int=0, cpuSeconds: int=0):
+        """
+        args:
+            timeout (float): wall-clock timeout in seconds.
+            memoryMB (int): RLIMIT_AS in megabytes (0 for no limit). Note that
+            the JS engines reserve a large virtual address space, so the
+            limit has to be generous for them.
+            cpuSeconds (int): RLIMIT_CPU in seconds (0 for no limit).
+        """
+
+        self.timeout = timeout
+        self.memoryMB = memoryMB
+        self.cpuSeconds = cpuSeconds
+
+class SandboxResult(subprocess.CompletedProcess):
+    """CompletedProcess that also records whether the run timed out, or was
+    killed because its stdout diverged from the expected stdout."""
+
+    def __init__(
+            self, args, returncode, stdout=None, stderr=None, timed_out=False,
+            diverged=False):
+        super().__init__(args, returncode, stdout, stderr)
+        self.timed_out = timed_out
+        self.diverged = diverged
+
+def Diverged(output):
+    """This function checks whether the run was killed on divergence,
+    i.e., its stdout is only a part of the full stdout.
+
+    args:
+        output (CompletedProcess): result of the run.
+
+    returns:
+        (bool) True if the run diverged.
+    """
+
+    return getattr(output, "diverged", False)
+
+def TimedOut(output):
+    """This function checks whether the run timed out.
+
+    args:
+        output (CompletedProcess): result of the run.
+
+    returns:
+        (bool) True if the run timed out.
+    """
+
+    return getattr(output, "timed_out", False)
+
+def SetLimits(pid: int, limits: Limits):
+    """This function applies the resource limits to the started process.
+    prlimit is used instead of preexec_fn because the runs are started
+    from several threads at once.
+
+    args:
+        pid (int): process id.
+        limits (Limits): limits to apply.
+
+    returns:
+        None.
+    """
+
+    try:
+        if limits.memoryMB:
+            size = limits.memoryMB * 1024 * 1024
+            resource.prlimit(pid, resource.RLIMIT_AS, (size, size))
+        if limits.cpuSeconds:
+            seconds = int(math.ceil(limits.cpuSeconds))
+            resource.prlimit(pid, resource.RLIMIT_CPU, (seconds, seconds))
+    except (ProcessLookupError, AttributeError):
+        # Either the process already exited or prlimit is not supported.
+        pass
+
+def KillGroup(process):
+    """This function kills the process group of the process.
+
+    args:
+        process (Popen): process leading the group.
+
+    returns:
+        None.
+    """
+
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+def Run(commands: list, limits: Limits):
+    """This function runs the command in a new process group under the limits.
+
+    args:
+        commands (list): command to run.
+        limits (Limits): limits of the run.
+
+    returns:
+        (SandboxResult) result of the run.
+    """
+
+    process = subprocess.Popen(
+            commands, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, start_new_session=True)
+    SetLimits(process.pid, limits)
+
+    timed_out = False
+    try:
+        stdout, stderr = process.communicate(timeout=limits.timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        KillGroup(process)
+        stdout, stderr = process.communicate()
+
+    # Clean up the processes that the run left behind.
+    KillGroup(process)
+
+    return SandboxResult(commands, process.returncode, stdout, stderr, timed_out)
+
+def RunStreaming(commands: list, limits: Limits, expected: str):
+    """This function runs the command like Run, but reads its stdout line by
+    line and kills the process group at the first line that does not match
+    the expected stdout. The stdout of a diverged run is cut off after the
+    first mismatching line, so it never equals the expected stdout.
+
+    args:
+        commands (list): command to run.
+        limits (Limits): limits of the run.
+        expected (str): expected stdout, e.g., the stdout of the JIT-off run.
+
+    returns:
+        (SandboxResult) result of the run.
+    """
+
+    process = subprocess.Popen(
+            commands, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, start_new_session=True)
+    SetLimits(process.pid, limits)
+
+    expired = threading.Event()
+    def Expire():
+        expired.set()
+        KillGroup(process)
+
+    watchdog = threading.Timer(limits.timeout, Expire)
+    watchdog.daemon = True
+    watchdog.start()
+
+    # stderr is drained on the side, so a chatty run does not block on it.
+    stderr = []
+    reader = threading.Thread(target=lambda: stderr.append(process.stderr.read()))
+    reader.daemon = True
+    reader.start()
+
+    stdout = []
+    offset = 0
+    diverged = False
+    for line in process.stdout:
+        stdout.append(line)
+        if expected[offset:offset+len(line)] != line:
+            diverged = True
+            KillGroup(process)
+            break
+        offset += len(line)
+
+    process.stdout.close()
+    process.wait()
+    watchdog.cancel()
+    reader.join()
+
+    # Clean up the processes that the run left behind.
+    KillGroup(process)
+
+    return SandboxResult(
+            commands, process.returncode, "".join(stdout), "".join(stderr),
+            expired.is_set(), diverged)
+
+def Calibrate(commands: list, factor: float=TIMEOUT_FACTOR, minimum: float=MIN_TIMEOUT,
+        default: float=DEFAULT_TIMEOUT):
+    """This function calibrates the timeout from the runtime of the command,
+    e.g., the seed program with the JIT compilation off. The timeout is
+    rounded up to whole seconds, so the reruns on the same seed get the
+    same timeout. A command that times out or fails is reported.
+
+    args:
+        commands (list): command to run.
+        factor (float): multiple of the runtime used as the timeout.
+        minimum (float): lower bound of the timeout.
+        default (float): timeout used when the command itself times out.
+
+    returns:
+        (float) calibrated timeout in seconds.
+    """
+
+    start = time.monotonic()
+    output = Run(commands, Limits(timeout=default * factor))
+    elapsed = time.monotonic() - start
+
+    if output.timed_out:
+        print (
+            f"   |__ WARNING: Calibration: {' '.join(commands)} did not finish in "
+            f"{default * factor}s, so the default timeout of {default}s is used.")
+        return default
+    elif output.returncode != 0:
+        print (
+            f"   |__ WARNING: Calibration: {' '.join(commands)} exited with "
+            f"{output.returncode}, so the timeout is calibrated on a failing run.")
+
+    return math.ceil(max(minimum, elapsed * factor))
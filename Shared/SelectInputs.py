@@ -112,7 +112,7 @@ def select_input_ids(
         for id, node in id2node.items():
             id2nodeStr[id] = str(node)
 
-        alignment = SEQAlign.SequenceAlignment(
+        alignment = SEQAlign.FastSequenceAlignment(
                                 list(seed_id2nodeStr.values()),
                                 list(id2nodeStr.values()))
 
@@ -233,7 +233,7 @@ def move_buggies_from_rand(
             for id, node in id2node.items():
                 id2nodeStr[id] = str(node)
         
-            alignment = SEQAlign.SequenceAlignment(
+            alignment = SEQAlign.FastSequenceAlignment(
                                     list(seed_id2nodeStr.values()),
                                     list(id2nodeStr.values()))
 
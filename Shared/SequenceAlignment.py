@@ -11,9 +11,34 @@
         of Corona virus
         https://www.ncbi.nlm.nih.gov/pmc/articles/PMC7106772/
 
+    If NumPy is installed, the matrix is filled row by row with NumPy
+    (VectorizedNeedlemanWunsch), where the elements are compared as integer
+    tokens. The matrix holds the same scores, so the alignment is the same.
+
+    For the large sequences, only a band of the matrix around the diagonal
+    is filled (BandedMatrix), which takes O((m+n)*width) memory. The band
+    is widened until every cell the alignment reads is proven to hold the
+    score of the full matrix, so the alignment is again the same.
+
+    FastSequenceAlignment first counts the differences of the sequences with
+    the O(ND) algorithm of Myers (An O(ND) difference algorithm and its
+    variations, 1986), whose cost grows with the number D of differences.
+    The diff only picks how the sequences are aligned: the same sequences
+    align element by element, as the matrix is then symmetric, and the
+    sequences with a few differences are aligned on the banded matrix with
+    a band as wide as the differences. Otherwise, they are aligned as in
+    SequenceAlignment. The alignment is the one of the matrix in all cases,
+    since the traceback of ComputeAlignment breaks the ties of the equal
+    scores in its own order, which the edit script of the diff does not.
+
     Author: Terrence Lim.
 """
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 SCORES = {
         "MATCH": 10,
         "MISMATCH": -10,
@@ -22,6 +47,25 @@ SCORES = {
 
 MISSING = -1
 
+# Fill the matrix with NumPy, if it is installed.
+VECTORIZE = True
+
+# Number of cells of the matrix from which the banded matrix is used.
+BAND_MIN_CELLS = 1000000
+# Initial width of the band on either side of the diagonals, doubled
+# until the alignment is exact.
+BAND_WIDTH = 16
+# Cross-check every banded alignment with the full matrix.
+VALIDATE = False
+
+# Largest number of differences (indels) for which the diff is used.
+DIFF_MAX_D = 64
+# Cross-check every fast alignment with SequenceAlignment.
+VALIDATE_FAST = False
+
+class OutsideBand(Exception):
+    """Raised when a cell is read that the band cannot prove to be exact."""
+
 def SequenceAlignment(S1: list, S2: list):
     """This function aligns elements in S1 to the elements in S2.
 
@@ -37,15 +81,144 @@ def SequenceAlignment(S1: list, S2: list):
     # Thus, we first reverse both sequences.
     S1.reverse()
     S2.reverse()
-    
-    Matrix = NeedlemanWunsch(S2, S1)
-    reversedOrderAlignedElemIds = ComputeAlignment(Matrix, S1, S2)
+
+    reversedOrderAlignedElemIds = None
+    if (len(S1)+1) * (len(S2)+1) >= BAND_MIN_CELLS:
+        reversedOrderAlignedElemIds = BandedAlignment(S1, S2)
+    if reversedOrderAlignedElemIds == None:
+        reversedOrderAlignedElemIds = FullAlignment(S1, S2)
+    elif VALIDATE:
+        fullAlignment = FullAlignment(S1, S2)
+        assert (
+            list(reversedOrderAlignedElemIds.items()) == list(fullAlignment.items())
+        ), f"ERROR: The banded alignment differs from the full alignment."
 
     # Reverse the aligned node ids to the correct order, i.e., order of generation.
     correctOrderAlignedElemIds = reverseAlignedOrder(reversedOrderAlignedElemIds)
 
     return correctOrderAlignedElemIds
 
+def FullAlignment(S1: list, S2: list):
+    """This function aligns the reversed sequences on the full matrix.
+
+    args:
+        S1 (list): first sequence, reversed.
+        S2 (list): second sequence, reversed.
+
+    returns:
+        (dict) dict of paired aligned element ids in the reversed order.
+    """
+
+    if VECTORIZE and numpy != None:
+        Matrix = VectorizedNeedlemanWunsch(S2, S1)
+    else:
+        Matrix = NeedlemanWunsch(S2, S1)
+
+    return ComputeAlignment(Matrix, S1, S2)
+
+def BandedAlignment(S1: list, S2: list, width: int=BAND_WIDTH):
+    """This function aligns the reversed sequences on the banded matrix.
+    The band is doubled whenever the alignment reads a cell outside the
+    band or a cell that may differ from the full matrix.
+
+    args:
+        S1 (list): first sequence, reversed.
+        S2 (list): second sequence, reversed.
+        width (int): initial width of the band.
+
+    returns:
+        (dict) dict of paired aligned element ids in the reversed order,
+        or None if the band grows to the full matrix.
+    """
+
+    # The bound of the scores of the paths outside the band holds only
+    # if the more indels a path has, the lower its bound.
+    if SCORES["INDEL"] * 2 >= max(SCORES["MATCH"], SCORES["MISMATCH"]):
+        return None
+
+    while True:
+        Matrix = BandedMatrix(S2, S1, width)
+        if Matrix.Covers():
+            return None
+        try:
+            return ComputeAlignment(Matrix, S1, S2)
+        except OutsideBand:
+            width *= 2
+
+def FastSequenceAlignment(S1: list, S2: list):
+    """This function aligns elements in S1 to the elements in S2 with the
+    same result as SequenceAlignment, but without the full matrix if the
+    sequences differ in at most DIFF_MAX_D elements. The sequences are not
+    modified.
+
+    args:
+        S1 (list): first sequence.
+        S2 (list): second sequence.
+
+    returns:
+        (dict) dict of paired aligned element ids.
+    """
+
+    D = MyersDiff(S1, S2, DIFF_MAX_D)
+    if D == None:
+        return SequenceAlignment(list(S1), list(S2))
+
+    if D == 0:
+        # Every diagonal step of the traceback is a match.
+        reversedOrderAlignedElemIds = {idx: idx for idx in range(len(S1)-1, -1, -1)}
+    else:
+        reversedS1 = list(reversed(S1))
+        reversedS2 = list(reversed(S2))
+        reversedOrderAlignedElemIds = BandedAlignment(reversedS1, reversedS2, D)
+        if reversedOrderAlignedElemIds == None:
+            reversedOrderAlignedElemIds = FullAlignment(reversedS1, reversedS2)
+
+    alignedElemIds = reverseAlignedOrder(reversedOrderAlignedElemIds)
+
+    if VALIDATE_FAST:
+        fullAlignment = SequenceAlignment(list(S1), list(S2))
+        assert (
+            list(alignedElemIds.items()) == list(fullAlignment.items())
+        ), f"ERROR: The fast alignment differs from SequenceAlignment."
+
+    return alignedElemIds
+
+def MyersDiff(S1: list, S2: list, maxD: int):
+    """This function computes the number of edits (indels) of the shortest
+    edit script from S1 to S2 with the greedy algorithm of Myers, where
+    V[k] is the furthest element of S1 reached on the diagonal k = x - y
+    with d edits.
+
+    args:
+        S1 (list): first sequence.
+        S2 (list): second sequence.
+        maxD (int): largest number of edits to look for.
+
+    returns:
+        (int) number of edits, or None if there are more than maxD edits.
+    """
+
+    n = len(S1)
+    m = len(S2)
+    offset = maxD + 1
+
+    V = [0] * (2*maxD + 3)
+    for d in range(0, maxD+1):
+        for k in range(-d, d+1, 2):
+            if k == -d or (k != d and V[offset+k-1] < V[offset+k+1]):
+                x = V[offset+k+1]
+            else:
+                x = V[offset+k-1] + 1
+            y = x - k
+            while x < n and y < m and S1[x] == S2[y]:
+                x += 1
+                y += 1
+            V[offset+k] = x
+            if x >= n and y >= m:
+                return d
+
+    return None
+
 def NeedlemanWunsch(seq_1: list, seq_2: list):
     """This function runs Needleman-Wunsch algoithm to populate
     the matrix with the scores.
@@ -83,6 +256,195 @@ def NeedlemanWunsch(seq_1: list, seq_2: list):
 
     return Matrix
 
+def VectorizedNeedlemanWunsch(seq_1: list, seq_2: list):
+    """This function populates the same matrix as NeedlemanWunsch with
+    NumPy. A row is computed from the previous row at once: the best of
+    the match and the mismatch (from the row above) is computed for all
+    columns, and then the indels from the left are a running maximum,
+    since Matrix[row][col] - col*INDEL is the maximum of the values
+    T[k] - k*INDEL over the columns k <= col.
+
+    args:
+        seq_1 (list): list of sequence 1.
+        seq_2 (list): list of sequnece 2.
+
+    returns:
+        (numpy.ndarray) matrix of (len(seq_2)+1) rows and (len(seq_1)+1)
+        columns, or a list of lists if the elements are not hashable.
+    """
+
+    tokens = Tokenize(seq_1, seq_2)
+    if tokens == None:
+        return NeedlemanWunsch(seq_1, seq_2)
+    tokens_1, tokens_2 = tokens
+
+    m = len(seq_1)
+    n = len(seq_2)
+
+    Matrix = numpy.empty((n+1, m+1), dtype=numpy.int32)
+    # Indel scores from the first column, i.e., col * INDEL.
+    indels = numpy.arange(m+1, dtype=numpy.int64) * SCORES["INDEL"]
+
+    # Initialization - First row.
+    Matrix[0] = indels
+
+    best = numpy.empty(m+1, dtype=numpy.int64)
+    for row in range(1, n+1):
+        previous = Matrix[row-1]
+        scores = numpy.where(
+                    tokens_1 == tokens_2[row-1], SCORES["MATCH"], SCORES["MISMATCH"])
+        # Initialization - First column.
+        best[0] = row * SCORES["INDEL"]
+        numpy.maximum(
+            previous[:-1] + scores, previous[1:] + SCORES["INDEL"], out=best[1:])
+        numpy.maximum.accumulate(best - indels, out=Matrix[row])
+        Matrix[row] += indels
+
+    return Matrix
+
+def Tokenize(seq_1: list, seq_2: list):
+    """This function maps the elements of the sequences to integer tokens,
+    such that two elements have the same token if and only if they are equal.
+
+    args:
+        seq_1 (list): list of sequence 1.
+        seq_2 (list): list of sequnece 2.
+
+    returns:
+        (tuple) token arrays of seq_1 and seq_2, or None if the elements
+        are not hashable.
+    """
+
+    element2token = {}
+    try:
+        tokens_1 = [element2token.setdefault(e, len(element2token)) for e in seq_1]
+        tokens_2 = [element2token.setdefault(e, len(element2token)) for e in seq_2]
+    except TypeError:
+        return None
+
+    return (
+        numpy.array(tokens_1, dtype=numpy.int64),
+        numpy.array(tokens_2, dtype=numpy.int64))
+
+class BandedMatrix:
+    """Band of the matrix of NeedlemanWunsch around its diagonals, which
+    reads like the list of lists of the full matrix. A cell of the band is
+    read only if its score is the same as in the full matrix, i.e., no path
+    that leaves the band can score higher."""
+
+    def __init__(self, seq_1: list, seq_2: list, width: int):
+        """
+        args:
+            seq_1 (list): list of sequence 1.
+            seq_2 (list): list of sequnece 2.
+            width (int): width of the band on either side of the diagonals
+            from the first cell and to the last cell.
+        """
+
+        self.m = len(seq_1)
+        self.n = len(seq_2)
+        # The band holds the cells where lo <= col - row <= hi.
+        self.lo = min(0, self.m - self.n) - width
+        self.hi = max(0, self.m - self.n) + width
+        self.rows = []
+
+        if not self.Covers():
+            self.Fill(seq_1, seq_2)
+
+    def Covers(self):
+        """This function checks whether the band holds the whole matrix."""
+
+        return self.lo <= -self.n and self.hi >= self.m
+
+    def Fill(self, seq_1: list, seq_2: list):
+        """This function computes the cells of the band as NeedlemanWunsch
+        does, where the cells outside the band are never the best.
+
+        args:
+            seq_1 (list): list of sequence 1.
+            seq_2 (list): list of sequnece 2.
+
+        returns:
+            None.
+        """
+
+        size = self.hi - self.lo + 1
+        outside = float("-inf")
+
+        previous = None
+        for row in range(0, self.n+1):
+            current = [outside] * size
+            for i in range(0, size):
+                col = row + self.lo + i
+                if col < 0 or col > self.m:
+                    continue
+                if row == 0:
+                    current[i] = col * SCORES["INDEL"]
+                elif col == 0:
+                    current[i] = row * SCORES["INDEL"]
+                else:
+                    # The cell above is at i+1, and the cell on the left at i-1.
+                    score = previous[i] + compare_element(seq_1[col-1], seq_2[row-1])
+                    if i+1 < size:
+                        score = max(score, previous[i+1] + SCORES["INDEL"])
+                    if i > 0:
+                        score = max(score, current[i-1] + SCORES["INDEL"])
+                    current[i] = score
+            self.rows.append(current)
+            previous = current
+
+    def Cell(self, row: int, col: int):
+        """This function reads the score of the cell.
+
+        args:
+            row (int): row of the cell.
+            col (int): column of the cell.
+
+        returns:
+            (int) score of the cell, the same as in the full matrix.
+        """
+
+        i = col - row - self.lo
+        if i < 0 or i > self.hi - self.lo:
+            raise OutsideBand()
+
+        score = self.rows[row][i]
+
+        # A path that leaves the band reaches the diagonal hi+1 or lo-1, so
+        # it has at least the fewest indels to pass there. Its score is at
+        # most that of all the other moves matching.
+        offset = col - row
+        indels = min(
+                abs(self.hi+1) + abs(self.hi+1 - offset),
+                abs(self.lo-1) + abs(self.lo-1 - offset))
+        if indels <= row + col:
+            bound = (
+                max(SCORES["MATCH"], SCORES["MISMATCH"]) * (row + col - indels) / 2
+                + SCORES["INDEL"] * indels)
+            if score < bound:
+                raise OutsideBand()
+
+        return score
+
+    def __len__(self):
+        return self.n + 1
+
+    def __getitem__(self, row: int):
+        return BandedRow(self, row)
+
+class BandedRow:
+    """Row of the banded matrix."""
+
+    def __init__(self, matrix: BandedMatrix, row: int):
+        self.matrix = matrix
+        self.row = row
+
+    def __len__(self):
+        return self.matrix.m + 1
+
+    def __getitem__(self, col: int):
+        return self.matrix.Cell(self.row, col)
+
 def ComputeAlignment(Matrix: list, seq_1: list, seq_2: list):
     """This function computes alignment of two sequence lists based on
     the computed matrix. Note that seq_1 is the default sequence. In other
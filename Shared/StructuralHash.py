@@ -0,0 +1,158 @@
+"""
+    This file holds the structural (Merkle) hashes of the ASTs. The hash of
+    a node is computed bottom-up from the hashes of its children, so the
+    hash of a tree is its fingerprint. The hashes of the seed are cached,
+    and the variants share all but their edited paths with the seed, so
+    hashing a variant only recomputes the nodes on the edited paths.
+
+    The fingerprints of the accepted variants are kept in a FingerprintSet,
+    where a duplicate is found by a lookup. As different trees may have the
+    same fingerprint, the items with the same fingerprint are compared.
+
+    Two trees that are equal (==) have the same fingerprint: the keys of the
+    dicts are hashed in sorted order, and the numbers by their values. The
+    strict hashes instead follow the strings of the trees: the keys are
+    hashed in their order, and the leaf values by their repr(), so two
+    trees have the same strict hash if and only if str() of them is the
+    same (up to the hash collisions).
+
+    Author: Anonymous.
+"""
+
+import hashlib
+
+# Size of the node hashes in bytes.
+DIGEST_SIZE = 16
+
+class StructuralHasher:
+    """Subtree hashes, cached for the trees that are not edited in place."""
+
+    def __init__(self, strict: bool=False):
+        """
+        args:
+            strict (bool): True to hash the trees by their strings.
+        """
+
+        self.strict = strict
+        # id() of the cached nodes to (node, hash). The node is kept, so
+        # its id() is not reused while it is cached.
+        self.cache = {}
+
+    def Hash(self, node, remember: bool=False):
+        """This function computes the hash of the tree.
+
+        args:
+            node: root of the tree.
+            remember (bool): True to cache the hashes of all the nodes of
+            the tree, which then must not be edited in place.
+
+        returns:
+            (bytes) hash of the tree.
+        """
+
+        memo = self.cache if remember else {}
+
+        return self.Digest(node, memo)
+
+    def Fingerprint(self, node):
+        return self.Hash(node).hex()
+
+    def Digest(self, node, memo: dict):
+        """This function recursively computes the hash of the node.
+
+        args:
+            node: node to hash.
+            memo (dict): id() of the hashed nodes to (node, hash).
+
+        returns:
+            (bytes) hash of the node.
+        """
+
+        if not isinstance(node, (dict, list)):
+            value = EncodeString(repr(node)) if self.strict else EncodeValue(node)
+            return hashlib.blake2b(value, digest_size=DIGEST_SIZE).digest()
+
+        cached = self.cache.get(id(node)) or memo.get(id(node))
+        if cached:
+            return cached[1]
+
+        digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        if isinstance(node, dict):
+            digest.update(b"d")
+            for key in (node if self.strict else sorted(node)):
+                keyBytes = EncodeString(repr(key) if self.strict else key)
+                digest.update(f"{len(keyBytes)}:".encode())
+                digest.update(keyBytes)
+                digest.update(self.Digest(node[key], memo))
+        else:
+            digest.update(f"l{len(node)}:".encode())
+            for elem in node:
+                digest.update(self.Digest(elem, memo))
+
+        memo[id(node)] = (node, digest.digest())
+
+        return memo[id(node)][1]
+
+class FingerprintSet:
+    """Fingerprints of the accepted items, with the items themselves to tell
+    the fingerprint collisions apart."""
+
+    def __init__(self):
+        # Fingerprint to the list of items with the fingerprint.
+        self.items = {}
+        self.collisions = 0
+
+    def __len__(self):
+        return sum(len(items) for items in self.items.values())
+
+    def __contains__(self, fingerprint):
+        return fingerprint in self.items
+
+    def Add(self, fingerprint, item):
+        """This function adds the item unless an equal item with the same
+        fingerprint was added before.
+
+        args:
+            fingerprint: fingerprint of the item.
+            item: item to add, compared with == on the same fingerprint.
+
+        returns:
+            (bool) True if the item was added.
+        """
+
+        items = self.items.setdefault(fingerprint, [])
+        for other in items:
+            if other == item:
+                return False
+
+        if items:
+            self.collisions += 1
+        items.append(item)
+
+        return True
+
+def EncodeString(text: str):
+    # The JS strings may hold lone surrogates.
+    return text.encode("utf-8", "surrogatepass")
+
+def EncodeValue(value):
+    """This function encodes the leaf value, such that the equal values have
+    the same encoding, e.g., 1, 1.0, and True.
+
+    args:
+        value: leaf value.
+
+    returns:
+        (bytes) encoded value.
+    """
+
+    if value == None:
+        return b"z"
+    elif isinstance(value, str):
+        return b"s" + EncodeString(value)
+    elif isinstance(value, (bool, int, float)):
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return b"n" + repr(int(value) if isinstance(value, bool) else value).encode()
+
+    return b"o" + repr(value).encode("utf-8", "backslashreplace")
@@ -0,0 +1,286 @@
+"""
+    This file holds the variants as the edit deltas of their seed. A variant
+    is kept as (seed id, patches, edited node ids), where a patch is the path
+    from the root of the seed AST to an edited slot and the value the slot
+    holds in the variant. The full AST of a variant is materialized only
+    when it is written or run, so the memory of the generated variants grows
+    with the size of their edits instead of the size of the tree.
+
+    The duplicates are found by the structural fingerprints of the variants
+    (StructuralHash.py), so a new variant is not compared with every
+    variant added before.
+
+    The edited node ids of the variants are recorded by the generators, and
+    the log of the edits is written next to the ASTs, so the edited node
+    ids do not have to be recovered by aligning the trees.
+
+    Author: Anonymous.
+"""
+
+import os, sys
+import json
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import Shared.StructuralHash as StructuralHash
+
+# File name of the edit log, written to the parent of the AST directory.
+EDIT_LOG = "edits.log"
+
+class VariantDelta:
+    """Edits of a variant to its seed."""
+
+    def __init__(
+            self, seedId: int, patches: list, nodeIds: list, fingerprint: str=None):
+        """
+        args:
+            seedId (int): id of the seed.
+            patches (list): list of (path, value) to set in the seed.
+            nodeIds (list): list of edited node ids, as numbered by the editor.
+            fingerprint (str): structural hash of the variant AST.
+        """
+
+        self.seedId = seedId
+        self.patches = patches
+        self.nodeIds = nodeIds
+        self.fingerprint = fingerprint
+
+class VariantStore:
+    """Deltas of the distinct variants of a seed AST, by variant id."""
+
+    def __init__(self, seed: dict, seedId: int=0, firstId: int=1):
+        """
+        args:
+            seed (dict): seed AST. It must not be edited in place.
+            seedId (int): id of the seed.
+            firstId (int): id of the first variant.
+        """
+
+        self.seed = seed
+        self.seedId = seedId
+        self.firstId = firstId
+        self.deltas = []
+        # The hashes of the seed are cached, so only the edited paths of
+        # the variants are hashed.
+        self.hasher = StructuralHash.StructuralHasher()
+        self.hasher.Hash(seed, remember=True)
+        # Fingerprints of the variants with their patches, for finding the
+        # duplicates. The seed has no patches.
+        self.fingerprints = StructuralHash.FingerprintSet()
+        self.fingerprints.Add(self.hasher.Fingerprint(seed), [])
+
+    def __len__(self):
+        return len(self.deltas)
+
+    def Ids(self):
+        return list(range(self.firstId, self.firstId + len(self.deltas)))
+
+    def Deltas(self):
+        return list(self.deltas)
+
+    def Fingerprint(self, variant: dict):
+        return self.hasher.Fingerprint(variant)
+
+    def Add(self, variant: dict, nodeIds: list=None, fingerprint: str=None):
+        """This function adds the variant if it is neither the seed nor a
+        variant already added. Only the delta of the variant is kept.
+
+        args:
+            variant (dict): AST of the variant.
+            nodeIds (list): list of edited node ids.
+            fingerprint (str): fingerprint of the variant, if computed before.
+
+        returns:
+            (int) id of the variant, or None if it was not added.
+        """
+
+        patches = []
+        DiffPatches(self.seed, variant, (), patches)
+
+        # Two variants are equal if and only if their patches are, which
+        # are compared only if their fingerprints are the same.
+        if fingerprint == None:
+            fingerprint = self.Fingerprint(variant)
+        if not self.fingerprints.Add(fingerprint, patches):
+            return None
+
+        return self.Append(VariantDelta(self.seedId, patches, nodeIds or [], fingerprint))
+
+    def Append(self, delta: VariantDelta):
+        """This function adds the delta as the next variant as is.
+
+        args:
+            delta (VariantDelta): delta of the variant.
+
+        returns:
+            (int) id of the variant.
+        """
+
+        self.deltas.append(delta)
+
+        return self.firstId + len(self.deltas) - 1
+
+    def Get(self, variantId: int):
+        return self.deltas[variantId - self.firstId]
+
+    def Materialize(self, variantId: int):
+        """This function builds the AST of the variant. The AST shares the
+        unedited subtrees with the seed, so it must not be edited in place.
+
+        args:
+            variantId (int): id of the variant.
+
+        returns:
+            (dict) AST of the variant.
+        """
+
+        return ApplyPatches(self.seed, self.Get(variantId).patches)
+
+    def EditLog(self, variantIds: list=None):
+        """This function returns the edits of the variants.
+
+        args:
+            variantIds (list): ids of the variants to log, or None for all.
+
+        returns:
+            (dict) variant id to {"seed", "nodeIds", "paths"}.
+        """
+
+        log = {}
+        for variantId in (self.Ids() if variantIds == None else variantIds):
+            delta = self.Get(variantId)
+            log[variantId] = {
+                "seed": delta.seedId,
+                "nodeIds": delta.nodeIds,
+                "paths": [list(path) for path, value in delta.patches],
+            }
+
+        return log
+
+    def SaveEditLog(self, astDirPath: str, variantIds: list=None):
+        """This function writes the edit log next to the AST directory.
+
+        args:
+            astDirPath (str): directory where the variant ASTs are stored.
+            variantIds (list): ids of the stored variants, or None for all.
+
+        returns:
+            None.
+        """
+
+        with open(EditLogPath(astDirPath), 'w') as f:
+            json.dump(self.EditLog(variantIds), f)
+
+def EditLogPath(astDirPath: str):
+    """This function returns the path of the edit log of the AST directory.
+    The log is kept out of the AST directory, as every file there is taken
+    as a variant AST.
+
+    args:
+        astDirPath (str): directory where the variant ASTs are stored.
+
+    returns:
+        (str) path to the edit log.
+    """
+
+    return f"{os.path.dirname(os.path.normpath(astDirPath))}/{EDIT_LOG}"
+
+def LoadEditLog(astDirPath: str):
+    """This function reads the edit log of the AST directory.
+
+    args:
+        astDirPath (str): directory where the variant ASTs are stored.
+
+    returns:
+        (dict) variant id to {"seed", "nodeIds", "paths"}, or None if
+        there is no log.
+    """
+
+    path = EditLogPath(astDirPath)
+    if not os.path.exists(path):
+        return None
+
+    with open(path) as f:
+        log = json.load(f)
+
+    return {int(variantId): edits for variantId, edits in log.items()}
+
+def IsDescendable(seedNode, variantNode):
+    """This function checks whether the two nodes have the same shape,
+    i.e., the same keys in the same order, or the same length, so their
+    differences can be looked for in their slots.
+
+    args:
+        seedNode: node of the seed.
+        variantNode: node of the variant.
+
+    returns:
+        (bool) True if the slots can be compared.
+    """
+
+    if isinstance(seedNode, dict) and isinstance(variantNode, dict):
+        return list(seedNode) == list(variantNode)
+    elif isinstance(seedNode, list) and isinstance(variantNode, list):
+        return len(seedNode) == len(variantNode)
+
+    return False
+
+def DiffPatches(seedNode, variantNode, path: tuple, patches: list):
+    """This function recursively compares the variant with the seed and
+    collects the patches of the slots that differ. The subtrees the variant
+    shares with the seed are skipped without being compared.
+
+    args:
+        seedNode: node of the seed.
+        variantNode: node of the variant.
+        path (tuple): keys and list indices from the root to the node.
+        patches (list): list of (path, value) patches.
+
+    returns:
+        None.
+    """
+
+    if seedNode is variantNode:
+        return
+
+    if IsDescendable(seedNode, variantNode):
+        slots = seedNode.keys() if isinstance(seedNode, dict) else range(len(seedNode))
+        for slot in slots:
+            DiffPatches(seedNode[slot], variantNode[slot], path + (slot,), patches)
+    elif seedNode != variantNode:
+        patches.append((path, variantNode))
+
+def ApplyPatches(seed: dict, patches: list):
+    """This function applies the patches to a copy of the seed. Only the
+    dicts and lists on the paths of the patches are copied.
+
+    args:
+        seed (dict): seed AST.
+        patches (list): list of (path, value) patches.
+
+    returns:
+        (dict) patched AST.
+    """
+
+    if patches and patches[0][0] == ():
+        return patches[0][1]
+
+    root = Copy(seed)
+    # Paths of the copied dicts and lists.
+    copied = set()
+    for path, value in patches:
+        container = root
+        for depth in range(len(path) - 1):
+            slot = path[depth]
+            if path[:depth+1] not in copied:
+                container[slot] = Copy(container[slot])
+                copied.add(path[:depth+1])
+            container = container[slot]
+        container[path[-1]] = value
+
+    return root
+
+def Copy(node):
+    return dict(node) if isinstance(node, dict) else list(node)
@@ -0,0 +1,144 @@
+"""
+    This program checks that the native code generator (JSNativeCodeGenerator.py)
+    generates byte-identical code to escodegen (JSCodeGenerator.js). Every JS
+    file of the corpus is parsed with esprima-python, and its AST is converted
+    by both generators. The files esprima-python cannot parse are skipped.
+
+    Usage:
+        python3 CompareJSCodeGen.py -d <JS file or directory> ...
+
+    Author: Anonymous.
+"""
+
+import os, sys
+import argparse
+import json
+
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import esprima
+
+import JavaScript.JSCodeGenServer as JSCodeGenServer
+import JavaScript.JSNativeCodeGenerator as JSNativeCodeGenerator
+
+def argument_parser():
+    """This function parses the passed argument.
+
+    args:
+        None
+
+    returns:
+        (list) list of JS file or directory paths.
+    """
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+            "-d",
+            "--directory",
+            type=str,
+            nargs="+",
+            required=True,
+            help="JS files or directories where the JS files are located."
+    )
+    args = parser.parse_args()
+
+    return args.directory
+
+def CollectFiles(paths: list):
+    """This function collects the JS files of the paths, recursively.
+
+    args:
+        paths (list): list of JS file or directory paths.
+
+    returns:
+        (list) sorted list of JS file paths.
+    """
+
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                files.extend(f"{root}/{name}" for name in names if name.endswith(".js"))
+        else:
+            files.append(path)
+
+    return sorted(files)
+
+def FirstDifference(expected: str, actual: str):
+    """This function finds the first line where the codes differ.
+
+    args:
+        expected (str): code generated by escodegen.
+        actual (str): code generated by the native generator.
+
+    returns:
+        (int) line number.
+        (str) line of escodegen.
+        (str) line of the native generator.
+    """
+
+    expectedLines = expected.split("\n")
+    actualLines = actual.split("\n")
+    for idx in range(max(len(expectedLines), len(actualLines))):
+        expectedLine = expectedLines[idx] if idx < len(expectedLines) else "<EOF>"
+        actualLine = actualLines[idx] if idx < len(actualLines) else "<EOF>"
+        if expectedLine != actualLine:
+            return idx + 1, expectedLine, actualLine
+
+    return 0, "", ""
+
+def Compare(jsFilePath: str):
+    """This function compares the codes of the two generators for a JS file.
+
+    args:
+        jsFilePath (str): path to the JS file.
+
+    returns:
+        (str) "identical", "different", or "skipped".
+    """
+
+    try:
+        with open(jsFilePath, encoding="utf-8") as f:
+            ast = esprima.parseScript(f.read()).toDict()
+    except Exception:
+        return "skipped"
+
+    # The regex literals hold compiled patterns, which escodegen does
+    # not read anyway, as it generates them from the "regex" field.
+    astJson = json.dumps(ast, default=lambda obj: None)
+    expected = JSCodeGenServer.GenerateCode(astJson)
+
+    try:
+        actual = JSNativeCodeGenerator.Generate(json.loads(astJson))
+    except Exception as e:
+        actual = None
+        error = e
+
+    if expected == actual:
+        return "identical"
+
+    if actual == None:
+        print (f"DIFFERENT: {jsFilePath}: native generator failed: {error}")
+    elif expected == None:
+        print (f"DIFFERENT: {jsFilePath}: escodegen failed")
+    else:
+        line, expectedLine, actualLine = FirstDifference(expected, actual)
+        print (f"DIFFERENT: {jsFilePath}:{line}")
+        print (f"    escodegen: {expectedLine}")
+        print (f"    native:    {actualLine}")
+
+    return "different"
+
+if __name__ == "__main__":
+    paths = argument_parser()
+
+    counts = {"identical": 0, "different": 0, "skipped": 0}
+    for jsFilePath in CollectFiles(paths):
+        counts[Compare(jsFilePath)] += 1
+
+    print (f"Identical: {counts['identical']}, Different: {counts['different']}, "
+           f"Skipped (not parsable by esprima-python): {counts['skipped']}")
+
+    sys.exit(1 if counts["different"] else 0)